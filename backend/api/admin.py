@@ -1,6 +1,17 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.db.models import Count
-from .models import Property, Region, SavedProperty
+from core.pagination import EstimatedCountPaginator
+from .models import (
+    ArchivedProperty,
+    Property,
+    PropertyPayload,
+    Region,
+    SavedProperty,
+    SlowQuery,
+)
+from .services.region_cache import RegionCache
+from .services.slow_query_log import SlowQueryLog
 
 
 @admin.register(Region)
@@ -39,6 +50,33 @@ class RegionAdmin(admin.ModelAdmin):
     )
 
 
+class SavedCountChangeList(ChangeList):
+    """Changelist counting saves for the listings of the shown page only."""
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_list = list(self.result_list)
+        counts = dict(
+            SavedProperty.objects.filter(  # type: ignore[attr-defined]
+                property_id__in=[obj.pk for obj in self.result_list]
+            )
+            .values("property_id")
+            .annotate(count=Count("id"))
+            .values_list("property_id", "count")
+        )
+        for obj in self.result_list:
+            obj.saved_count_annotation = counts.get(obj.pk, 0)
+
+
+class PropertyPayloadInline(admin.StackedInline):
+    """Payload editor; only loaded on the property change form."""
+
+    model = PropertyPayload
+    can_delete = False
+    fields = ["description", "images", "raw_data"]
+    classes = ["collapse"]
+
+
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
     """Admin configuration for Property model."""
@@ -55,7 +93,7 @@ class PropertyAdmin(admin.ModelAdmin):
         "condition",
         "energy_rating",
         "listing_status",
-        "region",
+        "region_name",
         "saved_count",
         "created_at",
     ]
@@ -71,9 +109,9 @@ class PropertyAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     ]
-    search_fields = ["address", "external_id", "description"]
+    search_fields = ["address", "external_id", "payload__description"]
     ordering = ["-created_at"]
-    readonly_fields = ["created_at", "updated_at"]
+    readonly_fields = ["postal_code", "created_at", "updated_at"]
     raw_id_fields = ["region"]  # Use raw_id for better performance with many regions
 
     fieldsets = (
@@ -83,7 +121,7 @@ class PropertyAdmin(admin.ModelAdmin):
                 "fields": (
                     "external_id",
                     "address",
-                    "description",
+                    "postal_code",
                     "coordinates",
                     "property_type",
                     "region",
@@ -118,18 +156,25 @@ class PropertyAdmin(admin.ModelAdmin):
             "Listing Information",
             {"fields": ("listing_status", "source_url", "last_synced_at")},
         ),
-        ("Media", {"fields": ("images",), "classes": ("collapse",)}),
-        ("Additional Data", {"fields": ("raw_data",), "classes": ("collapse",)}),
         (
             "Timestamps",
             {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
         ),
     )
+    inlines = [PropertyPayloadInline]
+    # Planner estimates instead of COUNT(*) over millions of listings
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-    def get_queryset(self, request):
-        """Annotate queryset with saved count for sorting."""
-        queryset = super().get_queryset(request)
-        return queryset.annotate(saved_count_annotation=Count("saved_by"))
+    def get_changelist(self, request, **kwargs):
+        return SavedCountChangeList
+
+    def region_name(self, obj):
+        """Display region from the region cache (no per-row query)."""
+        return RegionCache.get(obj.region_id) or "-"
+
+    region_name.short_description = "Region"  # type: ignore[attr-defined]
+    region_name.admin_order_field = "region__name"  # type: ignore[attr-defined]
 
     def price_per_sqm(self, obj):
         """Display calculated price per square meter."""
@@ -143,15 +188,43 @@ class PropertyAdmin(admin.ModelAdmin):
 
     def saved_count(self, obj):
         """Display count of users who saved this property."""
-        # Use annotation if available, otherwise fall back to count()
+        # Set for the page by the changelist, otherwise fall back to count()
         if hasattr(obj, "saved_count_annotation"):
             return obj.saved_count_annotation
         return obj.saved_by.count()  # type: ignore[attr-defined]
 
+    # Not sortable: ordering by it would aggregate the whole table
     saved_count.short_description = "Saved By"  # type: ignore[attr-defined]
-    saved_count.admin_order_field = (  # type: ignore[attr-defined]
-        "saved_count_annotation"
-    )
+
+
+@admin.register(ArchivedProperty)
+class ArchivedPropertyAdmin(admin.ModelAdmin):
+    """Admin configuration for ArchivedProperty model (read-only)."""
+
+    list_display = [
+        "address",
+        "property_type",
+        "price",
+        "listing_status",
+        "region_name",
+        "archived_at",
+    ]
+    list_filter = ["listing_status", "property_type", "archived_at"]
+    search_fields = ["address", "external_id"]
+    ordering = ["-archived_at"]
+    raw_id_fields = ["region"]
+
+    def region_name(self, obj):
+        """Display region from the region cache (no per-row query)."""
+        return RegionCache.get(obj.region_id) or "-"
+
+    region_name.short_description = "Region"  # type: ignore[attr-defined]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(SavedProperty)
@@ -177,6 +250,9 @@ class SavedPropertyAdmin(admin.ModelAdmin):
     ordering = ["-created_at"]
     readonly_fields = ["created_at"]
     raw_id_fields = ["user", "property"]  # Use raw_id for better performance
+    list_select_related = ["user", "property"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ("Relationship", {"fields": ("user", "property")}),
@@ -193,7 +269,7 @@ class SavedPropertyAdmin(admin.ModelAdmin):
 
     def property_region(self, obj):
         """Display property region."""
-        return obj.property.region  # type: ignore[attr-defined]
+        return RegionCache.get(obj.property.region_id)  # type: ignore[attr-defined]
 
     property_region.short_description = "Region"  # type: ignore[attr-defined]
     property_region.admin_order_field = "property__region"  # type: ignore[attr-defined]
@@ -204,3 +280,50 @@ class SavedPropertyAdmin(admin.ModelAdmin):
 
     has_notes.short_description = "Has Notes"  # type: ignore[attr-defined]
     has_notes.boolean = True  # type: ignore[attr-defined]
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """
+    Admin for the slow-query ring buffer (read-only).
+
+    The changelist starts with the query shapes that took the most total
+    time; their counts link to every capture of the shape.
+    """
+
+    change_list_template = "admin/api/slowquery/change_list.html"
+    list_display = ["short_sql", "duration_ms", "source", "database", "captured_at"]
+    list_filter = ["database", "captured_at"]
+    search_fields = ["sql", "source", "fingerprint"]
+    ordering = ["-captured_at"]
+    fields = [
+        "sql",
+        "params",
+        "duration_ms",
+        "database",
+        "source",
+        "plan",
+        "stack",
+        "fingerprint",
+        "captured_at",
+    ]
+    readonly_fields = fields
+
+    def short_sql(self, obj):
+        """Display the start of the statement."""
+        return obj.sql[:120]
+
+    short_sql.short_description = "SQL"  # type: ignore[attr-defined]
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            "top_offenders": SlowQueryLog.top_offenders(),
+        }
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
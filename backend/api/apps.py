@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from celery.signals import task_postrun
+        from django.core.signals import request_finished
+        from django.db.backends.signals import connection_created
+        from core.metrics import QueryCounter
+        from core.tracing import QuerySpans
+        from . import signals  # noqa: F401
+        from .services.slow_query_log import SlowQueryLog
+        from .services.statement_timeout import StatementTimeout
+
+        connection_created.connect(SlowQueryLog.install, weak=False)
+        connection_created.connect(QuerySpans.install, weak=False)
+        connection_created.connect(QueryCounter.install, weak=False)
+        connection_created.connect(StatementTimeout.install, weak=False)
+        # Slow-query captures are written once the request or task ends
+        request_finished.connect(SlowQueryLog.flush, weak=False)
+        task_postrun.connect(SlowQueryLog.flush, weak=False)
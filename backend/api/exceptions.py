@@ -0,0 +1,36 @@
+"""
+API exceptions.
+"""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# SQLSTATE of a statement cancelled by statement_timeout (query_canceled)
+QUERY_CANCELED = "57014"
+
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    """Return whether ``exc`` is a database error for a cancelled statement."""
+    cause = exc.__cause__
+    # psycopg2 exposes pgcode, psycopg 3 sqlstate
+    code = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+    return code == QUERY_CANCELED
+
+
+class QueryTimeout(APIException):
+    """The request's queries exceeded the action's statement timeout."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The request took too long and was cancelled."
+    default_code = "query_timeout"
+
+    def __init__(self, timeout_ms: int):
+        super().__init__(
+            {
+                "detail": self.default_detail,
+                "hint": (
+                    f"Queries are limited to {timeout_ms} ms. Narrow the search, "
+                    "add filters or request an earlier page."
+                ),
+            }
+        )
@@ -0,0 +1,86 @@
+"""
+Custom model fields for the API app.
+"""
+
+import json
+import zlib
+from django import forms
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+# zstandard is optional; zlib is always available
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+    zstandard = None  # type: ignore[assignment]
+
+# One-byte codec markers so stored values stay readable if the setting changes
+CODEC_NONE = b"n"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+
+def compress_bytes(data: bytes, codec: str) -> bytes:
+    """Compress ``data`` with ``codec`` and prefix the codec marker."""
+    if codec == "zstd" and HAS_ZSTD:
+        return CODEC_ZSTD + zstandard.ZstdCompressor().compress(data)  # type: ignore[union-attr]  # noqa: E501
+    if codec in ("zlib", "zstd"):
+        return CODEC_ZLIB + zlib.compress(data)
+    return CODEC_NONE + data
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    """Reverse ``compress_bytes`` using the stored codec marker."""
+    marker, body = data[:1], data[1:]
+    if marker == CODEC_ZLIB:
+        return zlib.decompress(body)
+    if marker == CODEC_ZSTD:
+        if not HAS_ZSTD:
+            raise ValueError("zstandard is required to read this value")
+        return zstandard.ZstdDecompressor().decompress(body)  # type: ignore[union-attr]  # noqa: E501
+    return body
+
+
+class CompressedJSONField(models.BinaryField):
+    """
+    JSON value stored as compressed bytes.
+
+    The codec is chosen by the ``PAYLOAD_COMPRESSION`` setting (``zlib``,
+    ``zstd`` or ``none``); values written with any codec remain readable.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if kwargs.get("editable") is True:
+            del kwargs["editable"]
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return json.loads(decompress_bytes(bytes(value)))
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return json.loads(decompress_bytes(bytes(value)))
+        return value
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        data = json.dumps(value, cls=DjangoJSONEncoder).encode("utf-8")
+        return compress_bytes(data, getattr(settings, "PAYLOAD_COMPRESSION", "zlib"))
+
+    def value_to_string(self, obj):
+        return json.dumps(self.value_from_object(obj), cls=DjangoJSONEncoder)
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": forms.JSONField, **kwargs})
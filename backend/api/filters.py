@@ -0,0 +1,89 @@
+"""
+Filter classes for the API.
+"""
+
+import django_filters
+from django import forms
+from rest_framework import filters
+from .models import Property
+from .services.region_cache import RegionCache
+from .utils.postal_codes import extract_postal_code
+
+CP4_LENGTH = 4
+
+
+class CachedRegionField(forms.IntegerField):
+    """Region id validated against RegionCache instead of a query."""
+
+    # Same messages as the ModelChoiceField this replaces
+    default_error_messages = {
+        "invalid": (
+            "Select a valid choice. That choice is not one of the available choices."
+        ),
+        "invalid_choice": (
+            "Select a valid choice. That choice is not one of the available choices."
+        ),
+    }
+
+    def clean(self, value):
+        value = super().clean(value)
+        if value is not None and RegionCache.get(value) is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"], code="invalid_choice"
+            )
+        return value
+
+
+class CachedRegionFilter(django_filters.NumberFilter):
+    field_class = CachedRegionField
+
+
+class PropertyFilter(django_filters.FilterSet):
+    """
+    Property filters.
+
+    Postal code filters compare against the indexed postal code columns,
+    so they are equality lookups instead of scans over ``address``.
+    """
+
+    region = CachedRegionFilter(field_name="region_id")
+    postal_code = django_filters.CharFilter(method="filter_postal_code")
+    postal_code_prefix = django_filters.CharFilter(method="filter_postal_code_prefix")
+
+    class Meta:
+        model = Property
+        fields = ["property_type", "region", "postal_code", "postal_code_prefix"]
+
+    def filter_postal_code(self, queryset, name, value):
+        """Filter by full CP4-CP3 code, e.g. ``1250-096``."""
+        postal_code = extract_postal_code(value)
+        if postal_code is None:
+            return queryset.none()
+        return queryset.filter(postal_code=postal_code)
+
+    def filter_postal_code_prefix(self, queryset, name, value):
+        """Filter by CP4 area, accepting ``1250`` or a full ``1250-096``."""
+        prefix = value.strip()[:CP4_LENGTH]
+        if len(prefix) != CP4_LENGTH or not prefix.isdigit():
+            return queryset.none()
+        return queryset.filter(postal_code_prefix=prefix)
+
+
+class PropertySearchFilter(filters.SearchFilter):
+    """
+    Search filter that routes postal code searches to the indexed columns.
+
+    ``?search=1250-096`` or ``?search=1250`` become equality lookups instead
+    of ``ILIKE`` over every address; any other term searches as usual.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if len(terms) == 1:
+            term = terms[0]
+            postal_code = extract_postal_code(term)
+            if postal_code is not None and len(term) <= len("0000 - 000"):
+                return queryset.filter(postal_code=postal_code)
+            if len(term) == CP4_LENGTH and term.isdigit():
+                return queryset.filter(postal_code_prefix=term)
+        return super().filter_queryset(request, queryset, view)
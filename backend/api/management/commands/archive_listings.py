@@ -0,0 +1,65 @@
+"""
+Management command to move sold and withdrawn listings to the archive table.
+
+Usage:
+    python manage.py archive_listings
+    python manage.py archive_listings --older-than-days 90 --batch-size 1000
+    python manage.py archive_listings --status sold --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from api.services.archive_service import ARCHIVABLE_STATUSES, ArchiveService
+
+
+class Command(BaseCommand):
+    help = "Move inactive (sold/withdrawn) listings to the archive table in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=ARCHIVABLE_STATUSES,
+            help="Listing status to archive (repeatable, default: sold and withdrawn)",
+        )
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=30,
+            help="Only archive listings not updated for this many days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows moved per transaction",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many listings would be archived",
+        )
+
+    def handle(self, *args, **options) -> None:  # type: ignore[override]
+        statuses = options["status"] or list(ARCHIVABLE_STATUSES)
+        older_than_days = options["older_than_days"]
+
+        if options["dry_run"]:
+            count = ArchiveService.get_archivable(statuses, older_than_days).count()
+            self.stdout.write(f"{count} listings would be archived")  # type: ignore[attr-defined]  # noqa: E501
+            return
+
+        moved = ArchiveService.archive(
+            statuses,
+            older_than_days,
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(  # type: ignore[attr-defined]
+            self.style.SUCCESS(f"Archived {moved} listings")
+        )
@@ -0,0 +1,160 @@
+"""
+Management command to load test a running server.
+
+Replays a weighted request mix (see ``api.services.load_test``) and prints
+RPS, p50/p95/p99 latency and error rate per endpoint. Seed the target with
+``seed_dataset`` first for reproducible results.
+
+The API is throttled per user, or per IP for anonymous requests, and a run
+from one machine quickly empties a single bucket. Workers therefore log in
+as the ``--users`` accounts created by ``seed_dataset`` (with the
+``--password`` it was given or printed) and send every request with
+their token. For higher rates, start the target with larger
+``THROTTLE_BUCKET_CAPACITY`` and ``THROTTLE_BUCKET_REFILL_RATE``. The
+command fails when more than ``--max-throttled`` of the requests were
+throttled, since such a run measures the throttle rather than the server.
+
+Usage:
+    python manage.py load_test --base-url http://127.0.0.1:8000 --password <pw>
+    python manage.py load_test --no-auth --concurrency 16 --duration 60
+    python manage.py load_test --no-auth --mix viewport=50,detail=50 --json
+    THROTTLE_BUCKET_REFILL_RATE=1000 python manage.py runserver  # target
+"""
+
+import json
+from django.core.management.base import BaseCommand, CommandError
+from api.services.load_test import DEFAULT_MIX, LoadTest, parse_mix
+from .seed_dataset import LOADTEST_EMAIL
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a realistic request mix against a running server, logged in "
+        "as the seed_dataset load-test accounts. Raise the target's "
+        "THROTTLE_BUCKET_CAPACITY/THROTTLE_BUCKET_REFILL_RATE for high rates; "
+        "runs with more than --max-throttled 429 responses fail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Server to test",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Concurrent clients"
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Seconds to run for"
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=None,
+            help="Stop after this many requests instead of --duration",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{name}={w}" for name, w in DEFAULT_MIX.items()),
+            help="Endpoint weights, e.g. viewport=25,list=20,detail=20",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the request choices"
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=5,
+            help="seed_dataset accounts the workers log in as, one bucket each",
+        )
+        parser.add_argument(
+            "--email", default=None, help="Log every worker in as this account"
+        )
+        parser.add_argument(
+            "--password",
+            default=None,
+            help="Password of the accounts, as given to or printed by seed_dataset",
+        )
+        parser.add_argument(
+            "--no-auth",
+            action="store_true",
+            help="Send anonymous requests only; drops login and write traffic",
+        )
+        parser.add_argument(
+            "--max-throttled",
+            type=float,
+            default=0.05,
+            help="Fail when a larger share of the requests was throttled (429)",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON"
+        )
+
+    def handle(self, *args, **options) -> None:  # type: ignore[override]
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        if options["no_auth"]:
+            credentials = []
+        elif not options["password"]:
+            raise CommandError(
+                "--password is required to log in; pass the one seed_dataset "
+                "printed, or --no-auth for anonymous traffic."
+            )
+        elif options["email"]:
+            credentials = [(options["email"], options["password"])]
+        else:
+            credentials = [
+                (LOADTEST_EMAIL.format(n=n), options["password"])
+                for n in range(1, options["users"] + 1)
+            ]
+
+        load_test = LoadTest(
+            options["base_url"],
+            mix=mix,
+            concurrency=options["concurrency"],
+            duration=options["duration"],
+            max_requests=options["requests"],
+            seed=options["seed"],
+            credentials=credentials,
+        )
+        try:
+            report = load_test.run()
+        except Exception as e:
+            raise CommandError(f"Load test failed: {e}") from e
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_table(report)
+
+        if report["throttled_share"] > options["max_throttled"]:
+            raise CommandError(
+                f"{report['throttled_share']:.1%} of the requests were throttled "
+                "(429), so the results measure the throttle. Log in with more "
+                "--users or raise THROTTLE_BUCKET_CAPACITY and "
+                "THROTTLE_BUCKET_REFILL_RATE on the server."
+            )
+
+    def write_table(self, report: dict) -> None:
+        def ms(value):
+            return "-" if value is None else f"{value:.1f}"
+
+        self.stdout.write(
+            f"{report['base_url']}: {report['concurrency']} clients, "
+            f"{report['elapsed_s']}s, {report['throttled_share']:.1%} throttled"
+        )
+        if report["skipped"]:
+            self.stdout.write(f"No targets for: {', '.join(report['skipped'])}")
+        self.stdout.write(
+            f"{'endpoint':<10} {'requests':>8} {'rps':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        rows = list(report["endpoints"].items()) + [("total", report["total"])]
+        for name, summary in rows:
+            self.stdout.write(
+                f"{name:<10} {summary['requests']:>8} {summary['rps']:>8.1f} "
+                f"{ms(summary['p50_ms']):>8} {ms(summary['p95_ms']):>8} "
+                f"{ms(summary['p99_ms']):>8} {summary['error_rate']:>7.1%}"
+            )
@@ -0,0 +1,40 @@
+"""
+Management command to profile the memory of another management command.
+
+Runs the command under tracemalloc and prints its peak and retained memory
+and the source lines retaining the most (see core.memory).
+
+Usage:
+    python manage.py profile_memory archive_listings
+    python manage.py profile_memory --top 20 seed_dataset --size 50000
+"""
+
+import argparse
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from core.memory import memory_profile
+
+
+class Command(BaseCommand):
+    help = "Run a management command under tracemalloc and report its memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Number of top retaining source lines to show",
+        )
+        parser.add_argument("command_name", help="Command to profile")
+        parser.add_argument(
+            "command_args",
+            nargs=argparse.REMAINDER,
+            help="Arguments passed to the command",
+        )
+
+    def handle(self, *args, **options) -> None:  # type: ignore[override]
+        with memory_profile(top=options["top"]) as profile:
+            call_command(
+                options["command_name"], *options["command_args"], stdout=self.stdout
+            )
+        self.stdout.write(profile.format())
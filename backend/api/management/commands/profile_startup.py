@@ -0,0 +1,148 @@
+"""
+Management command to profile process startup time.
+
+Starts a fresh interpreter with ``-X importtime`` for each target and
+reports its wall time, the slowest imports and the import time spent per
+top-level package.
+
+Targets:
+    wsgi    import core.wsgi (what every gunicorn worker does)
+    manage  manage.py check (baseline of short-lived management commands)
+    celery  load the Celery app and its task modules
+
+Usage:
+    python manage.py profile_startup
+    python manage.py profile_startup --target wsgi --top 30
+    python manage.py profile_startup --repeat 5
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TARGETS = {
+    "wsgi": ["-c", "import core.wsgi"],
+    "manage": ["manage.py", "check"],
+    "celery": [
+        "-c",
+        "import django; django.setup(); from core.celery import app; "
+        "app.loader.import_default_modules()",
+    ],
+}
+
+
+class ImportTiming(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parse ``-X importtime`` output into timings.
+
+    Lines look like ``import time:   self |  cumulative |   name`` where the
+    name is indented by two spaces per nesting level.
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|", 2)
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Header line or foreign output
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append(
+            ImportTiming(name.strip(), int(fields[0]), int(fields[1]), depth)
+        )
+    return timings
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Sum self time per top-level package, slowest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.name.split(".")[0]] += timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+class Command(BaseCommand):
+    help = "Report interpreter startup and import-time breakdown of entry points"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            choices=sorted(TARGETS),
+            help="Entry point to profile (repeatable, default: wsgi and manage)",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Number of slowest imports and packages to list",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per target; the run with median wall time is reported",
+        )
+
+    def run_target(self, target: str):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *TARGETS[target]],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            raise CommandError(
+                f"{target} exited with {result.returncode}:\n" + result.stderr[-2000:]
+            )
+        return elapsed, parse_importtime(result.stderr)
+
+    def handle(self, *args, **options) -> None:  # type: ignore[override]
+        top = options["top"]
+        for target in options["target"] or ["wsgi", "manage"]:
+            runs = sorted(
+                (self.run_target(target) for _ in range(max(1, options["repeat"]))),
+                key=lambda run: run[0],
+            )
+            elapsed, timings = runs[len(runs) // 2]
+            total_ms = sum(t.self_us for t in timings) / 1000
+            walls = [run[0] * 1000 for run in runs]
+
+            self.stdout.write(  # type: ignore[attr-defined]
+                self.style.MIGRATE_HEADING(
+                    f"{target}: {elapsed * 1000:.0f} ms wall "
+                    f"(min {min(walls):.0f}, median {statistics.median(walls):.0f}), "
+                    f"{total_ms:.0f} ms in {len(timings)} imports"
+                )
+            )
+
+            self.stdout.write("  Slowest imports (self / cumulative ms):")  # type: ignore[attr-defined]  # noqa: E501
+            slowest = sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]
+            for timing in slowest:
+                self.stdout.write(  # type: ignore[attr-defined]
+                    f"    {timing.self_us / 1000:8.1f}"
+                    f" {timing.cumulative_us / 1000:8.1f}  {timing.name}"
+                )
+
+            self.stdout.write("  Import time by package (ms):")  # type: ignore[attr-defined]  # noqa: E501
+            for package, self_us in list(by_package(timings).items())[:top]:
+                self.stdout.write(f"    {self_us / 1000:8.1f}  {package}")  # type: ignore[attr-defined]  # noqa: E501
@@ -0,0 +1,21 @@
+"""
+Management command to print a signed ``X-Profile`` header value.
+
+Requests sent with the header are profiled without staff credentials; the
+token expires after ``PROFILING_TOKEN_MAX_AGE`` seconds (see core.profiling).
+
+Usage:
+    python manage.py profile_token
+    curl -H "X-Profile: $(python manage.py profile_token)" \\
+        .../api/properties/price_range/
+"""
+
+from django.core.management.base import BaseCommand
+from core.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed X-Profile header value for profiling one request"
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
@@ -9,15 +9,6 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from api.models import Region, Property
 
-# Try to import PostGIS Point, fallback if not available
-try:
-    from django.contrib.gis.geos import Point
-
-    HAS_POSTGIS = True
-except (ImportError, Exception):
-    HAS_POSTGIS = False
-    Point = None
-
 
 class Command(BaseCommand):
     help = "Seed initial data (regions and sample properties) for testing"
@@ -0,0 +1,97 @@
+"""
+Management command to generate a reproducible synthetic dataset.
+
+Creates the synthetic regions, ``--size`` listings determined by
+``--seed``, and ``--users`` accounts for authenticated load-test traffic
+(``loadtest<n>@example.com``). ``load_test`` logs its workers in as these
+accounts, so each gets its own throttle bucket. Running it again with the
+same options leaves the same dataset.
+
+The accounts get the ``--password`` given, or a random one that is
+printed. Since it creates accounts, the command refuses to run with
+``DEBUG`` off unless ``--force`` is given.
+
+Usage:
+    python manage.py seed_dataset
+    python manage.py seed_dataset --size 100000 --seed 1 --users 20
+    python manage.py seed_dataset --force --password <secret>  # staging
+"""
+
+import secrets
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from api.services.synthetic_data import SyntheticData
+
+LOADTEST_EMAIL = "loadtest{n}@example.com"
+
+
+class Command(BaseCommand):
+    help = "Generate a seeded synthetic dataset for benchmarks and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size", type=int, default=10_000, help="Number of listings"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated listings"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Listings per upsert"
+        )
+        parser.add_argument(
+            "--raw-data-size",
+            type=int,
+            default=20,
+            help="Extra attributes in each listing's raw_data payload",
+        )
+        parser.add_argument(
+            "--users", type=int, default=5, help="Load-test accounts to create"
+        )
+        parser.add_argument(
+            "--password",
+            default=None,
+            help="Password of the load-test accounts; random and printed if unset",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Seed even though DEBUG is off",
+        )
+
+    def handle(self, *args, **options) -> None:  # type: ignore[override]
+        if not (settings.DEBUG or options["force"]):
+            raise CommandError(
+                "seed_dataset adds synthetic listings and load-test accounts; "
+                "it only runs with DEBUG on unless --force is given."
+            )
+
+        written = SyntheticData.generate(
+            options["size"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            raw_data_size=options["raw_data_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {written} listings (seed {options['seed']})."
+            )
+        )
+
+        if not options["users"]:
+            return
+        password = options["password"] or secrets.token_urlsafe(12)
+        User = get_user_model()
+        for n in range(1, options["users"] + 1):
+            email = LOADTEST_EMAIL.format(n=n)
+            user = User.objects.filter(email=email).first()
+            if user is None:
+                user = User(email=email, username=f"loadtest{n}")
+            user.set_password(password)
+            user.save()
+        self.stdout.write(
+            f"Load-test accounts: {LOADTEST_EMAIL.format(n=1)} .. "
+            f"{LOADTEST_EMAIL.format(n=options['users'])}"
+        )
+        if not options["password"]:
+            self.stdout.write(f"Load-test password: {password}")
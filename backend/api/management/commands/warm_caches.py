@@ -0,0 +1,69 @@
+"""
+Management command to warm the read caches after a deploy.
+
+Replays the most frequent recorded list/search/region query shapes through
+the API views, filling the region, fragment and response caches.
+
+Usage:
+    python manage.py warm_caches
+    python manage.py warm_caches --limit 100 --concurrency 8
+    python manage.py warm_caches --async
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.services.cache_warming import CacheWarmer, QueryShapeLog
+
+
+class Command(BaseCommand):
+    help = "Replay the most frequent API query shapes to populate cold caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=settings.CACHE_WARMING_LIMIT,
+            help="Number of most frequent query shapes to replay",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.CACHE_WARMING_CONCURRENCY,
+            help="Maximum number of replayed requests in flight",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the warm_caches Celery task instead of running inline",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="Only print the query shapes that would be replayed",
+        )
+
+    def handle(self, *args, **options) -> None:  # type: ignore[override]
+        limit = options["limit"]
+        concurrency = options["concurrency"]
+
+        if options["list"]:
+            for url, params in QueryShapeLog.top(limit):
+                query = "&".join(f"{key}={value}" for key, value in params)
+                self.stdout.write(f"{url}?{query}" if query else url)  # type: ignore[attr-defined]  # noqa: E501
+            return
+
+        if options["run_async"]:
+            from api.tasks import warm_caches
+
+            result = warm_caches.delay(limit, concurrency)
+            self.stdout.write(f"Queued cache warming task {result.id}")  # type: ignore[attr-defined]  # noqa: E501
+            return
+
+        summary = CacheWarmer.warm(limit, concurrency)
+        self.stdout.write(  # type: ignore[attr-defined]
+            self.style.SUCCESS(
+                f"Warmed {summary['warmed']} query shapes "
+                f"({summary['failed']} failed)"
+            )
+        )
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_sync_runs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('coordinates', models.JSONField(help_text='Coordinates as [longitude, latitude]')),
+                ('source', models.CharField(help_text='Gazetteer level that resolved the key', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Geocode cache entries',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_geocode_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="postal_code",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="CP4-CP3 postal code extracted from the address",
+                max_length=8,
+            ),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="postal_code_prefix",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="CP4 part of the postal code",
+                max_length=4,
+            ),
+        ),
+    ]
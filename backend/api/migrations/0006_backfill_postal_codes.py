@@ -0,0 +1,42 @@
+# Backfills Property.postal_code in primary-key chunks so large tables are
+# never locked by one long transaction.
+
+from django.db import migrations, transaction
+
+from api.utils.postal_codes import extract_postal_code, postal_code_prefix
+
+BATCH_SIZE = 2000
+
+
+def backfill_postal_codes(apps, schema_editor):
+    Property = apps.get_model("api", "Property")
+    last_pk = 0
+    while True:
+        batch = list(
+            Property.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "address")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        for obj in batch:
+            postal_code = extract_postal_code(obj.address)
+            obj.postal_code = postal_code or ""
+            obj.postal_code_prefix = postal_code_prefix(postal_code) or ""
+        with transaction.atomic():
+            Property.objects.bulk_update(batch, ["postal_code", "postal_code_prefix"])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("api", "0005_property_postal_code"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_postal_codes, migrations.RunPython.noop),
+    ]
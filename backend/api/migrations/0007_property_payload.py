@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:45
+
+import api.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_backfill_postal_codes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyPayload",
+            fields=[
+                (
+                    "property",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="payload",
+                        serialize=False,
+                        to="api.property",
+                    ),
+                ),
+                (
+                    "description",
+                    models.TextField(blank=True, help_text="Property description"),
+                ),
+                (
+                    "images",
+                    models.JSONField(
+                        blank=True, default=list, help_text="Array of image URLs"
+                    ),
+                ),
+                (
+                    "raw_data",
+                    api.fields.CompressedJSONField(
+                        blank=True, default=dict, help_text="Upstream listing payload"
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Copies description, images and raw_data into PropertyPayload in
+# primary-key chunks, committing each chunk separately.
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def copy_payloads(apps, schema_editor):
+    Property = apps.get_model("api", "Property")
+    PropertyPayload = apps.get_model("api", "PropertyPayload")
+    last_pk = 0
+    while True:
+        batch = list(
+            Property.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values("pk", "description", "images", "raw_data")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        with transaction.atomic():
+            PropertyPayload.objects.bulk_create(
+                [
+                    PropertyPayload(
+                        property_id=row["pk"],
+                        description=row["description"] or "",
+                        images=row["images"] or [],
+                        raw_data=row["raw_data"] or {},
+                    )
+                    for row in batch
+                ],
+                ignore_conflicts=True,
+            )
+        last_pk = batch[-1]["pk"]
+
+
+def restore_payloads(apps, schema_editor):
+    Property = apps.get_model("api", "Property")
+    PropertyPayload = apps.get_model("api", "PropertyPayload")
+    for payload in PropertyPayload.objects.iterator(chunk_size=BATCH_SIZE):
+        Property.objects.filter(pk=payload.property_id).update(
+            description=payload.description,
+            images=payload.images,
+            raw_data=payload.raw_data,
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("api", "0007_property_payload"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_payloads, restore_payloads),
+    ]
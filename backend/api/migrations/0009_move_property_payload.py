@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_copy_property_payloads"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="property",
+            name="description",
+        ),
+        migrations.RemoveField(
+            model_name="property",
+            name="images",
+        ),
+        migrations.RemoveField(
+            model_name="property",
+            name="raw_data",
+        ),
+    ]
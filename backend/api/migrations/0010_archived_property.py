@@ -0,0 +1,113 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:50
+
+import api.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_move_property_payload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedProperty",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "original_id",
+                    models.BigIntegerField(
+                        help_text="Primary key the listing had as a Property",
+                        unique=True,
+                    ),
+                ),
+                (
+                    "external_id",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("address", models.CharField(max_length=255)),
+                (
+                    "postal_code",
+                    models.CharField(blank=True, db_index=True, max_length=8),
+                ),
+                ("coordinates", models.JSONField(blank=True, null=True)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("size_sqm", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "property_type",
+                    models.CharField(
+                        choices=[
+                            ("apartment", "Apartment"),
+                            ("house", "House"),
+                            ("land", "Land"),
+                            ("commercial", "Commercial"),
+                            ("mixed", "Mixed Use"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("bedrooms", models.IntegerField(blank=True, null=True)),
+                (
+                    "listing_status",
+                    models.CharField(
+                        choices=[
+                            ("active", "Active"),
+                            ("sold", "Sold"),
+                            ("pending", "Pending"),
+                            ("withdrawn", "Withdrawn"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "data",
+                    api.fields.CompressedJSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Remaining listing attributes",
+                    ),
+                ),
+                (
+                    "listed_at",
+                    models.DateTimeField(
+                        help_text="created_at of the original listing"
+                    ),
+                ),
+                (
+                    "last_updated_at",
+                    models.DateTimeField(
+                        help_text="updated_at of the original listing"
+                    ),
+                ),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "region",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="api.region",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Archived properties",
+                "ordering": ["-archived_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["external_id"], name="api_archive_externa_19414e_idx"
+                    )
+                ],
+            },
+        ),
+    ]
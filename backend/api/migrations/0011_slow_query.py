@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_archived_property"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveIntegerField(unique=True)),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        db_index=True, help_text="Hash of the SQL shape", max_length=40
+                    ),
+                ),
+                ("sql", models.TextField()),
+                ("params", models.JSONField(blank=True, default=list)),
+                ("duration_ms", models.FloatField()),
+                ("database", models.CharField(max_length=50)),
+                (
+                    "source",
+                    models.CharField(
+                        blank=True,
+                        help_text="Innermost application frame",
+                        max_length=255,
+                    ),
+                ),
+                ("stack", models.TextField(blank=True)),
+                ("plan", models.TextField(blank=True)),
+                ("captured_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "Slow queries",
+                "ordering": ["-captured_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_slow_query"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="source",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Ingestion source the listing was synced from",
+                max_length=50,
+            ),
+        ),
+    ]
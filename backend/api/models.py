@@ -1,20 +1,10 @@
 from django.db import models
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from decimal import Decimal
 from typing import Optional
-
-# Try to use PostGIS, fallback to regular models if not available
-# Note: This import will fail if GDAL is not installed, but we catch it
-try:
-    from django.contrib.gis.db import models as gis_models
-    from django.contrib.gis.geos import Point
-
-    HAS_POSTGIS = True
-except (ImportError, Exception):
-    # If PostGIS/GDAL is not available, use regular models
-    HAS_POSTGIS = False
-    gis_models = models
-    Point = None
+from .fields import CompressedJSONField
+from .utils.postal_codes import extract_postal_code, postal_code_prefix
 
 
 class Region(models.Model):
@@ -83,12 +73,25 @@ class Property(models.Model):
     # Basic Information
     external_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
     address = models.CharField(max_length=255)
+    postal_code = models.CharField(
+        max_length=8,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="CP4-CP3 postal code extracted from the address",
+    )
+    postal_code_prefix = models.CharField(
+        max_length=4,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="CP4 part of the postal code",
+    )
     # Always use JSONField in database for compatibility
     # PostGIS PointField conversion handled in serializer/application code
     coordinates = models.JSONField(
         null=True, blank=True, help_text="Coordinates as [longitude, latitude]"
     )
-    description = models.TextField(blank=True, help_text="Property description")
 
     # Pricing & Size
     price = models.DecimalField(max_digits=12, decimal_places=2)
@@ -144,15 +147,17 @@ class Property(models.Model):
     last_synced_at = models.DateTimeField(
         null=True, blank=True, help_text="Last time data was synced from source"
     )
+    source = models.CharField(
+        max_length=50,
+        blank=True,
+        db_index=True,
+        help_text="Ingestion source the listing was synced from",
+    )
 
     # Relationships
     region = models.ForeignKey(Region, on_delete=models.SET_NULL, null=True, blank=True)
 
-    # Images (stored as JSON array of URLs)
-    images = models.JSONField(default=list, blank=True, help_text="Array of image URLs")
-
-    # Additional Data
-    raw_data = models.JSONField(default=dict, blank=True)
+    # Description, images and raw_data live in PropertyPayload (see below)
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -165,6 +170,69 @@ class Property(models.Model):
     def __str__(self) -> str:
         return f"{self.address} - €{self.price}"
 
+    def save(self, *args, **kwargs):
+        self.set_postal_code()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "address" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {
+                "postal_code",
+                "postal_code_prefix",
+            }
+        super().save(*args, **kwargs)
+
+        if getattr(self, "_payload_dirty", False):
+            payload = self.get_payload()
+            payload.property = self
+            payload.save()
+            self._payload_dirty = False
+
+    def get_payload(self) -> "PropertyPayload":
+        """
+        Return the payload row, loading it on first access.
+
+        Properties without a stored payload get an unsaved one with defaults.
+        """
+        try:
+            return self.payload  # type: ignore[attr-defined]
+        except ObjectDoesNotExist:
+            payload = PropertyPayload(property=self)
+            self.payload = payload  # type: ignore[attr-defined]
+            return payload
+
+    def _set_payload_value(self, name: str, value) -> None:
+        setattr(self.get_payload(), name, value)
+        self._payload_dirty = True
+
+    @property
+    def description(self) -> str:
+        return self.get_payload().description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._set_payload_value("description", value)
+
+    @property
+    def images(self) -> list:
+        return self.get_payload().images
+
+    @images.setter
+    def images(self, value: list) -> None:
+        self._set_payload_value("images", value)
+
+    @property
+    def raw_data(self) -> dict:
+        return self.get_payload().raw_data
+
+    @raw_data.setter
+    def raw_data(self, value: dict) -> None:
+        self._set_payload_value("raw_data", value)
+
+    def set_postal_code(self) -> None:
+        """Derive the indexed postal code columns from the address."""
+        postal_code = extract_postal_code(self.address)
+        self.postal_code = postal_code or ""
+        self.postal_code_prefix = postal_code_prefix(postal_code) or ""
+
     @property
     def price_per_sqm(self) -> Optional[Decimal]:
         """Calculate price per square meter."""
@@ -193,15 +261,72 @@ class Property(models.Model):
             ]  # type: ignore[attr-defined]
 
         # Handle JSONField (already a list [longitude, latitude])
-        if (
-            isinstance(self.coordinates, (list, tuple))
-            and len(self.coordinates) >= 2
-        ):
+        if isinstance(self.coordinates, (list, tuple)) and len(self.coordinates) >= 2:
             return [float(self.coordinates[0]), float(self.coordinates[1])]
 
         return None
 
 
+class PropertyPayload(models.Model):
+    """
+    Bulky per-listing data kept out of the hot Property row.
+
+    List queries and filters only scan the narrow property table; this row is
+    loaded on detail views and the admin form.
+    """
+
+    property = models.OneToOneField(
+        Property, on_delete=models.CASCADE, primary_key=True, related_name="payload"
+    )
+    description = models.TextField(blank=True, help_text="Property description")
+    images = models.JSONField(default=list, blank=True, help_text="Array of image URLs")
+    raw_data = CompressedJSONField(
+        default=dict, blank=True, help_text="Upstream listing payload"
+    )
+
+    def __str__(self) -> str:
+        return f"Payload for property {self.pk}"
+
+
+class ArchivedProperty(models.Model):
+    """
+    Sold or withdrawn listing moved out of the hot property table.
+
+    Commonly queried columns are kept as real fields; every other attribute,
+    including the payload, is folded into the compressed ``data`` column.
+    """
+
+    original_id = models.BigIntegerField(
+        unique=True, help_text="Primary key the listing had as a Property"
+    )
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+    address = models.CharField(max_length=255)
+    postal_code = models.CharField(max_length=8, blank=True, db_index=True)
+    coordinates = models.JSONField(null=True, blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    size_sqm = models.DecimalField(max_digits=10, decimal_places=2)
+    property_type = models.CharField(max_length=20, choices=Property.PROPERTY_TYPES)
+    bedrooms = models.IntegerField(null=True, blank=True)
+    listing_status = models.CharField(max_length=20, choices=Property.LISTING_STATUS)
+    region = models.ForeignKey(Region, on_delete=models.SET_NULL, null=True, blank=True)
+    data = CompressedJSONField(
+        default=dict, blank=True, help_text="Remaining listing attributes"
+    )
+    listed_at = models.DateTimeField(help_text="created_at of the original listing")
+    last_updated_at = models.DateTimeField(
+        help_text="updated_at of the original listing"
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-archived_at"]
+        verbose_name_plural = "Archived properties"
+        indexes = [models.Index(fields=["external_id"])]
+
+    def __str__(self) -> str:
+        return f"{self.address} ({self.listing_status}, archived)"
+
+
 class SavedProperty(models.Model):
     """User's saved properties with notes."""
 
@@ -225,3 +350,100 @@ class SavedProperty(models.Model):
         return (
             f"{self.user.email} - {self.property.address}"  # type: ignore[attr-defined]
         )
+
+
+class SyncRun(models.Model):
+    """One ingestion sync of a listing source, split into chunks."""
+
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("finalizing", "Finalizing"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    source = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    rows_upserted = models.IntegerField(default=0)  # type: ignore[assignment]
+    rows_withdrawn = models.IntegerField(default=0)  # type: ignore[assignment]
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self) -> str:
+        return f"{self.source} sync #{self.pk} ({self.status})"
+
+
+class SyncChunk(models.Model):
+    """A region or page-range slice of a sync, processed by one worker task."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    run = models.ForeignKey(SyncRun, on_delete=models.CASCADE, related_name="chunks")
+    key = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    rows = models.IntegerField(default=0)  # type: ignore[assignment]
+    attempts = models.IntegerField(default=0)  # type: ignore[assignment]
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["run", "key"]
+        unique_together = ["run", "key"]
+
+    def __str__(self) -> str:
+        return f"{self.run_id}:{self.key} ({self.status})"  # type: ignore[attr-defined]
+
+
+class GeocodeCacheEntry(models.Model):
+    """Persistent memo of resolved address keys to coordinates."""
+
+    key = models.CharField(max_length=255, unique=True)
+    coordinates = models.JSONField(help_text="Coordinates as [longitude, latitude]")
+    source = models.CharField(
+        max_length=20, help_text="Gazetteer level that resolved the key"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Geocode cache entries"
+
+    def __str__(self) -> str:
+        return f"{self.key} -> {self.coordinates}"
+
+
+class SlowQuery(models.Model):
+    """
+    A query that exceeded ``SLOW_QUERY_THRESHOLD_MS``, with its plan.
+
+    Rows form a ring buffer of ``SLOW_QUERY_LOG_SIZE`` slots: each capture
+    overwrites the oldest slot, so the table never grows past that size.
+    """
+
+    slot = models.PositiveIntegerField(unique=True)
+    fingerprint = models.CharField(
+        max_length=40, db_index=True, help_text="Hash of the SQL shape"
+    )
+    sql = models.TextField()
+    params = models.JSONField(default=list, blank=True)
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=50)
+    source = models.CharField(
+        max_length=255, blank=True, help_text="Innermost application frame"
+    )
+    stack = models.TextField(blank=True)
+    plan = models.TextField(blank=True)
+    captured_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-captured_at"]
+        verbose_name_plural = "Slow queries"
+
+    def __str__(self) -> str:
+        return f"{self.duration_ms:.0f} ms: {self.sql[:80]}"
@@ -1,19 +1,41 @@
 from rest_framework import serializers
-from ..models import Property, Region
+from core.timing import TimedListSerializer, TimedSerializerMixin
+from ..models import ArchivedProperty, Property, Region
+from ..services.region_cache import RegionCache
 
 
-class RegionSerializer(serializers.ModelSerializer):
+class RegionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Region serializer."""
 
     class Meta:
         model = Region
+        list_serializer_class = TimedListSerializer
         fields = ["id", "name", "code", "avg_price_per_sqm", "avg_rent", "avg_yield"]
 
 
-class PropertySerializer(serializers.ModelSerializer):
+class CachedRegionField(serializers.Field):
+    """
+    Read-only nested region resolved from RegionCache by ``region_id``.
+
+    Serializing many properties issues no region queries.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "region_id")
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        region = RegionCache.get(value)
+        if region is None:
+            return None
+        return RegionSerializer(region).data
+
+
+class PropertySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Property serializer with region details."""
 
-    region = RegionSerializer(read_only=True)
+    region = CachedRegionField()
     region_id = serializers.PrimaryKeyRelatedField(
         queryset=Region.objects.all(),  # type: ignore[attr-defined]
         source="region",
@@ -22,14 +44,22 @@ class PropertySerializer(serializers.ModelSerializer):
     )
     coordinates = serializers.SerializerMethodField()
     price_per_sqm = serializers.SerializerMethodField()
+    # Stored in PropertyPayload and exposed through Property accessors
+    description = serializers.CharField(required=False, allow_blank=True)
+    images = serializers.ListField(
+        child=serializers.CharField(), required=False, help_text="Array of image URLs"
+    )
+    raw_data = serializers.JSONField(required=False)
 
     class Meta:
         model = Property
+        list_serializer_class = TimedListSerializer
         fields = [
             # Basic Information
             "id",
             "external_id",
             "address",
+            "postal_code",
             "coordinates",
             "description",
             # Pricing & Size
@@ -67,7 +97,7 @@ class PropertySerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "created_at", "updated_at"]
+        read_only_fields = ["id", "postal_code", "created_at", "updated_at"]
 
     def get_coordinates(self, obj):
         """Return coordinates as [longitude, latitude]."""
@@ -80,3 +110,61 @@ class PropertySerializer(serializers.ModelSerializer):
         if price_per_sqm:
             return str(price_per_sqm)
         return None
+
+
+class PropertyListSerializer(PropertySerializer):
+    """
+    Property serializer for list endpoints.
+
+    Omits the PropertyPayload fields so list pages never load the side table.
+    """
+
+    class Meta(PropertySerializer.Meta):
+        fields = [
+            field
+            for field in PropertySerializer.Meta.fields
+            if field not in ("description", "images", "raw_data")
+        ]
+
+
+class ArchivedPropertySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Read-only serializer for archived listings."""
+
+    id = serializers.IntegerField(source="original_id", read_only=True)
+    region = CachedRegionField()
+
+    class Meta:
+        model = ArchivedProperty
+        list_serializer_class = TimedListSerializer
+        fields = [
+            "id",
+            "external_id",
+            "address",
+            "postal_code",
+            "coordinates",
+            "price",
+            "size_sqm",
+            "property_type",
+            "bedrooms",
+            "listing_status",
+            "region",
+            "data",
+            "listed_at",
+            "last_updated_at",
+            "archived_at",
+        ]
+        read_only_fields = fields
+
+
+class ArchivedPropertyListSerializer(ArchivedPropertySerializer):
+    """
+    Archived listing serializer for list endpoints.
+
+    Omits the compressed ``data`` blob, which list pages defer loading.
+    """
+
+    class Meta(ArchivedPropertySerializer.Meta):
+        fields = [
+            field for field in ArchivedPropertySerializer.Meta.fields if field != "data"
+        ]
+        read_only_fields = fields
@@ -0,0 +1,136 @@
+"""
+Archive service for inactive listings.
+
+Sold and withdrawn listings are moved out of the hot property table into
+``ArchivedProperty`` in small batches, so default reads only scan listings
+that can still be acted on while history stays queryable.
+"""
+
+from datetime import timedelta
+from typing import Iterable, List, Optional
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.utils import timezone
+from ..models import ArchivedProperty, Property, SavedProperty
+from .response_cache import PROPERTIES_SCOPE, ResponseCache
+
+ARCHIVABLE_STATUSES = ("sold", "withdrawn")
+
+# Attributes folded into ArchivedProperty.data
+ARCHIVED_DATA_FIELDS = [
+    "bathrooms",
+    "year_built",
+    "condition",
+    "floor_number",
+    "total_floors",
+    "has_elevator",
+    "parking_spaces",
+    "has_balcony",
+    "has_terrace",
+    "energy_rating",
+    "source_url",
+    "last_synced_at",
+]
+
+
+class ArchiveService:
+    """Service for moving inactive listings to the archive table."""
+
+    @staticmethod
+    def get_archivable(
+        statuses: Iterable[str] = ARCHIVABLE_STATUSES, older_than_days: int = 30
+    ) -> QuerySet[Property]:
+        """
+        Return listings eligible for archiving.
+
+        Listings saved by a user stay in the hot table so saved lists and
+        their notes keep working.
+        """
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        saved = SavedProperty.objects.filter(  # type: ignore[attr-defined]
+            property=OuterRef("pk")
+        )
+        return Property.objects.filter(  # type: ignore[attr-defined]
+            ~Exists(saved),
+            listing_status__in=list(statuses),
+            updated_at__lt=cutoff,
+        )
+
+    @staticmethod
+    def to_archived(property_obj: Property) -> ArchivedProperty:
+        """Build the archive row for a property, payload included."""
+        data = {field: getattr(property_obj, field) for field in ARCHIVED_DATA_FIELDS}
+        data.update(
+            description=property_obj.description,
+            images=property_obj.images,
+            raw_data=property_obj.raw_data,
+        )
+        return ArchivedProperty(
+            original_id=property_obj.pk,
+            external_id=property_obj.external_id,
+            address=property_obj.address,
+            postal_code=property_obj.postal_code,
+            coordinates=property_obj.coordinates,
+            price=property_obj.price,
+            size_sqm=property_obj.size_sqm,
+            property_type=property_obj.property_type,
+            bedrooms=property_obj.bedrooms,
+            listing_status=property_obj.listing_status,
+            region_id=property_obj.region_id,  # type: ignore[attr-defined]
+            data=data,
+            listed_at=property_obj.created_at,
+            last_updated_at=property_obj.updated_at,
+        )
+
+    @staticmethod
+    def archive_batch(
+        statuses: Iterable[str] = ARCHIVABLE_STATUSES,
+        older_than_days: int = 30,
+        batch_size: int = 500,
+    ) -> int:
+        """
+        Move one batch of archivable listings; returns how many were moved.
+
+        The copy and the delete commit together, and rows locked by another
+        mover are skipped, so concurrent runs never archive a row twice.
+        """
+        with transaction.atomic():
+            ids: List[int] = list(
+                ArchiveService.get_archivable(statuses, older_than_days)
+                .order_by("pk")
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+
+            batch = Property.objects.filter(pk__in=ids).select_related(  # type: ignore[attr-defined]  # noqa: E501
+                "payload"
+            )
+            ArchivedProperty.objects.bulk_create(  # type: ignore[attr-defined]
+                [ArchiveService.to_archived(obj) for obj in batch],
+                ignore_conflicts=True,
+            )
+            # One cache bump for the batch, not one per deleted row
+            with ResponseCache.bulk_write(PROPERTIES_SCOPE):
+                Property.objects.filter(pk__in=ids).delete()  # type: ignore[attr-defined]  # noqa: E501
+        return len(ids)
+
+    @staticmethod
+    def archive(
+        statuses: Iterable[str] = ARCHIVABLE_STATUSES,
+        older_than_days: int = 30,
+        batch_size: int = 500,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """Archive batches until none are left (or ``max_batches`` is hit)."""
+        statuses = list(statuses)
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = ArchiveService.archive_batch(statuses, older_than_days, batch_size)
+            if not moved:
+                break
+            total += moved
+            batches += 1
+        return total
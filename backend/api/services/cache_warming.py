@@ -0,0 +1,190 @@
+"""
+Post-deploy cache warming.
+
+Cached read actions record a sample of their normalized query shapes
+(absolute path plus sorted query parameters) with a hit counter in the
+shared cache. ``CacheWarmer`` replays the most frequent shapes through the
+real views, which fills the response, fragment and region caches exactly
+as user traffic would, but before the traffic arrives.
+"""
+
+import logging
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from ..utils.lru import LRUCache
+from .region_cache import RegionCache
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+SHAPES_KEY = "warming:shapes"
+SHAPES_LOCK_KEY = "warming:shapes:lock"
+COUNT_KEY = "warming:count:{digest}"
+
+# Header marking replayed requests so they are not counted as traffic
+WARMING_HEADER = "HTTP_X_CACHE_WARMING"
+# Request attribute set by replay(); unlike the header, clients can't send it
+WARMING_ATTRIBUTE = "cache_warming"
+
+Shape = Tuple[str, List[Tuple[str, str]]]
+
+
+class QueryShapeLog:
+    """Sampled, cache-backed counter of request shapes."""
+
+    # Digests this process already registered, to skip the registry write
+    _registered = LRUCache(maxsize=1024)
+
+    @staticmethod
+    def record(url: str, params: Sequence[Tuple[str, str]]) -> None:
+        """Count one request for ``url`` with ``params``, subject to sampling."""
+        rate = getattr(settings, "CACHE_WARMING_SAMPLE_RATE", 0.1)
+        if rate <= 0 or random.random() >= rate:
+            return
+
+        params = sorted((key, value.strip()) for key, value in params)
+        digest = ResponseCache.make_digest(url, params)
+        count_key = COUNT_KEY.format(digest=digest)
+        try:
+            if not cache.add(count_key, 1, timeout=None):
+                cache.incr(count_key)
+            if digest not in QueryShapeLog._registered:
+                if QueryShapeLog._register(digest, url, params):
+                    QueryShapeLog._registered.set(digest, True)
+        except Exception:  # pragma: no cover - logging must never break reads
+            logger.warning("Could not record query shape for %s", url, exc_info=True)
+
+    @staticmethod
+    def _register(digest: str, url: str, params: List[Tuple[str, str]]) -> bool:
+        """
+        Add a shape to the registry; False if another worker held the lock.
+
+        The registry is read, changed and written back under a short
+        ``cache.add`` lock so concurrent workers don't drop each other's
+        shapes. A busy lock is not waited for: the shape is registered by
+        one of its next sampled requests.
+        """
+        token = uuid.uuid4().hex
+        if not cache.add(SHAPES_LOCK_KEY, token, timeout=5):
+            return False
+        try:
+            QueryShapeLog._update_registry(digest, url, params)
+        finally:
+            # Only release our own lock; it may have expired and been retaken
+            if cache.get(SHAPES_LOCK_KEY) == token:
+                cache.delete(SHAPES_LOCK_KEY)
+        return True
+
+    @staticmethod
+    def _update_registry(digest: str, url: str, params: List[Tuple[str, str]]) -> None:
+        shapes = cache.get(SHAPES_KEY) or {}
+        if digest in shapes:
+            return
+        shapes[digest] = (url, params)
+        max_shapes = getattr(settings, "CACHE_WARMING_MAX_SHAPES", 500)
+        if len(shapes) > max_shapes:
+            # Keep the registry bounded by dropping the least requested shapes
+            # but always keep the newcomer so it can accumulate hits
+            counts = QueryShapeLog._counts(shapes)
+            others = sorted(
+                (d for d in shapes if d != digest),
+                key=lambda d: counts.get(d, 0),
+                reverse=True,
+            )
+            keep = set(others[: max_shapes - 1]) | {digest}
+            for dropped in set(shapes) - keep:
+                del shapes[dropped]
+                cache.delete(COUNT_KEY.format(digest=dropped))
+        cache.set(SHAPES_KEY, shapes, timeout=None)
+
+    @staticmethod
+    def _counts(shapes: dict) -> dict:
+        found = cache.get_many([COUNT_KEY.format(digest=d) for d in shapes])
+        return {d: found.get(COUNT_KEY.format(digest=d), 0) for d in shapes}
+
+    @staticmethod
+    def top(limit: int) -> List[Shape]:
+        """Return the ``limit`` most requested shapes, most frequent first."""
+        shapes = cache.get(SHAPES_KEY) or {}
+        counts = QueryShapeLog._counts(shapes)
+        ranked = sorted(shapes, key=lambda d: counts[d], reverse=True)
+        return [shapes[digest] for digest in ranked[:limit]]
+
+    @staticmethod
+    def clear() -> None:
+        shapes = cache.get(SHAPES_KEY) or {}
+        cache.delete_many([COUNT_KEY.format(digest=d) for d in shapes])
+        cache.delete(SHAPES_KEY)
+        QueryShapeLog._registered.clear()
+
+
+def is_warming_request(request) -> bool:
+    """Whether ``request`` is a ``CacheWarmer`` replay."""
+    return getattr(request, WARMING_ATTRIBUTE, False) is True
+
+
+class CacheWarmer:
+    """Replay recorded query shapes to populate the read caches."""
+
+    @staticmethod
+    def replay(shape: Shape) -> bool:
+        """Issue one GET for ``shape`` through its view; True on HTTP 200."""
+        url, params = shape
+        parts = urlsplit(url)
+        try:
+            match = resolve(parts.path)
+        except Resolver404:
+            logger.info("Skipping warm-up of unknown path %s", parts.path)
+            return False
+
+        request = RequestFactory().get(
+            parts.path,
+            params,
+            HTTP_HOST=parts.netloc or "localhost",
+            secure=parts.scheme == "https",
+            **{WARMING_HEADER: "1"},
+        )
+        setattr(request, WARMING_ATTRIBUTE, True)
+        try:
+            response = match.func(request, *match.args, **match.kwargs)
+            return response.status_code == 200
+        except Exception:
+            logger.warning("Warm-up request for %s failed", url, exc_info=True)
+            return False
+
+    @staticmethod
+    def _replay_in_thread(shape: Shape) -> bool:
+        try:
+            return CacheWarmer.replay(shape)
+        finally:
+            # Worker threads open their own connections; do not leak them
+            connections.close_all()
+
+    @staticmethod
+    def warm(limit: int = 50, concurrency: int = 4) -> dict:
+        """
+        Warm the region cache and the ``limit`` most frequent query shapes.
+
+        At most ``concurrency`` requests run at once so warming never
+        competes with live traffic for more than that many connections.
+        Returns counts of warmed and failed shapes.
+        """
+        RegionCache.all()
+        shapes = QueryShapeLog.top(limit)
+
+        if concurrency <= 1:
+            results = [CacheWarmer.replay(shape) for shape in shapes]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(CacheWarmer._replay_in_thread, shapes))
+
+        warmed = sum(results)
+        return {"warmed": warmed, "failed": len(results) - warmed}
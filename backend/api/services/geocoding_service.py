@@ -0,0 +1,249 @@
+"""
+Geocoding service for Portuguese addresses and postal codes.
+
+Addresses are resolved offline against a gazetteer CSV file with the columns
+``postal_code,locality,longitude,latitude``. Results are memoized in two
+tiers: an in-process LRU and the ``GeocodeCacheEntry`` table, so repeated
+imports are served almost entirely from cache. Misses are only remembered
+in the LRU, which is dropped whenever the gazetteer file changes.
+"""
+
+import csv
+import hashlib
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from ..models import GeocodeCacheEntry
+from ..utils.lru import LRUCache
+from ..utils.postal_codes import extract_postal_code, postal_code_prefix
+
+Coordinates = List[float]
+
+# GeocodeCacheEntry.key is a varchar(255); longer keys keep this much text
+KEY_TEXT_LENGTH = 200
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation and whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", ascii_text.lower()).strip()
+
+
+def normalize_address_key(address: Optional[str]) -> Optional[str]:
+    """
+    Build the cache key for an address.
+
+    Addresses carrying a postal code are keyed by the code alone, since that
+    is all the gazetteer resolves them by; others by their normalized text.
+    Long texts are keyed by their SHA-1 followed by their last words, which
+    the locality lookup reads, so keys fit the cache table.
+    """
+    if not address or not address.strip():
+        return None
+
+    postal_code = extract_postal_code(address)
+    if postal_code:
+        return f"cp:{postal_code}"
+    text = normalize_text(address)
+    if len(text) > KEY_TEXT_LENGTH:
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        tail = text[-KEY_TEXT_LENGTH:].partition(" ")[2]
+        return f"addr:{digest} {tail}"
+    return f"addr:{text}"
+
+
+class Gazetteer:
+    """In-memory index of postal codes and localities to coordinates."""
+
+    def __init__(self):
+        self.postal_codes: Dict[str, Coordinates] = {}
+        self.prefixes: Dict[str, Coordinates] = {}
+        self.localities: Dict[str, Coordinates] = {}
+
+    @classmethod
+    def from_csv(cls, path) -> "Gazetteer":
+        """Load a gazetteer file; CP4 and locality entries are centroids."""
+        gazetteer = cls()
+        prefix_points: Dict[str, List[Tuple[float, float]]] = {}
+        locality_points: Dict[str, List[Tuple[float, float]]] = {}
+
+        with Path(path).open(encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                try:
+                    point = (float(row["longitude"]), float(row["latitude"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+                postal_code = extract_postal_code(row.get("postal_code"))
+                if postal_code:
+                    gazetteer.postal_codes[postal_code] = list(point)
+                    prefix_points.setdefault(postal_code[:4], []).append(point)
+
+                locality = normalize_text(row.get("locality") or "")
+                if locality:
+                    locality_points.setdefault(locality, []).append(point)
+
+        gazetteer.prefixes = {
+            key: cls._centroid(points) for key, points in prefix_points.items()
+        }
+        gazetteer.localities = {
+            key: cls._centroid(points) for key, points in locality_points.items()
+        }
+        return gazetteer
+
+    @staticmethod
+    def _centroid(points: List[Tuple[float, float]]) -> Coordinates:
+        return [
+            round(sum(p[0] for p in points) / len(points), 6),
+            round(sum(p[1] for p in points) / len(points), 6),
+        ]
+
+    def resolve(self, key: str) -> Tuple[Optional[Coordinates], str]:
+        """
+        Resolve a cache key to coordinates and the level that matched.
+
+        Postal codes fall back from the exact CP4-CP3 to the CP4 centroid;
+        free-text addresses match the most specific locality they end with.
+        """
+        kind, _, value = key.partition(":")
+        if kind == "cp":
+            if value in self.postal_codes:
+                return self.postal_codes[value], "postal_code"
+            prefix = postal_code_prefix(value)
+            if prefix in self.prefixes:
+                return self.prefixes[prefix], "cp4"
+            return None, "none"
+
+        # Try the trailing words first, e.g. "rua augusta 10 lisboa" -> "lisboa"
+        words = value.split()
+        for start in range(len(words)):
+            candidate = " ".join(words[start:])
+            if candidate in self.localities:
+                return self.localities[candidate], "locality"
+        return None, "none"
+
+
+class GeocodingService:
+    """Service resolving addresses to coordinates through the cache tiers."""
+
+    _lock = threading.Lock()
+    _gazetteer: Optional[Gazetteer] = None
+    _gazetteer_version: Optional[int] = None
+    _memo: Optional[LRUCache] = None
+
+    @staticmethod
+    def gazetteer_version() -> Optional[int]:
+        """Return the gazetteer file's mtime, or None if there is no file."""
+        path = getattr(settings, "GEOCODING_GAZETTEER_PATH", None)
+        if not path:
+            return None
+        try:
+            return Path(path).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def get_gazetteer(cls) -> Gazetteer:
+        """Return the process-wide gazetteer, loading it on first use."""
+        if cls._gazetteer is None:
+            with cls._lock:
+                if cls._gazetteer is None:
+                    path = getattr(settings, "GEOCODING_GAZETTEER_PATH", None)
+                    cls._gazetteer_version = cls.gazetteer_version()
+                    if cls._gazetteer_version is not None:
+                        cls._gazetteer = Gazetteer.from_csv(path)
+                    else:
+                        cls._gazetteer = Gazetteer()
+        return cls._gazetteer
+
+    @classmethod
+    def get_memo(cls) -> LRUCache:
+        """Return the in-process LRU tier."""
+        if cls._memo is None:
+            with cls._lock:
+                if cls._memo is None:
+                    cls._memo = LRUCache(getattr(settings, "GEOCODING_LRU_SIZE", 10000))
+        return cls._memo
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the loaded gazetteer and in-process cache (e.g. after reload)."""
+        with cls._lock:
+            cls._gazetteer = None
+            cls._gazetteer_version = None
+            cls._memo = None
+
+    @classmethod
+    def reload_if_changed(cls) -> None:
+        """Reset when the gazetteer file changed since it was loaded."""
+        if (
+            cls._gazetteer is not None
+            and cls.gazetteer_version() != cls._gazetteer_version
+        ):
+            cls.reset()
+
+    @classmethod
+    def geocode(cls, address: Optional[str]) -> Optional[Coordinates]:
+        """Resolve a single address to [longitude, latitude]."""
+        if not address:
+            return None
+        return cls.geocode_batch([address]).get(address)
+
+    @classmethod
+    def geocode_batch(
+        cls, addresses: Iterable[Optional[str]]
+    ) -> Dict[str, Optional[Coordinates]]:
+        """
+        Resolve many addresses at once.
+
+        Identical keys are looked up once per batch: first in the LRU, then
+        in a single query against the cache table, and only the remainder
+        against the gazetteer. New resolutions are written back to both tiers.
+        """
+        cls.reload_if_changed()
+        keys_by_address = {}
+        for address in addresses:
+            if address and address not in keys_by_address:
+                key = normalize_address_key(address)
+                if key:
+                    keys_by_address[address] = key
+
+        unique_keys = set(keys_by_address.values())
+        memo = cls.get_memo()
+        resolved = memo.get_many(unique_keys)
+
+        missing = unique_keys - resolved.keys()
+        if missing:
+            for key, coordinates in GeocodeCacheEntry.objects.filter(  # type: ignore[attr-defined]  # noqa: E501
+                key__in=missing
+            ).values_list(
+                "key", "coordinates"
+            ):
+                resolved[key] = coordinates
+                memo.set(key, coordinates)
+            missing -= resolved.keys()
+
+        if missing:
+            gazetteer = cls.get_gazetteer()
+            new_entries = []
+            for key in missing:
+                coordinates, source = gazetteer.resolve(key)
+                resolved[key] = coordinates
+                # Unresolved keys are only remembered in-process, and the
+                # LRU is dropped once the gazetteer file is updated.
+                memo.set(key, coordinates)
+                if coordinates is not None:
+                    new_entries.append(
+                        GeocodeCacheEntry(
+                            key=key, coordinates=coordinates, source=source
+                        )
+                    )
+            GeocodeCacheEntry.objects.bulk_create(  # type: ignore[attr-defined]
+                new_entries, ignore_conflicts=True
+            )
+
+        return {address: resolved.get(key) for address, key in keys_by_address.items()}
@@ -0,0 +1,142 @@
+"""
+Readiness probes for the API's runtime dependencies.
+
+Each probe times one cheap round trip (``SELECT 1`` per database alias, a
+cache write and read, a broker connection) and reports its latency. A
+dependency that fails, or answers slower than its threshold in
+``HEALTH_CHECK_THRESHOLDS_MS``, makes the instance not ready so the load
+balancer shifts traffic away from it.
+
+Results are memoised per process for ``HEALTH_CHECK_CACHE_SECONDS``: load
+balancers poll every instance often, and probes must not add meaningful
+load to the dependencies they check. Only one thread probes at a time; the
+others reuse the previous result meanwhile. Failures report only the
+exception type; the full error is logged.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROBE_KEY = "health:probe"
+
+OK = "ok"
+DEGRADED = "degraded"
+ERROR = "error"
+
+
+class HealthProbes:
+    """Timed dependency probes with a short per-process result cache."""
+
+    _lock = threading.Lock()
+    _result: Optional[dict] = None
+    _checked_at = 0.0
+
+    @staticmethod
+    def probe_database(alias: str) -> None:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+
+    @staticmethod
+    def probe_cache() -> None:
+        token = uuid.uuid4().hex
+        cache.set(PROBE_KEY, token, timeout=30)
+        # Another worker may have written in between; any value proves reads
+        if cache.get(PROBE_KEY) is None:
+            raise RuntimeError("cache did not return the probe value")
+
+    @staticmethod
+    def probe_broker() -> None:
+        from core.celery import app
+
+        timeout = getattr(settings, "HEALTH_CHECK_BROKER_TIMEOUT", 2.0)
+        with app.connection_for_write(connect_timeout=timeout) as conn:
+            # Fail on the first refused connection instead of backing off
+            conn.ensure_connection(max_retries=0)
+
+    @classmethod
+    def probes(cls) -> Dict[str, Callable[[], None]]:
+        """Return the probes to run, by check name."""
+        probes: Dict[str, Callable[[], None]] = {}
+        for alias in connections.databases:
+            name = "database" if alias == "default" else f"database:{alias}"
+            probes[name] = lambda alias=alias: cls.probe_database(alias)
+        probes["cache"] = cls.probe_cache
+        if not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+            # Eager mode runs tasks in-process; there is no broker to need
+            probes["broker"] = cls.probe_broker
+        return probes
+
+    @staticmethod
+    def run_probe(name: str, probe: Callable[[], None]) -> dict:
+        """Run one probe and classify it against its latency threshold."""
+        thresholds = getattr(settings, "HEALTH_CHECK_THRESHOLDS_MS", {})
+        # "database:replica" uses the "database" threshold
+        threshold = thresholds.get(name, thresholds.get(name.split(":")[0]))
+        started = time.perf_counter()
+        try:
+            probe()
+        except Exception as exc:
+            # The endpoint is public: messages can name hosts and credentials
+            logger.warning("Health probe %s failed", name, exc_info=True)
+            return {
+                "status": ERROR,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                "threshold_ms": threshold,
+                "error": type(exc).__name__,
+            }
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        degraded = threshold is not None and latency_ms > threshold
+        return {
+            "status": DEGRADED if degraded else OK,
+            "latency_ms": latency_ms,
+            "threshold_ms": threshold,
+        }
+
+    @classmethod
+    def check(cls) -> dict:
+        """Probe every dependency and summarise readiness."""
+        checks = {
+            name: cls.run_probe(name, probe) for name, probe in cls.probes().items()
+        }
+        ready = all(check["status"] == OK for check in checks.values())
+        return {
+            "status": "ready" if ready else "unavailable",
+            "checked_at": timezone.now().isoformat(),
+            "checks": checks,
+        }
+
+    @classmethod
+    def readiness(cls) -> dict:
+        """Return the memoised readiness result, probing when it expired."""
+        max_age = getattr(settings, "HEALTH_CHECK_CACHE_SECONDS", 5)
+        if cls._result is not None and time.monotonic() - cls._checked_at < max_age:
+            return {**cls._result, "cached": True}
+
+        # A probe in flight: reuse the last result rather than pile on
+        blocking = cls._result is None
+        if not cls._lock.acquire(blocking=blocking):
+            return {**cls._result, "cached": True}  # type: ignore[dict-item]
+        try:
+            if cls._result is not None and time.monotonic() - cls._checked_at < max_age:
+                return {**cls._result, "cached": True}
+            result = cls.check()
+            cls._result, cls._checked_at = result, time.monotonic()
+            return {**result, "cached": False}
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forget the memoised result."""
+        cls._result = None
+        cls._checked_at = 0.0
@@ -0,0 +1,311 @@
+"""
+Listing ingestion service.
+
+A sync reads listings from a configured source in independent chunks
+(one region or one page range each). Every chunk is upserted idempotently
+keyed by ``external_id``, so a chunk can be retried or redelivered without
+duplicating rows. Once every chunk is done the sync is finalized by
+withdrawing the listings the source no longer reports.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from core.metrics import INGESTED_ROWS
+from ..models import Property, PropertyPayload, Region, SyncChunk, SyncRun
+from .geocoding_service import GeocodingService
+from .response_cache import PROPERTIES_SCOPE, ResponseCache
+
+
+class ListingSource(ABC):
+    """Base class for listing sources used by the ingestion pipeline."""
+
+    @abstractmethod
+    def partitions(self) -> List[str]:
+        """Return the chunk keys that together cover the whole source."""
+
+    @abstractmethod
+    def fetch(self, key: str) -> List[dict]:
+        """Return the raw listing rows belonging to one chunk key."""
+
+
+class JSONFileSource(ListingSource):
+    """
+    Listing source backed by a JSON file containing a list of listings.
+
+    Chunks are either region codes (``partition_by="region"``) or page
+    ranges of ``page_size`` rows (``partition_by="page"``).
+    """
+
+    def __init__(self, path, partition_by: str = "region", page_size: int = 500):
+        if partition_by not in ("region", "page"):
+            raise ImproperlyConfigured(
+                f"Unsupported partition_by value: {partition_by!r}"
+            )
+        self.path = Path(path)
+        self.partition_by = partition_by
+        self.page_size = page_size
+        self._rows: Optional[List[dict]] = None
+
+    def _load(self) -> List[dict]:
+        if self._rows is None:
+            with self.path.open(encoding="utf-8") as handle:
+                self._rows = json.load(handle)
+        return self._rows
+
+    def partitions(self) -> List[str]:
+        rows = self._load()
+        if self.partition_by == "page":
+            return [
+                f"page:{start}-{min(start + self.page_size, len(rows))}"
+                for start in range(0, len(rows), self.page_size)
+            ]
+        return sorted({f"region:{row.get('region') or ''}" for row in rows})
+
+    def fetch(self, key: str) -> List[dict]:
+        rows = self._load()
+        kind, _, value = key.partition(":")
+        if kind == "page":
+            start, _, end = value.partition("-")
+            return rows[int(start) : int(end)]
+        if kind == "region":
+            return [row for row in rows if (row.get("region") or "") == value]
+        raise ValueError(f"Unknown chunk key: {key!r}")
+
+
+def get_listing_source(name: str) -> ListingSource:
+    """Instantiate the listing source configured under ``INGESTION_SOURCES``."""
+    sources = getattr(settings, "INGESTION_SOURCES", {})
+    if name not in sources:
+        raise ImproperlyConfigured(f"Unknown ingestion source: {name!r}")
+    config = sources[name]
+    source_class = import_string(config["BACKEND"])
+    return source_class(**config.get("OPTIONS", {}))
+
+
+class IngestionService:
+    """Service for upserting source listings and finalizing syncs."""
+
+    # Model fields a source row is allowed to set
+    UPSERT_FIELDS = [
+        "address",
+        "coordinates",
+        "price",
+        "size_sqm",
+        "property_type",
+        "bedrooms",
+        "bathrooms",
+        "year_built",
+        "condition",
+        "floor_number",
+        "total_floors",
+        "has_elevator",
+        "parking_spaces",
+        "has_balcony",
+        "has_terrace",
+        "energy_rating",
+        "listing_status",
+        "source_url",
+    ]
+
+    # PropertyPayload fields a source row is allowed to set
+    PAYLOAD_FIELDS = ["description", "images"]
+
+    @staticmethod
+    def start_or_resume_run(
+        source_name: str, run_id: Optional[int] = None, resume: bool = True
+    ) -> SyncRun:
+        """
+        Return the sync run to work on, creating it and its chunks if needed.
+
+        An explicit ``run_id`` always resumes that run. Otherwise the latest
+        unfinished run of the source is resumed when ``resume`` is set, so a
+        sync interrupted by a crash only redoes the chunks that never finished.
+        """
+        if run_id is not None:
+            return SyncRun.objects.get(pk=run_id)  # type: ignore[attr-defined]
+
+        if resume:
+            run = (
+                SyncRun.objects.filter(  # type: ignore[attr-defined]
+                    source=source_name, status__in=["running", "finalizing"]
+                )
+                .order_by("-started_at")
+                .first()
+            )
+            if run is not None:
+                return run
+
+        source = get_listing_source(source_name)
+        with transaction.atomic():
+            run = SyncRun.objects.create(source=source_name)  # type: ignore[attr-defined]  # noqa: E501
+            SyncChunk.objects.bulk_create(  # type: ignore[attr-defined]
+                [SyncChunk(run=run, key=key) for key in source.partitions()],
+                ignore_conflicts=True,
+            )
+        return run
+
+    @staticmethod
+    def normalize_row(row: dict, region_ids: Dict[str, int]) -> Optional[Property]:
+        """
+        Build an unsaved Property from a source row.
+
+        Returns None for rows that cannot be keyed or priced.
+        """
+        external_id = row.get("external_id")
+        if not external_id:
+            return None
+
+        try:
+            price = Decimal(str(row["price"]))
+            size_sqm = Decimal(str(row["size_sqm"]))
+        except (KeyError, InvalidOperation, TypeError, ValueError):
+            return None
+
+        values = {
+            field: row[field]
+            for field in IngestionService.UPSERT_FIELDS
+            + IngestionService.PAYLOAD_FIELDS
+            if field in row and row[field] is not None
+        }
+        values.update(price=price, size_sqm=size_sqm)
+        obj = Property(
+            external_id=str(external_id),
+            region_id=region_ids.get(row.get("region") or ""),
+            raw_data=row,
+            **values,
+        )
+        # bulk_create bypasses save(), so derive the postal code here
+        obj.set_postal_code()
+        return obj
+
+    @staticmethod
+    def geocode_missing(rows: List[dict]) -> int:
+        """
+        Fill in coordinates for rows that only carry an address.
+
+        Runs as one batch per chunk so identical addresses are resolved once.
+        Returns the number of rows that received coordinates.
+        """
+        pending = [
+            row for row in rows if not row.get("coordinates") and row.get("address")
+        ]
+        if not pending:
+            return 0
+
+        resolved = GeocodingService.geocode_batch(row["address"] for row in pending)
+        filled = 0
+        for row in pending:
+            coordinates = resolved.get(row["address"])
+            if coordinates is not None:
+                row["coordinates"] = coordinates
+                filled += 1
+        return filled
+
+    @staticmethod
+    def upsert_listings(rows: Iterable[dict], source: str = "") -> int:
+        """
+        Insert or update listings keyed by ``external_id``.
+
+        Rows are tagged with ``source``, the name of the ingestion source
+        they came from, so finalizing a sync only withdraws that source's
+        listings. Running the same rows twice leaves the table unchanged
+        apart from ``last_synced_at``, which makes chunk retries safe.
+        """
+        rows = [dict(row) for row in rows]
+        IngestionService.geocode_missing(rows)
+
+        region_ids = dict(
+            Region.objects.values_list("code", "id")  # type: ignore[attr-defined]
+        )
+        synced_at = timezone.now()
+
+        # Later rows win when a chunk repeats an external_id; a single
+        # INSERT ... ON CONFLICT cannot touch the same row twice.
+        by_external_id: Dict[str, Property] = {}
+        for row in rows:
+            obj = IngestionService.normalize_row(row, region_ids)
+            if obj is not None:
+                obj.last_synced_at = synced_at
+                obj.source = source
+                by_external_id[obj.external_id] = obj  # type: ignore[index]
+
+        INGESTED_ROWS.labels(outcome="rejected").inc(len(rows) - len(by_external_id))
+        if not by_external_id:
+            return 0
+
+        # Rows missing optional keys get their model defaults, which is what
+        # a fresh insert would store as well.
+        update_fields = IngestionService.UPSERT_FIELDS + [
+            "postal_code",
+            "postal_code_prefix",
+            "region",
+            "last_synced_at",
+            "source",
+            "updated_at",
+        ]
+        # Bulk writes skip model signals; bump once now and after commit
+        with ResponseCache.bulk_write(PROPERTIES_SCOPE):
+            Property.objects.bulk_create(  # type: ignore[attr-defined]
+                list(by_external_id.values()),
+                update_conflicts=True,
+                unique_fields=["external_id"],
+                update_fields=update_fields,
+            )
+
+            # Payloads go to their side table keyed by the (possibly existing) pk
+            property_ids = dict(
+                Property.objects.filter(  # type: ignore[attr-defined]
+                    external_id__in=by_external_id
+                ).values_list("external_id", "id")
+            )
+            payloads = [
+                PropertyPayload(
+                    property_id=property_ids[external_id],
+                    description=obj.description,
+                    images=obj.images,
+                    raw_data=obj.raw_data,
+                )
+                for external_id, obj in by_external_id.items()
+            ]
+            PropertyPayload.objects.bulk_create(  # type: ignore[attr-defined]
+                payloads,
+                update_conflicts=True,
+                unique_fields=["property"],
+                update_fields=IngestionService.PAYLOAD_FIELDS + ["raw_data"],
+            )
+        INGESTED_ROWS.labels(outcome="upserted").inc(len(by_external_id))
+        return len(by_external_id)
+
+    @staticmethod
+    def withdraw_unseen(run: SyncRun) -> int:
+        """
+        Mark the run's active listings not seen since it started withdrawn.
+
+        Only listings synced from the run's source are considered, so a sync
+        never withdraws rows another source (or a manual import) owns.
+        """
+        with ResponseCache.bulk_write(PROPERTIES_SCOPE):
+            withdrawn = (
+                Property.objects.filter(  # type: ignore[attr-defined]
+                    source=run.source,
+                    external_id__isnull=False,
+                    listing_status="active",
+                )
+                .filter(
+                    Q(last_synced_at__lt=run.started_at)
+                    | Q(last_synced_at__isnull=True)
+                )
+                .update(listing_status="withdrawn", updated_at=timezone.now())
+            )
+        if withdrawn:
+            INGESTED_ROWS.labels(outcome="withdrawn").inc(withdrawn)
+        return withdrawn
@@ -0,0 +1,369 @@
+"""
+HTTP load testing against a running Atlas server.
+
+``LoadTest`` replays a weighted mix of the requests the frontend makes (map
+viewport reads, filtered list pages, search, detail, compare-to-region,
+JWT login and listing updates) from ``concurrency`` threads, each with its
+own HTTP session, and reports throughput, latency percentiles and error
+rates per endpoint.
+
+Targets (region ids, postal code areas, listing ids) are discovered
+through the API before the run, so any dataset works; endpoints the
+dataset has no targets for are dropped from the mix. Writes only ever
+update synthetic listings (``SYN-`` external ids), never real ones.
+``seed_dataset`` gives reproducible numbers. Request choices are seeded
+as well.
+
+With accounts, every worker logs in as one of them and sends all its
+requests with the token, so each account has its own throttle bucket
+instead of the whole run sharing the bucket of one IP. Runs in which many
+requests were throttled (429) measure the throttle rather than the server;
+the report's ``throttled_share`` tells them apart.
+"""
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import requests
+from .synthetic_data import EXTERNAL_ID_PREFIX
+
+# endpoint: relative weight
+DEFAULT_MIX = {
+    "viewport": 25,
+    "list": 20,
+    "search": 15,
+    "detail": 20,
+    "compare": 12,
+    "login": 4,
+    "write": 4,
+}
+
+SEARCH_TERMS = ["Rua Augusta", "Avenida", "Flores", "Liberdade", "República"]
+PROPERTY_TYPES = ["apartment", "house", "commercial"]
+ORDERINGS = ["-created_at", "price", "-price", "size_sqm"]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse ``"list=30,detail=20"`` into a mix; unknown endpoints raise."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown endpoint {name!r}")
+        mix[name] = int(weight)
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Return the nearest-rank ``q`` percentile of ``values`` (0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class Targets:
+    """Identifiers requests are built from, read from the API."""
+
+    region_ids: List[int]
+    postal_prefixes: List[str]
+    property_ids: List[int]
+    pages: int
+    # Synthetic listings, the only ones write requests may change
+    writable_ids: List[int] = field(default_factory=list)
+
+    @classmethod
+    def discover(cls, session: requests.Session, base_url: str, timeout: float):
+        """Read targets from the API; raises ValueError without listings."""
+        regions = session.get(f"{base_url}/api/regions/", timeout=timeout)
+        regions.raise_for_status()
+        listings = session.get(
+            f"{base_url}/api/properties/", params={"page_size": 100}, timeout=timeout
+        )
+        listings.raise_for_status()
+        page = listings.json()
+        rows = page["results"]
+        if not rows:
+            raise ValueError("No listings to test against; run seed_dataset first")
+        return cls(
+            region_ids=[region["id"] for region in regions.json()["results"]],
+            postal_prefixes=sorted(
+                {row["postal_code"][:4] for row in rows if row.get("postal_code")}
+            ),
+            property_ids=[row["id"] for row in rows],
+            # of 20 listings, the default page size
+            pages=min(10, max(1, math.ceil(page["count"] / 20))),
+            writable_ids=[
+                row["id"]
+                for row in rows
+                if (row.get("external_id") or "").startswith(EXTERNAL_ID_PREFIX)
+            ],
+        )
+
+    def supports(self, endpoint: str) -> bool:
+        """Return whether requests to ``endpoint`` can be built."""
+        if endpoint == "viewport":
+            return bool(self.region_ids or self.postal_prefixes)
+        if endpoint == "write":
+            return bool(self.writable_ids)
+        return True
+
+
+@dataclass
+class EndpointStats:
+    """Outcomes of the requests made to one endpoint."""
+
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def record(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        """Return requests, RPS, error rate and p50/p95/p99 latency (ms)."""
+        count = len(self.latencies)
+        milliseconds = [latency * 1000 for latency in self.latencies]
+        return {
+            "requests": count,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": percentile(milliseconds, 50),
+            "p95_ms": percentile(milliseconds, 95),
+            "p99_ms": percentile(milliseconds, 99),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class LoadTest:
+    """A timed or counted run of the request mix against ``base_url``."""
+
+    def __init__(
+        self,
+        base_url: str,
+        mix: Optional[Dict[str, int]] = None,
+        concurrency: int = 8,
+        duration: float = 30.0,
+        max_requests: Optional[int] = None,
+        seed: int = 0,
+        credentials: Optional[List[Tuple[str, str]]] = None,
+        timeout: float = 30.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.mix = dict(mix or DEFAULT_MIX)
+        if not credentials:
+            # login and writes need an account
+            self.mix.pop("login", None)
+            self.mix.pop("write", None)
+        self.mix = {name: weight for name, weight in self.mix.items() if weight > 0}
+        if not self.mix:
+            raise ValueError("The request mix is empty")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.max_requests = max_requests
+        self.seed = seed
+        self.credentials = credentials or []
+        self.timeout = timeout
+        self.stats: Dict[str, EndpointStats] = {
+            name: EndpointStats() for name in self.mix
+        }
+        # Endpoints dropped from the mix for lack of targets
+        self.skipped: List[str] = []
+        self._lock = threading.Lock()
+        self._issued = 0
+
+    # Request builders: (method, path, query params, JSON body)
+
+    def viewport_request(self, rng, targets):
+        """Map pan/zoom: the listings of a region, one full page."""
+        if not targets.region_ids:
+            return self.postal_codes_request(rng, targets)
+        return (
+            "GET",
+            "/api/properties/",
+            {"region": rng.choice(targets.region_ids), "page_size": 100},
+            None,
+        )
+
+    def postal_codes_request(self, rng, targets):
+        """Map at low zoom: listing counts per postal code of a CP4 area."""
+        return (
+            "GET",
+            "/api/properties/postal_codes/",
+            {"prefix": rng.choice(targets.postal_prefixes)},
+            None,
+        )
+
+    def list_request(self, rng, targets):
+        params = {"ordering": rng.choice(ORDERINGS)}
+        # Filtered lists stay on their first page, so every page exists
+        if rng.random() < 0.6:
+            params["property_type"] = rng.choice(PROPERTY_TYPES)
+            if targets.region_ids and rng.random() < 0.5:
+                params["region"] = rng.choice(targets.region_ids)
+        else:
+            params["page"] = rng.randint(1, targets.pages)
+        return "GET", "/api/properties/", params, None
+
+    def search_request(self, rng, targets):
+        if targets.postal_prefixes and rng.random() < 0.3:
+            term = rng.choice(targets.postal_prefixes)
+        else:
+            term = rng.choice(SEARCH_TERMS)
+        return "GET", "/api/properties/", {"search": term}, None
+
+    def detail_request(self, rng, targets):
+        return (
+            "GET",
+            f"/api/properties/{rng.choice(targets.property_ids)}/",
+            None,
+            None,
+        )
+
+    def compare_request(self, rng, targets):
+        return (
+            "GET",
+            f"/api/properties/{rng.choice(targets.property_ids)}/compare_to_region/",
+            None,
+            None,
+        )
+
+    def login_request(self, rng, targets):
+        email, password = rng.choice(self.credentials)
+        body = {"email": email, "password": password}
+        return "POST", "/api/auth/jwt/create/", None, body
+
+    def write_request(self, rng, targets):
+        body = {"price": rng.randint(100, 2000) * 1000}
+        return (
+            "PATCH",
+            f"/api/properties/{rng.choice(targets.writable_ids)}/",
+            None,
+            body,
+        )
+
+    def builders(self) -> Dict[str, Callable]:
+        """Return the request builder of each endpoint in the mix."""
+        return {name: getattr(self, f"{name}_request") for name in self.mix}
+
+    def _next(self, deadline: float) -> bool:
+        with self._lock:
+            if self.max_requests is not None:
+                if self._issued >= self.max_requests:
+                    return False
+            elif time.monotonic() >= deadline:
+                return False
+            self._issued += 1
+            return True
+
+    def _login(self, session: requests.Session, number: int) -> Optional[str]:
+        """Return an access token of the worker's account, or None."""
+        if not self.credentials:
+            return None
+        email, password = self.credentials[number % len(self.credentials)]
+        try:
+            response = session.post(
+                f"{self.base_url}/api/auth/jwt/create/",
+                json={"email": email, "password": password},
+                timeout=self.timeout,
+            )
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        return response.json()["access"]
+
+    def _worker(self, number: int, targets: Targets, deadline: float) -> None:
+        rng = random.Random(f"{self.seed}:{number}")
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        builders = self.builders()
+        session = requests.Session()
+        token = self._login(session, number)
+        # Authenticated reads spend the account's bucket, not the IP's
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+        while self._next(deadline):
+            name = rng.choices(names, weights)[0]
+            builder = builders[name]
+            # Viewport reads alternate between listings and postal-code counts
+            if name == "viewport" and targets.postal_prefixes and rng.random() < 0.3:
+                builder = self.postal_codes_request
+
+            started = time.perf_counter()
+            try:
+                method, path, params, body = builder(rng, targets)
+                response = session.request(
+                    method,
+                    self.base_url + path,
+                    params=params,
+                    json=body,
+                    # Logins are anonymous
+                    headers={} if name == "login" else headers,
+                    timeout=self.timeout,
+                )
+                status, ok = str(response.status_code), response.status_code < 400
+            except Exception as e:
+                # Record the failure instead of silently losing the worker
+                status, ok = type(e).__name__, False
+            latency = time.perf_counter() - started
+
+            with self._lock:
+                self.stats[name].record(latency, status, ok)
+
+    def run(self) -> dict:
+        """Run the load test and return the report (see ``report()``)."""
+        with requests.Session() as session:
+            targets = Targets.discover(session, self.base_url, self.timeout)
+        self.skipped = [name for name in self.mix if not targets.supports(name)]
+        for name in self.skipped:
+            del self.mix[name]
+            del self.stats[name]
+        if not self.mix:
+            raise ValueError("No endpoint of the mix has targets in this dataset")
+
+        started = time.monotonic()
+        deadline = started + self.duration
+        workers = [
+            threading.Thread(target=self._worker, args=(n, targets, deadline))
+            for n in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return self.report(time.monotonic() - started)
+
+    def report(self, elapsed: float) -> dict:
+        """Return totals and per-endpoint summaries for a run of ``elapsed`` s."""
+        latencies = [x for stats in self.stats.values() for x in stats.latencies]
+        total = EndpointStats(latencies=latencies)
+        total.errors = sum(stats.errors for stats in self.stats.values())
+        for stats in self.stats.values():
+            for status, count in stats.statuses.items():
+                total.statuses[status] = total.statuses.get(status, 0) + count
+        return {
+            "base_url": self.base_url,
+            "concurrency": self.concurrency,
+            "elapsed_s": round(elapsed, 2),
+            "mix": self.mix,
+            "skipped": self.skipped,
+            "throttled_share": (
+                round(total.statuses.get("429", 0) / len(latencies), 4)
+                if latencies
+                else 0.0
+            ),
+            "total": total.summary(elapsed),
+            "endpoints": {
+                name: stats.summary(elapsed) for name, stats in self.stats.items()
+            },
+        }
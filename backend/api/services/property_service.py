@@ -7,8 +7,11 @@ keeping them separate from views and serializers.
 
 from typing import Optional, List
 from decimal import Decimal
-from django.db.models import QuerySet
+from django.db.models import Avg, DecimalField, ExpressionWrapper, F, QuerySet
+from core.metrics import timed_service
+from core.tracing import traced
 from ..models import Property, Region
+from .region_cache import RegionCache
 
 
 class PropertyService:
@@ -77,16 +80,18 @@ class PropertyService:
         return queryset
 
     @staticmethod
+    @timed_service("PropertyService")
+    @traced("PropertyService.compare_to_region_average")
     def compare_to_region_average(property: Property) -> dict:
         """
         Compare property metrics to region averages.
 
         Returns a dictionary with comparison metrics.
         """
-        if not property.region:
+        region = RegionCache.get(property.region_id)  # type: ignore[attr-defined]
+        if region is None:
             return {}
 
-        region = property.region  # type: ignore[assignment]
         price_per_sqm = PropertyService.calculate_price_per_sqm(
             Decimal(str(property.price)),  # type: ignore[arg-type]
             Decimal(str(property.size_sqm)),  # type: ignore[arg-type]
@@ -106,3 +111,37 @@ class PropertyService:
             result["is_below_average"] = diff < 0
 
         return result
+
+    @staticmethod
+    @timed_service("PropertyService")
+    @traced("PropertyService.refresh_region_statistics")
+    def refresh_region_statistics(region_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute region average price per sqm from active listings.
+
+        Regions without active listings keep their current averages.
+        Returns the number of regions updated.
+        """
+        price_per_sqm = ExpressionWrapper(
+            F("price") / F("size_sqm"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        listings = Property.objects.filter(  # type: ignore[attr-defined]
+            listing_status="active", size_sqm__gt=0, region__isnull=False
+        )
+        if region_ids is not None:
+            listings = listings.filter(region_id__in=region_ids)
+        averages = dict(
+            listings.values("region")
+            .annotate(avg=Avg(price_per_sqm))
+            .values_list("region", "avg")
+        )
+
+        updated = 0
+        for region in Region.objects.filter(pk__in=averages):  # type: ignore[attr-defined]  # noqa: E501
+            region.avg_price_per_sqm = Decimal(str(averages[region.pk])).quantize(
+                Decimal("0.01")
+            )
+            region.save(update_fields=["avg_price_per_sqm", "updated_at"])
+            updated += 1
+        return updated
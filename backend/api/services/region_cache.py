@@ -0,0 +1,128 @@
+"""
+Region cache service.
+
+Regions are a tiny, rarely changing table read for nearly every serialized
+property. The whole table is cached as one snapshot in two tiers: an
+in-process LRU keyed by version, backed by the shared Django cache (Redis in
+production). Saving or deleting a Region bumps a shared version key, which
+invalidates every worker's local copy within ``REGION_CACHE_VERSION_TTL``.
+"""
+
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from core.db_routers import pin_to_primary, replica_configured
+from core import tracing
+from core.metrics import record_cache
+from ..models import Region
+from ..utils.lru import LRUCache
+
+VERSION_KEY = "regions:version"
+SNAPSHOT_KEY = "regions:snapshot:{version}"
+
+# Write scope of region-derived cached responses (see ReplicaReadMixin)
+REGIONS_SCOPE = "regions"
+
+
+class RegionCache:
+    """Read-through cache of all regions, keyed by id."""
+
+    _lock = threading.Lock()
+    _local = LRUCache(maxsize=4)
+    _version: Optional[str] = None
+    _version_checked_at = 0.0
+
+    @classmethod
+    def _current_version(cls) -> str:
+        """Return the shared version, re-reading it at most once per TTL."""
+        ttl = getattr(settings, "REGION_CACHE_VERSION_TTL", 5)
+        now = time.monotonic()
+        if cls._version is None or now - cls._version_checked_at >= ttl:
+            version = cache.get(VERSION_KEY)
+            if version is None:
+                version = uuid.uuid4().hex
+                # add() keeps a version another worker set concurrently
+                if not cache.add(VERSION_KEY, version, timeout=None):
+                    version = cache.get(VERSION_KEY) or version
+            cls._version = version
+            cls._version_checked_at = now
+        return cls._version
+
+    @classmethod
+    def _snapshot(cls) -> Dict[int, Region]:
+        version = cls._current_version()
+        snapshot = cls._local.get(version)
+        if snapshot is not None:
+            return snapshot
+
+        with cls._lock:
+            snapshot = cls._local.get(version)
+            if snapshot is None:
+                snapshot = cls._load(version)
+                cls._local.set(version, snapshot)
+        return snapshot
+
+    @staticmethod
+    @tracing.traced("cache.region.snapshot")
+    def _load(version: str) -> Dict[int, Region]:
+        """Read the snapshot of ``version`` from the shared cache or the DB."""
+        key = SNAPSHOT_KEY.format(version=version)
+        snapshot = cache.get(key)
+        hit = snapshot is not None
+        # Local hits are not counted: they happen once per row
+        record_cache("region", hits=int(hit), misses=int(not hit))
+        if not hit:
+            # Always the primary: a lagging replica would be cached
+            # under the new version for the whole timeout
+            snapshot = {
+                region.pk: region
+                for region in Region.objects.using(  # type: ignore[attr-defined]  # noqa: E501
+                    DEFAULT_DB_ALIAS
+                )
+            }
+            cache.set(
+                key,
+                snapshot,
+                timeout=getattr(settings, "REGION_CACHE_TIMEOUT", 3600),
+            )
+        tracing.set_attributes(**{"cache.hit": hit})
+        return snapshot
+
+    @classmethod
+    def get(cls, region_id: Optional[int]) -> Optional[Region]:
+        """Return the region with ``region_id``, or None."""
+        if region_id is None:
+            return None
+        return cls._snapshot().get(region_id)
+
+    @classmethod
+    def get_many(cls, region_ids: Iterable[int]) -> Dict[int, Region]:
+        """Return the cached regions among ``region_ids``."""
+        snapshot = cls._snapshot()
+        return {pk: snapshot[pk] for pk in region_ids if pk in snapshot}
+
+    @classmethod
+    def all(cls) -> List[Region]:
+        """Return all regions ordered like ``Region.Meta.ordering``."""
+        return sorted(cls._snapshot().values(), key=lambda region: region.name)
+
+    @classmethod
+    def version(cls) -> str:
+        """Return the current region version, e.g. for derived cache keys."""
+        return cls._current_version()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Publish a new version so every worker reloads on next access."""
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, timeout=None)
+        if replica_configured():
+            pin_to_primary(f"scope:{REGIONS_SCOPE}")
+        with cls._lock:
+            cls._local.clear()
+            cls._version = version
+            cls._version_checked_at = time.monotonic()
@@ -0,0 +1,188 @@
+"""
+Single-flight response cache for hot read endpoints.
+
+Entries hold the rendered response data together with the generation it
+was computed for, a soft expiry and how long it took to compute. When an
+entry goes stale (soft expiry reached, or its generation was superseded by
+a write), one worker wins a short ``cache.add`` lock (``SET NX`` on Redis)
+and recomputes; every other worker keeps serving the stale entry until the
+new one lands. Entries are refreshed probabilistically shortly before their
+soft expiry (XFetch), weighted by compute time, so hot keys are usually
+rebuilt before anyone sees them expire.
+"""
+
+import hashlib
+import math
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from core import tracing
+from core.db_routers import pin_to_primary, replica_configured
+from core.metrics import CACHE_REQUESTS
+
+ENTRY_KEY = "response:{scope}:{digest}"
+LOCK_KEY = "response:{scope}:{digest}:lock"
+GENERATION_KEY = "response:generation:{scope}"
+
+# Scope bumped by every write to the property table
+PROPERTIES_SCOPE = "properties"
+
+_MISSING = object()
+
+# Scopes whose per-row bumps are folded into one by bulk_write()
+_bulk_scopes: ContextVar[frozenset] = ContextVar("bulk_scopes", default=frozenset())
+
+
+def _record(result: str) -> None:
+    """Count a response cache lookup and note its result on the span."""
+    CACHE_REQUESTS.labels(cache="response", result=result).inc()
+    tracing.set_attributes(**{"cache.result": result})
+
+
+class ResponseCache:
+    """Stale-while-revalidate cache with one recompute per key at a time."""
+
+    @staticmethod
+    def make_digest(path: str, params: Iterable[Tuple[str, str]]) -> str:
+        """Hash a request path and its query parameters, ignoring their order."""
+        normalized = "&".join(f"{key}={value}" for key, value in sorted(params))
+        return hashlib.sha1(f"{path}?{normalized}".encode()).hexdigest()
+
+    @staticmethod
+    def generation(scope: str) -> str:
+        """Return the current generation of ``scope``."""
+        key = GENERATION_KEY.format(scope=scope)
+        generation = cache.get(key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            # add() keeps a generation another worker set concurrently
+            if not cache.add(key, generation, timeout=None):
+                generation = cache.get(key) or generation
+        return generation
+
+    @staticmethod
+    def bump(scope: str) -> None:
+        """Start a new generation; older entries become stale, not missing."""
+        cache.set(GENERATION_KEY.format(scope=scope), uuid.uuid4().hex, timeout=None)
+        if replica_configured():
+            # Rebuild from the primary until the replica has the change
+            pin_to_primary(f"scope:{scope}")
+
+    @staticmethod
+    def in_bulk_write(scope: str) -> bool:
+        """Whether writes to ``scope`` are being bumped by ``bulk_write()``."""
+        return scope in _bulk_scopes.get()
+
+    @staticmethod
+    @contextmanager
+    def bulk_write(scope: str):
+        """
+        Bump ``scope`` once for all the writes of the block.
+
+        Model signals check ``in_bulk_write()`` and skip their per-row bump;
+        the block bumps when it ends and again after commit, like they do.
+        """
+        token = _bulk_scopes.set(_bulk_scopes.get() | {scope})
+        try:
+            yield
+        finally:
+            _bulk_scopes.reset(token)
+        ResponseCache.bump(scope)
+        transaction.on_commit(lambda: ResponseCache.bump(scope))
+
+    @staticmethod
+    def is_stale(entry: dict, generation: str, now: float) -> bool:
+        """
+        Return whether ``entry`` should be recomputed.
+
+        Besides hard staleness this fires early with a probability that
+        grows as the soft expiry nears and with the entry's compute time.
+        """
+        if entry["generation"] != generation:
+            return True
+        beta = getattr(settings, "RESPONSE_CACHE_BETA", 1.0)
+        # 1 - random() is in (0, 1], so the log is defined
+        early = -entry["delta"] * beta * math.log(1.0 - random.random())
+        return now + early >= entry["expires_at"]
+
+    @staticmethod
+    @tracing.traced("cache.response")
+    def get_or_compute(
+        scope: str,
+        digest: str,
+        generation: str,
+        compute: Callable[[], Tuple[Any, bool]],
+        timeout: Optional[int] = None,
+    ) -> Any:
+        """
+        Return the cached value for ``digest`` or compute it single-flight.
+
+        ``compute`` returns ``(value, cacheable)``; error responses are
+        passed through without being stored.
+        """
+        if timeout is None:
+            timeout = getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+        entry_key = ENTRY_KEY.format(scope=scope, digest=digest)
+        lock_key = LOCK_KEY.format(scope=scope, digest=digest)
+
+        entry = cache.get(entry_key)
+        if entry is not None and not ResponseCache.is_stale(
+            entry, generation, time.time()
+        ):
+            _record("hit")
+            return entry["value"]
+
+        token = uuid.uuid4().hex
+        lock_timeout = getattr(settings, "RESPONSE_CACHE_LOCK_TIMEOUT", 30)
+        if not cache.add(lock_key, token, timeout=lock_timeout):
+            # Someone else is recomputing: serve what we have, or wait briefly
+            if entry is not None:
+                _record("stale")
+                return entry["value"]
+            value = ResponseCache._wait_for(entry_key, generation)
+            if value is not _MISSING:
+                _record("hit")
+                return value
+            _record("miss")
+            # The holder is slow or died; computing beats failing the request
+            return compute()[0]
+
+        _record("miss")
+        try:
+            started = time.monotonic()
+            value, cacheable = compute()
+            delta = time.monotonic() - started
+            if cacheable:
+                stale_timeout = getattr(settings, "RESPONSE_CACHE_STALE_TIMEOUT", 300)
+                cache.set(
+                    entry_key,
+                    {
+                        "value": value,
+                        "generation": generation,
+                        "expires_at": time.time() + timeout,
+                        "delta": delta,
+                    },
+                    timeout=timeout + stale_timeout,
+                )
+            return value
+        finally:
+            # Only release our own lock; it may have expired and been retaken
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    @staticmethod
+    def _wait_for(entry_key: str, generation: str) -> Any:
+        """Poll for an entry of ``generation`` while another worker fills it."""
+        deadline = time.monotonic() + getattr(settings, "RESPONSE_CACHE_WAIT", 2.0)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(entry_key)
+            if entry is not None and entry["generation"] == generation:
+                return entry["value"]
+        return _MISSING
@@ -0,0 +1,277 @@
+"""
+Slow-query log.
+
+Every database connection gets an ``execute_wrapper`` (installed when the
+connection opens) that times each query. Queries slower than
+``SLOW_QUERY_THRESHOLD_MS`` are captured with their parameters and the
+application frames that ran them.
+
+Captures are buffered and written when the request finishes (after the
+response is sent) or the Celery task ends, never while the request runs:
+the writes add no latency and stay out of query budgets and metrics, and
+slow queries of transactions that roll back (e.g. cancelled by
+``statement_timeout``) are kept too. Outside requests and tasks only the
+latest ``MAX_PENDING`` captures are kept until something flushes them.
+Writing adds the query's plan from a plain ``EXPLAIN`` (the query is not
+run again), at most once per query shape every
+``SLOW_QUERY_EXPLAIN_INTERVAL`` seconds, and stores the capture in the next
+slot of the ``SlowQuery`` ring buffer.
+
+Parameters of writes and of queries touching ``SLOW_QUERY_REDACTED_TABLES``
+are stored as ``REDACTED`` (and those queries are not explained), so
+passwords, tokens and personal data never reach the log.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from typing import List
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+from core.query_budget import application_stack
+from ..models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = "slowquery:sequence"
+EXPLAIN_KEY = "slowquery:explained:{fingerprint}"
+REDACTED = "<redacted>"
+
+# Captures buffered per thread before the oldest are dropped
+MAX_PENDING = 1000
+
+# "IN (%s, %s, %s)" and "IN (%s)" are the same shape
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)*\s*%s\s*\)")
+
+_state = threading.local()
+
+
+def fingerprint(sql: str) -> str:
+    """Return a hash identifying the shape of ``sql``."""
+    normalized = _PLACEHOLDER_LIST.sub("(...)", " ".join(sql.split()))
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+class SlowQueryLog:
+    """Captures slow queries and writes them to the ``SlowQuery`` ring buffer."""
+
+    @staticmethod
+    def _pending() -> List[dict]:
+        if not hasattr(_state, "pending"):
+            _state.pending = []
+        return _state.pending
+
+    @classmethod
+    def install(cls, sender=None, connection=None, **kwargs) -> None:
+        """``connection_created`` receiver adding the timing wrapper."""
+        if cls.execute_wrapper not in connection.execute_wrappers:
+            # First in the list is outermost, and stays put when
+            # ``execute_wrapper()`` blocks pop their own wrappers
+            connection.execute_wrappers.insert(0, cls.execute_wrapper)
+
+    @classmethod
+    def execute_wrapper(cls, execute, sql, params, many, context):
+        threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+        if threshold <= 0 or getattr(_state, "flushing", False):
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= threshold:
+                alias = context["connection"].alias
+                cls.capture(alias, sql, params, many, duration_ms)
+
+    @classmethod
+    def capture(cls, alias: str, sql: str, params, many: bool, duration_ms: float):
+        """Queue a slow query for writing by the next ``flush()``."""
+        stack = application_stack()
+        core_dir = os.path.join(str(settings.BASE_DIR), "core")
+        # Attribute to the innermost view/service frame, not instrumentation
+        frames = [
+            f
+            for f in stack
+            if not f.filename.startswith(core_dir) and f.filename != __file__
+        ] or stack
+        source = ""
+        if frames:
+            frame = frames[-1]
+            path = os.path.relpath(frame.filename, settings.BASE_DIR)
+            source = f"{path}:{frame.lineno} in {frame.name}"
+        redacted = cls.redacts(sql)
+        json_params = [] if many else cls._json_params(params)
+        pending = cls._pending()
+        if len(pending) >= MAX_PENDING:
+            del pending[0]
+        pending.append(
+            {
+                "database": alias,
+                "sql": sql,
+                "params": [REDACTED] * len(json_params) if redacted else json_params,
+                "raw_params": None if many or redacted else params,
+                "redacted": redacted,
+                "many": many,
+                "duration_ms": duration_ms,
+                "source": source[:255],
+                "stack": "".join(traceback.format_list(frames[-10:])),
+                "captured_at": timezone.now(),
+            }
+        )
+
+    @staticmethod
+    def redacts(sql: str) -> bool:
+        """Return whether the parameters of ``sql`` must not be stored."""
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return True
+        tables = getattr(settings, "SLOW_QUERY_REDACTED_TABLES", ())
+        return any(re.search(rf"\b{re.escape(table)}\b", sql) for table in tables)
+
+    @staticmethod
+    def _json_params(params) -> list:
+        if params is None:
+            return []
+        if isinstance(params, dict):
+            params = list(params.values())
+        return [
+            p if isinstance(p, (int, float, bool, type(None))) else str(p)
+            for p in params
+        ]
+
+    @classmethod
+    def flush(cls, **kwargs) -> None:
+        """Write queued captures (``request_finished``/``task_postrun`` receiver)."""
+        pending = cls._pending()
+        if not pending:
+            return
+        _state.pending = []
+        _state.flushing = True
+        try:
+            for capture in pending:
+                try:
+                    cls.write(capture)
+                except DatabaseError:
+                    logger.warning("Could not record slow query", exc_info=True)
+        finally:
+            _state.flushing = False
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop captures not written yet."""
+        _state.pending = []
+
+    @classmethod
+    def write(cls, capture: dict) -> SlowQuery:
+        """Store ``capture`` in the next ring-buffer slot, with its plan."""
+        shape = fingerprint(capture["sql"])
+        plan = ""
+        interval = getattr(settings, "SLOW_QUERY_EXPLAIN_INTERVAL", 300)
+        if not (capture["many"] or capture["redacted"]) and cache.add(
+            EXPLAIN_KEY.format(fingerprint=shape), True, timeout=interval
+        ):
+            plan = cls.explain(
+                capture["database"], capture["sql"], capture["raw_params"]
+            )
+
+        entry = SlowQuery(
+            slot=cls.next_slot(),
+            fingerprint=shape,
+            sql=capture["sql"],
+            params=capture["params"],
+            duration_ms=capture["duration_ms"],
+            database=capture["database"],
+            source=capture["source"],
+            stack=capture["stack"],
+            plan=plan,
+            captured_at=capture["captured_at"],
+        )
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            SlowQuery.objects.using(DEFAULT_DB_ALIAS).bulk_create(  # type: ignore[attr-defined]  # noqa: E501
+                [entry],
+                update_conflicts=True,
+                unique_fields=["slot"],
+                update_fields=[
+                    "fingerprint",
+                    "sql",
+                    "params",
+                    "duration_ms",
+                    "database",
+                    "source",
+                    "stack",
+                    "plan",
+                    "captured_at",
+                ],
+            )
+        return entry
+
+    @staticmethod
+    def explain(alias: str, sql: str, params) -> str:
+        """Return the plan of a SELECT without executing it, or ""."""
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return ""
+        connection = connections[alias]
+        if connection.vendor == "postgresql":
+            prefix = "EXPLAIN (ANALYZE off, VERBOSE off) "
+        elif connection.vendor == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            return ""
+        try:
+            with transaction.atomic(using=alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(prefix + sql, params)
+                    rows = cursor.fetchall()
+        except DatabaseError:
+            logger.info("Could not explain slow query", exc_info=True)
+            return ""
+        # PostgreSQL returns one line per row; SQLite (id, parent, _, detail)
+        return "\n".join(str(row[-1]) for row in rows)
+
+    @staticmethod
+    def next_slot() -> int:
+        """
+        Return the ring-buffer slot for the next capture.
+
+        The sequence lives in the default cache, which must be shared (Redis)
+        for processes to take turns; with per-process local memory each
+        process counts from the start and they overwrite each other's slots.
+        """
+        size = getattr(settings, "SLOW_QUERY_LOG_SIZE", 1000)
+        cache.add(SEQUENCE_KEY, 0, timeout=None)
+        try:
+            sequence = cache.incr(SEQUENCE_KEY)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(SEQUENCE_KEY, 1, timeout=None)
+            sequence = 1
+        return sequence % size
+
+    @staticmethod
+    def top_offenders(limit: int = 20) -> List[dict]:
+        """Return captured query shapes ordered by their total time."""
+        shapes = list(
+            SlowQuery.objects.values("fingerprint")  # type: ignore[attr-defined]
+            .annotate(
+                total_ms=Sum("duration_ms"),
+                count=Count("id"),
+                avg_ms=Avg("duration_ms"),
+                max_ms=Max("duration_ms"),
+                last_seen=Max("captured_at"),
+                sample_id=Max("id"),
+            )
+            .order_by("-total_ms")[:limit]
+        )
+        samples = SlowQuery.objects.in_bulk(  # type: ignore[attr-defined]
+            [shape["sample_id"] for shape in shapes]
+        )
+        for shape in shapes:
+            shape["sample"] = samples[shape["sample_id"]]
+        return shapes
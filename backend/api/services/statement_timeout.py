@@ -0,0 +1,88 @@
+"""
+Per-request statement timeouts.
+
+PostgreSQL connections get an ``execute_wrapper`` (installed when the
+connection opens) that does nothing unless a request's ``StatementTimeout``
+is active. Then the first query on each connection sets the session's
+``statement_timeout``, so only the aliases a request actually queries pay
+for it; ``finish()`` resets them before the connections are reused.
+
+The active timeout lives in a context variable, so it follows the request
+into the iteration of a streaming response body.
+"""
+
+import logging
+from contextvars import ContextVar
+from typing import Optional
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+_active: ContextVar[Optional["StatementTimeout"]] = ContextVar(
+    "statement_timeout", default=None
+)
+
+
+class StatementTimeout:
+    """A request's statement timeout and the connections it was set on."""
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self.connections: list = []
+
+    def start(self) -> None:
+        """Apply the timeout to the queries that follow."""
+        _active.set(self)
+
+    def finish(self) -> None:
+        """Stop applying the timeout and reset the connections it was set on."""
+        if _active.get() is self:
+            _active.set(None)
+        for connection in self.connections:
+            self.reset(connection)
+        self.connections = []
+
+    @classmethod
+    def install(cls, sender=None, connection=None, **kwargs) -> None:
+        """``connection_created`` receiver adding the wrapper."""
+        if connection.vendor != "postgresql":
+            return
+        if cls.execute_wrapper not in connection.execute_wrappers:
+            # Stays put when ``execute_wrapper()`` blocks pop their own wrappers
+            connection.execute_wrappers.insert(0, cls.execute_wrapper)
+
+    @staticmethod
+    def execute_wrapper(execute, sql, params, many, context):
+        timeout = _active.get()
+        connection = context["connection"]
+        if timeout is not None and connection not in timeout.connections:
+            timeout.connections.append(connection)
+            # Session-level, since queries outside transactions autocommit
+            StatementTimeout._execute(
+                connection,
+                "SELECT set_config('statement_timeout', %s, false)",
+                [str(timeout.timeout_ms)],
+            )
+        return execute(sql, params, many, context)
+
+    @staticmethod
+    def reset(connection) -> None:
+        """Drop the timeout before the connection is reused."""
+        if connection.needs_rollback:
+            # Set inside the aborted transaction; rolling back drops it
+            return
+        try:
+            StatementTimeout._execute(connection, "RESET statement_timeout")
+        except DatabaseError:
+            # Never hand a persistent or pooled connection on with the timeout
+            logger.warning("Could not reset statement_timeout", exc_info=True)
+            connection.close()
+
+    @staticmethod
+    def _execute(connection, sql: str, params=None) -> None:
+        # A bare cursor keeps this out of query budgets, logs and wrappers
+        cursor = connection.create_cursor()
+        try:
+            cursor.execute(sql, params)
+        finally:
+            cursor.close()
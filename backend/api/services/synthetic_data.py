@@ -0,0 +1,173 @@
+"""
+Synthetic listing data for benchmarks and load tests.
+
+Generated listings look like ingested ones (addresses with postal codes,
+coordinates inside the region, a ``raw_data`` payload) and are fully
+determined by the seed, so two runs with the same size and seed measure
+the same dataset.
+"""
+
+import random
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+from ..models import Property, Region
+from .ingestion_service import IngestionService
+
+# Ingestion source name synthetic listings are tagged with, and the prefix
+# of their external ids
+SOURCE = "synthetic"
+EXTERNAL_ID_PREFIX = "SYN-"
+
+# code, name, CP4 range, centre (lon, lat), price/sqm, rent, yield
+REGIONS = [
+    ("LIS", "Lisbon", (1000, 1999), (-9.1393, 38.7223), 5200, 1500, 4.1),
+    ("OPO", "Porto", (4000, 4499), (-8.6291, 41.1579), 3400, 1050, 4.6),
+    ("CAS", "Cascais", (2750, 2789), (-9.4215, 38.6979), 5600, 1800, 3.9),
+    ("FAO", "Faro", (8000, 8099), (-7.9304, 37.0194), 3100, 950, 5.0),
+    ("BRG", "Braga", (4700, 4719), (-8.4265, 41.5454), 1900, 700, 5.4),
+]
+
+STREETS = [
+    "Rua Augusta",
+    "Avenida da Liberdade",
+    "Rua do Comércio",
+    "Rua da Prata",
+    "Rua de Santa Catarina",
+    "Avenida dos Aliados",
+    "Rua das Flores",
+    "Avenida da República",
+]
+
+PROPERTY_TYPES = [
+    ("apartment", 70),
+    ("house", 20),
+    ("land", 4),
+    ("commercial", 4),
+    ("mixed", 2),
+]
+
+CONDITIONS = [choice for choice, _ in Property.CONDITION_CHOICES]
+ENERGY_RATINGS = [choice for choice, _ in Property.ENERGY_RATING_CHOICES]
+
+
+class SyntheticData:
+    """Deterministic generator of regions and listings."""
+
+    @staticmethod
+    def ensure_regions() -> Dict[str, Region]:
+        """Create the synthetic regions if missing; return them by code."""
+        regions = {}
+        for code, name, _, _, price_per_sqm, rent, yield_ in REGIONS:
+            region, _created = Region.objects.get_or_create(  # type: ignore[attr-defined]  # noqa: E501
+                code=code,
+                defaults={
+                    "name": name,
+                    "avg_price_per_sqm": Decimal(price_per_sqm),
+                    "avg_rent": Decimal(rent),
+                    "avg_yield": Decimal(str(yield_)),
+                },
+            )
+            regions[code] = region
+        return regions
+
+    @staticmethod
+    def rows(
+        count: int, seed: int = 0, start: int = 0, raw_data_size: int = 20
+    ) -> Iterator[dict]:
+        """
+        Yield ``count`` listing rows in the ingestion format.
+
+        Row ``i`` depends only on the seed and ``start + i``, so a dataset can
+        be generated in batches. ``raw_data_size`` is the number of extra
+        attributes in each row's upstream payload.
+        """
+        types, weights = zip(*PROPERTY_TYPES)
+        for index in range(start, start + count):
+            rng = random.Random(f"{seed}:{index}")
+            code, _, (cp4_low, cp4_high), (lon, lat), price_per_sqm, _, _ = rng.choice(
+                REGIONS
+            )
+            property_type = rng.choices(types, weights)[0]
+            size_sqm = round(rng.uniform(35, 400), 2)
+            price = round(size_sqm * price_per_sqm * rng.uniform(0.6, 1.5), -2)
+            bedrooms = rng.randint(0, 6) if property_type != "land" else None
+            cp4 = rng.randint(cp4_low, cp4_high)
+            address = (
+                f"{rng.choice(STREETS)} {rng.randint(1, 400)}, "
+                f"{cp4}-{rng.randint(0, 999):03d}"
+            )
+            external_id = f"{EXTERNAL_ID_PREFIX}{seed}-{index:08d}"
+            yield {
+                "external_id": external_id,
+                "address": address,
+                "coordinates": [
+                    round(lon + rng.uniform(-0.08, 0.08), 6),
+                    round(lat + rng.uniform(-0.06, 0.06), 6),
+                ],
+                "price": price,
+                "size_sqm": size_sqm,
+                "property_type": property_type,
+                "bedrooms": bedrooms,
+                "bathrooms": float(rng.randint(1, 4)) if bedrooms else None,
+                "year_built": rng.randint(1900, 2025),
+                "condition": rng.choice(CONDITIONS),
+                "floor_number": (
+                    rng.randint(0, 12) if property_type == "apartment" else None
+                ),
+                "total_floors": (
+                    rng.randint(12, 15) if property_type == "apartment" else None
+                ),
+                "has_elevator": rng.random() < 0.6,
+                "parking_spaces": rng.randint(0, 2),
+                "has_balcony": rng.random() < 0.5,
+                "has_terrace": rng.random() < 0.2,
+                "energy_rating": rng.choice(ENERGY_RATINGS),
+                "listing_status": "active" if rng.random() < 0.9 else "pending",
+                "source_url": f"https://example.com/listings/{external_id.lower()}",
+                "region": code,
+                "description": f"{property_type.title()} with {bedrooms or 0} bedrooms",
+                "images": [
+                    f"https://example.com/images/{external_id.lower()}-{n}.jpg"
+                    for n in range(rng.randint(1, 8))
+                ],
+                "attributes": {
+                    f"attribute_{n}": rng.random() for n in range(raw_data_size)
+                },
+            }
+
+    @staticmethod
+    def properties(
+        count: int,
+        seed: int = 0,
+        regions: Optional[Dict[str, Region]] = None,
+        raw_data_size: int = 20,
+    ) -> List[Property]:
+        """Return ``count`` unsaved listings, payload included."""
+        region_ids = {code: region.pk for code, region in (regions or {}).items()}
+        # normalize_row() fills the payload (description, images, raw_data)
+        return [
+            IngestionService.normalize_row(row, region_ids)  # type: ignore[misc]
+            for row in SyntheticData.rows(count, seed=seed, raw_data_size=raw_data_size)
+        ]
+
+    @staticmethod
+    def generate(
+        count: int, seed: int = 0, batch_size: int = 1000, raw_data_size: int = 20
+    ) -> int:
+        """
+        Upsert ``count`` listings through the ingestion path.
+
+        Rerunning with the same seed updates the same listings instead of
+        adding more. Returns the number of listings written.
+        """
+        SyntheticData.ensure_regions()
+        written = 0
+        for start in range(0, count, batch_size):
+            rows = SyntheticData.rows(
+                min(batch_size, count - start),
+                seed=seed,
+                start=start,
+                raw_data_size=raw_data_size,
+            )
+            written += IngestionService.upsert_listings(rows, source=SOURCE)
+        return written
@@ -0,0 +1,42 @@
+"""
+Signal handlers for the API app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Property, Region
+from .services.region_cache import RegionCache
+from .services.response_cache import PROPERTIES_SCOPE, ResponseCache
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+def invalidate_region_cache(sender, **kwargs):
+    """
+    Invalidate cached regions whenever a region changes.
+
+    Invalidating again after commit stops another worker from caching the
+    pre-commit rows under the new version.
+    """
+    RegionCache.invalidate()
+    transaction.on_commit(RegionCache.invalidate)
+
+
+def bump_property_responses():
+    ResponseCache.bump(PROPERTIES_SCOPE)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_responses(sender, **kwargs):
+    """
+    Mark cached property responses stale whenever a listing changes.
+
+    Bumped again after commit for the same reason as regions. Bulk writes
+    (``ResponseCache.bulk_write()``) bump once for all their rows instead.
+    """
+    if ResponseCache.in_bulk_write(PROPERTIES_SCOPE):
+        return
+    bump_property_responses()
+    transaction.on_commit(bump_property_responses)
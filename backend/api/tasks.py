@@ -0,0 +1,128 @@
+"""
+Celery tasks for the API app.
+
+Listing syncs fan out as a chord: ``sync_listings`` splits a source into
+chunks, ``ingest_chunk`` upserts one chunk per worker task, and
+``finalize_sync`` runs once every chunk has finished.
+"""
+
+from typing import List, Optional
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import SyncChunk, SyncRun
+from .services.archive_service import ArchiveService
+from .services.cache_warming import CacheWarmer
+from .services.ingestion_service import IngestionService, get_listing_source
+from .services.property_service import PropertyService
+
+
+@shared_task
+def sync_listings(
+    source_name: str, run_id: Optional[int] = None, resume: bool = True
+) -> int:
+    """
+    Start or resume a sync of ``source_name`` and fan its chunks out.
+
+    Chunks already marked done are not dispatched again, so re-running the
+    coordinator after a crash only processes the remaining work.
+    """
+    run = IngestionService.start_or_resume_run(source_name, run_id, resume)
+    pending = list(
+        run.chunks.exclude(status="done").values_list(  # type: ignore[attr-defined]
+            "key", flat=True
+        )
+    )
+
+    if pending:
+        chord(ingest_chunk.si(run.pk, key) for key in pending)(finalize_sync.si(run.pk))
+    else:
+        finalize_sync.delay(run.pk)
+    return run.pk
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def ingest_chunk(self, run_id: int, key: str) -> int:
+    """Upsert the listings of one chunk; a no-op if the chunk is already done."""
+    chunk = SyncChunk.objects.select_related("run").get(  # type: ignore[attr-defined]  # noqa: E501
+        run_id=run_id, key=key
+    )
+    if chunk.status == "done":
+        return chunk.rows
+
+    SyncChunk.objects.filter(pk=chunk.pk).update(  # type: ignore[attr-defined]
+        attempts=F("attempts") + 1
+    )
+    try:
+        rows = get_listing_source(chunk.run.source).fetch(key)
+        with transaction.atomic():
+            count = IngestionService.upsert_listings(rows, source=chunk.run.source)
+            SyncChunk.objects.filter(pk=chunk.pk).update(  # type: ignore[attr-defined]  # noqa: E501
+                status="done", rows=count, error="", finished_at=timezone.now()
+            )
+    except Exception as exc:
+        SyncChunk.objects.filter(pk=chunk.pk).update(  # type: ignore[attr-defined]
+            status="failed", error=str(exc)
+        )
+        raise self.retry(exc=exc)
+    return count
+
+
+@shared_task
+def finalize_sync(run_id: int) -> dict:
+    """
+    Withdraw listings the source stopped reporting and refresh region stats.
+
+    Withdrawal only happens when every chunk is done; otherwise the run is
+    left resumable instead of withdrawing listings from unprocessed chunks.
+    """
+    run = SyncRun.objects.get(pk=run_id)  # type: ignore[attr-defined]
+    if run.status == "completed":
+        return {"run_id": run.pk, "status": run.status}
+
+    if run.chunks.exclude(status="done").exists():  # type: ignore[attr-defined]
+        return {"run_id": run.pk, "status": run.status}
+
+    SyncRun.objects.filter(pk=run.pk).update(  # type: ignore[attr-defined]
+        status="finalizing"
+    )
+    withdrawn = IngestionService.withdraw_unseen(run)
+    upserted = run.chunks.aggregate(total=Sum("rows"))["total"] or 0  # type: ignore[attr-defined]  # noqa: E501
+    SyncRun.objects.filter(pk=run.pk).update(  # type: ignore[attr-defined]
+        status="completed",
+        finished_at=timezone.now(),
+        rows_upserted=upserted,
+        rows_withdrawn=withdrawn,
+    )
+    refresh_region_statistics.delay()
+    return {
+        "run_id": run.pk,
+        "status": "completed",
+        "rows_upserted": upserted,
+        "rows_withdrawn": withdrawn,
+    }
+
+
+@shared_task
+def refresh_region_statistics(region_ids: Optional[List[int]] = None) -> int:
+    """Recompute region averages from active listings."""
+    return PropertyService.refresh_region_statistics(region_ids)
+
+
+@shared_task
+def archive_listings(older_than_days: int = 30, batch_size: int = 500) -> int:
+    """Move sold and withdrawn listings to the archive table."""
+    return ArchiveService.archive(
+        older_than_days=older_than_days, batch_size=batch_size
+    )
+
+
+@shared_task
+def warm_caches(limit: Optional[int] = None, concurrency: Optional[int] = None) -> dict:
+    """Replay the most frequent read query shapes to fill cold caches."""
+    return CacheWarmer.warm(
+        limit if limit is not None else settings.CACHE_WARMING_LIMIT,
+        concurrency if concurrency is not None else settings.CACHE_WARMING_CONCURRENCY,
+    )
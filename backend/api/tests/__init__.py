@@ -7,6 +7,11 @@ This package contains comprehensive tests for all API components:
 - test_views.py: View and ViewSet tests (PropertyViewSet, RegionViewSet, health_check)
 - test_services.py: Service layer tests (PropertyService)
 - test_permissions.py: Permission class tests
+- test_throttling.py: Token-bucket throttle tests
+- test_query_budgets.py: Query budget enforcement tests
+- test_memory_budgets.py: Memory profiling, CSV export and memory budget tests
+- test_tracing.py: Tracing spans, exporters and trace propagation tests
 - test_utils.py: Utility function tests
 - test_management_commands.py: Management command tests
+- test_tasks.py: Celery task tests (listing ingestion pipeline)
 """
@@ -1,14 +1,21 @@
 """
 Tests for admin configurations.
 
-This module tests all admin methods and configurations.
+This module tests all admin methods and configurations, and the
+estimated-count paginator of large changelists (with PostgreSQL-only
+planner tests).
 """
 
-from django.test import TestCase
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.admin.sites import site
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 from api.models import Property, Region, SavedProperty
+from core.pagination import EstimatedCountPaginator, estimate_count
 
 User = get_user_model()
 
@@ -185,3 +192,172 @@ class AdminTest(TestCase):
         admin = RegionAdmin(Region, site)
         count = admin.property_count(self.region)  # type: ignore[attr-defined]
         self.assertEqual(count, 1)
+
+    def test_property_admin_change_form_shows_payload_inline(self):
+        """Test the change form edits the payload through its inline."""
+        admin_user = User.objects.create_superuser(  # type: ignore[attr-defined]
+            username="admin", email="admin@example.com", password="adminpass123"
+        )
+        self.client.force_login(admin_user)
+        self.property.raw_data = {"source": "feed"}
+        self.property.save()
+
+        response = self.client.get(f"/admin/api/property/{self.property.pk}/change/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "payload-0-raw_data")
+        self.assertContains(response, "feed")
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    """Test cases for the estimated-count admin paginator."""
+
+    def setUp(self):
+        """Set up listings, saves and a logged-in superuser."""
+        self.region = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS"
+        )
+        self.properties = [
+            Property.objects.create(  # type: ignore[attr-defined]
+                external_id=f"EST-{n}",
+                address=f"Rua {n}",
+                price=Decimal("300000.00"),
+                size_sqm=Decimal("100.00"),
+                property_type="apartment",
+                region=self.region,
+            )
+            for n in range(3)
+        ]
+        self.admin_user = User.objects.create_superuser(  # type: ignore[attr-defined]
+            username="admin", email="admin@example.com", password="adminpass123"
+        )
+        for n in range(2):
+            user = User.objects.create_user(  # type: ignore[attr-defined]
+                username=f"saver{n}", email=f"saver{n}@example.com", password="pw"
+            )
+            SavedProperty.objects.create(  # type: ignore[attr-defined]
+                user=user, property=self.properties[0]
+            )
+        self.client.force_login(self.admin_user)
+
+    def test_estimate_above_threshold(self):
+        """Test that estimates at or above the threshold replace COUNT(*)."""
+        queryset = Property.objects.order_by("pk")  # type: ignore[attr-defined]
+        with patch("core.pagination.estimate_count", return_value=250_000):
+            with override_settings(ADMIN_COUNT_ESTIMATE_THRESHOLD=100_000):
+                paginator = EstimatedCountPaginator(queryset, 100)
+                with self.assertNumQueries(0):
+                    self.assertEqual(paginator.count, 250_000)
+        self.assertEqual(paginator.num_pages, 2500)
+
+    def test_exact_count_below_threshold(self):
+        """Test that small estimates are replaced by an exact count."""
+        queryset = Property.objects.order_by("pk")  # type: ignore[attr-defined]
+        with patch("core.pagination.estimate_count", return_value=50):
+            paginator = EstimatedCountPaginator(queryset, 100)
+            self.assertEqual(paginator.count, 3)
+
+    def test_no_estimate_outside_postgres(self):
+        """Test that databases without planner estimates count exactly."""
+        queryset = Property.objects.order_by("pk")  # type: ignore[attr-defined]
+        self.assertIsNone(estimate_count(queryset))
+        self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 3)
+
+    def test_estimate_parses_text_plans(self):
+        """Test both estimate branches against a driver returning JSON text."""
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        # Never analyzed, so reltuples is -1 and EXPLAIN is asked instead
+        cursor.fetchone.side_effect = [(-1,), ('[{"Plan": {"Plan Rows": 1234}}]',)]
+        queryset = Property.objects.all()  # type: ignore[attr-defined]
+
+        with patch.object(connection, "vendor", "postgresql"), patch.object(
+            connection, "cursor", return_value=cursor
+        ):
+            self.assertEqual(estimate_count(queryset), 1234)
+
+        # Savepoints of the test transaction use the cursor too
+        reltuples, explain = [
+            call.args
+            for call in cursor.execute.call_args_list
+            if "SAVEPOINT" not in call.args[0]
+        ]
+        self.assertIn("pg_class", reltuples[0])
+        self.assertEqual(reltuples[1], ["api_property"])
+        self.assertTrue(explain[0].startswith("EXPLAIN (FORMAT JSON) SELECT"))
+
+    def test_property_changelist(self):
+        """Test the changelist counts once and saves only for the page."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/api/property/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["cl"].show_full_result_count)
+        saved = {
+            obj.pk: obj.saved_count_annotation
+            for obj in response.context["cl"].result_list
+        }
+        self.assertEqual(
+            saved,
+            {
+                self.properties[0].pk: 2,
+                self.properties[1].pk: 0,
+                self.properties[2].pk: 0,
+            },
+        )
+        counts = [q["sql"] for q in queries if "COUNT(" in q["sql"].upper()]
+        self.assertEqual(len(counts), 2, counts)
+        saves = [c for c in counts if "api_savedproperty" in c]
+        self.assertEqual(len(saves), 1)
+        self.assertIn(" IN (", saves[0])
+
+    def test_saved_property_changelist(self):
+        """Test the saved-property changelist skips the full result count."""
+        response = self.client.get("/admin/api/savedproperty/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["cl"].show_full_result_count)
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+
+@skipUnless(connection.vendor == "postgresql", "planner estimates need PostgreSQL")
+class PostgresEstimateCountTest(TestCase):
+    """Test cases for estimate_count against PostgreSQL's planner."""
+
+    def setUp(self):
+        """Set up listings in two property types."""
+        Property.objects.bulk_create(  # type: ignore[attr-defined]
+            Property(
+                external_id=f"PG-{n}",
+                address=f"Rua {n}",
+                price=Decimal("300000.00"),
+                size_sqm=Decimal("100.00"),
+                property_type="apartment" if n % 2 else "house",
+            )
+            for n in range(50)
+        )
+
+    def test_unfiltered_count_from_reltuples(self):
+        """Test that an analyzed table is counted from pg_class.reltuples."""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE api_property")
+
+        with CaptureQueriesContext(connection) as queries:
+            estimate = estimate_count(Property.objects.all())  # type: ignore[attr-defined]  # noqa: E501
+
+        self.assertEqual(estimate, 50)
+        self.assertFalse(any("EXPLAIN" in q["sql"] for q in queries))
+
+    def test_filtered_count_from_explain(self):
+        """Test that a filtered queryset is estimated from its JSON plan."""
+        queryset = Property.objects.filter(  # type: ignore[attr-defined]
+            property_type="house"
+        )
+        with CaptureQueriesContext(connection) as queries:
+            estimate = estimate_count(queryset)
+
+        self.assertIsInstance(estimate, int)
+        self.assertGreater(estimate, 0)
+        self.assertTrue(
+            any(q["sql"].startswith("EXPLAIN (FORMAT JSON)") for q in queries)
+        )
@@ -3,13 +3,30 @@ Tests for management commands.
 
 This module tests all management command functionality including:
 - seed_data command
+- archive_listings command
+- warm_caches command
+- profile_startup command
+- profile_token command
+- seed_dataset command
+- load_test command (against a live server)
 """
 
-from django.test import TestCase
+from datetime import timedelta
+import json
+from django.test import LiveServerTestCase, TestCase
 from django.core.management import call_command
+from django.utils import timezone
 from io import StringIO
+from django.core.cache import cache
+from django.test import override_settings
+from django.core import signing
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
 from decimal import Decimal
-from api.models import Property, Region
+from api.models import ArchivedProperty, Property, Region
+from api.services.cache_warming import QueryShapeLog
+from api.throttling import LocalTokenBuckets
+from api.management.commands.profile_startup import by_package, parse_importtime
 
 
 class SeedDataCommandTest(TestCase):
@@ -136,3 +153,273 @@ class SeedDataCommandTest(TestCase):
         self.assertGreater(porto_count, 0)
         self.assertGreater(cascais_count, 0)
         self.assertEqual(lisbon_count + porto_count + cascais_count, 20)
+
+
+class ArchiveListingsCommandTest(TestCase):
+    """Test cases for archive_listings management command."""
+
+    def setUp(self):
+        """Create one old sold listing and one active listing."""
+        for external_id, status in [("OLD-SOLD", "sold"), ("ACTIVE", "active")]:
+            Property.objects.create(  # type: ignore[attr-defined]
+                external_id=external_id,
+                address=f"{external_id} Address",
+                price=Decimal("100000.00"),
+                size_sqm=Decimal("50.00"),
+                property_type="apartment",
+                listing_status=status,
+            )
+        Property.objects.update(  # type: ignore[attr-defined]
+            updated_at=timezone.now() - timedelta(days=60)
+        )
+
+    def test_archive_listings(self):
+        """Test that archive_listings moves inactive listings."""
+        out = StringIO()
+        call_command("archive_listings", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Archived 1 listings", out.getvalue())
+        self.assertEqual(
+            list(Property.objects.values_list("external_id", flat=True)),  # type: ignore[attr-defined]  # noqa: E501
+            ["ACTIVE"],
+        )
+        self.assertTrue(
+            ArchivedProperty.objects.filter(external_id="OLD-SOLD").exists()  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+    def test_archive_listings_dry_run(self):
+        """Test that --dry-run only reports the count."""
+        out = StringIO()
+        call_command("archive_listings", "--dry-run", stdout=out)
+
+        self.assertIn("1 listings would be archived", out.getvalue())
+        self.assertEqual(Property.objects.count(), 2)  # type: ignore[attr-defined]
+        self.assertFalse(
+            ArchivedProperty.objects.exists()  # type: ignore[attr-defined]
+        )
+
+
+@override_settings(CACHE_WARMING_SAMPLE_RATE=1.0)
+class WarmCachesCommandTest(TestCase):
+    """Test cases for warm_caches management command."""
+
+    def setUp(self):
+        """Record one region list request."""
+        cache.clear()
+        QueryShapeLog.clear()
+        Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]
+        self.client.get("/api/regions/?search=lis")
+
+    def test_warm_caches(self):
+        """Test that warm_caches replays recorded shapes."""
+        out = StringIO()
+        call_command("warm_caches", "--concurrency", "1", stdout=out)
+
+        self.assertIn("Warmed 1 query shapes (0 failed)", out.getvalue())
+
+    def test_warm_caches_list(self):
+        """Test that --list prints shapes without replaying them."""
+        out = StringIO()
+        call_command("warm_caches", "--list", stdout=out)
+
+        self.assertEqual(
+            out.getvalue().strip(), "http://testserver/api/regions/?search=lis"
+        )
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2120 | django
+import time:       500 |        500 |     django.utils.version
+import time:      1500 |       2000 |   django.db
+import time:       300 |        300 | api.models
+"""
+
+
+class ProfileStartupCommandTest(TestCase):
+    """Test cases for profile_startup management command."""
+
+    def test_parse_importtime(self):
+        """Test that importtime lines are parsed with their nesting depth."""
+        timings = parse_importtime(IMPORTTIME_OUTPUT + "unrelated output\n")
+
+        self.assertEqual(len(timings), 5)
+        self.assertEqual(timings[0].name, "_io")
+        self.assertEqual(timings[0].depth, 1)
+        self.assertEqual(timings[1].cumulative_us, 2120)
+        self.assertEqual(timings[1].depth, 0)
+        self.assertEqual(timings[2].depth, 2)
+
+    def test_by_package(self):
+        """Test that self time is summed per top-level package."""
+        totals = by_package(parse_importtime(IMPORTTIME_OUTPUT))
+
+        self.assertEqual(list(totals), ["django", "api", "_io"])
+        self.assertEqual(totals["django"], 4000)
+
+    def test_profile_startup(self):
+        """Test that the command reports timings for the wsgi entry point."""
+        out = StringIO()
+        call_command("profile_startup", "--target", "wsgi", "--repeat", "1", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("wsgi:", output)
+        self.assertIn("Import time by package", output)
+        self.assertIn("django", output)
+
+
+class ProfileTokenCommandTest(TestCase):
+    """Test cases for profile_token management command."""
+
+    def test_profile_token(self):
+        """Test that the printed token is signed for profiling."""
+        out = StringIO()
+        call_command("profile_token", stdout=out)
+
+        token = out.getvalue().strip()
+        self.assertEqual(
+            signing.TimestampSigner(salt="core.profiling").unsign(token), "profile"
+        )
+
+
+class SeedDatasetCommandTest(TestCase):
+    """Test cases for seed_dataset management command."""
+
+    @override_settings(DEBUG=True)
+    def test_seed_dataset(self):
+        """Test that listings and load-test accounts are created once."""
+        for _ in range(2):
+            call_command(
+                "seed_dataset",
+                "--size",
+                "30",
+                "--users",
+                "2",
+                "--password",
+                "s3cret-pw",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(Property.objects.count(), 30)  # type: ignore[attr-defined]
+        user = get_user_model().objects.get(email="loadtest2@example.com")
+        self.assertTrue(user.check_password("s3cret-pw"))
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_seed_dataset_refused_without_debug(self):
+        """Test that seeding needs DEBUG or --force."""
+        with self.assertRaisesMessage(CommandError, "--force"):
+            call_command("seed_dataset", "--size", "5", stdout=StringIO())
+
+        self.assertFalse(Property.objects.exists())  # type: ignore[attr-defined]
+
+    def test_seed_dataset_random_password(self):
+        """Test that accounts without --password get a printed random one."""
+        out = StringIO()
+        call_command(
+            "seed_dataset", "--size", "5", "--users", "1", "--force", stdout=out
+        )
+
+        password = out.getvalue().split("Load-test password: ")[1].strip()
+        user = get_user_model().objects.get(email="loadtest1@example.com")
+        self.assertTrue(user.check_password(password))
+        self.assertNotEqual(password, "loadtest")
+
+
+# Live-server threads share the in-memory SQLite connection, so per-request
+# query counts include concurrent requests' queries
+@override_settings(QUERY_BUDGET_MODE="off")
+class LoadTestCommandTest(LiveServerTestCase):
+    """Test cases for load_test management command."""
+
+    password = "loadtest-pw"
+
+    def setUp(self):
+        """Seed the served database and reset throttle buckets."""
+        cache.clear()
+        LocalTokenBuckets.clear()
+        call_command(
+            "seed_dataset",
+            "--size",
+            "60",
+            "--users",
+            "1",
+            "--password",
+            self.password,
+            "--force",
+            stdout=StringIO(),
+        )
+
+    def test_load_test_report(self):
+        """Test that every endpoint of the mix is hit without errors."""
+        out = StringIO()
+        call_command(
+            "load_test",
+            "--base-url",
+            self.live_server_url,
+            "--requests",
+            "80",
+            "--concurrency",
+            "2",
+            "--users",
+            "1",
+            "--password",
+            self.password,
+            "--json",
+            stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["total"]["requests"], 80)
+        self.assertEqual(report["total"]["error_rate"], 0, report["total"])
+        self.assertEqual(report["throttled_share"], 0)
+        self.assertEqual(report["skipped"], [])
+        self.assertEqual(
+            set(report["endpoints"]),
+            {"viewport", "list", "search", "detail", "compare", "login", "write"},
+        )
+        viewport = report["endpoints"]["viewport"]
+        self.assertGreater(viewport["requests"], 0)
+        self.assertLessEqual(viewport["p50_ms"], viewport["p99_ms"])
+
+    def test_table_without_auth(self):
+        """Test the table report of an anonymous run."""
+        out = StringIO()
+        call_command(
+            "load_test",
+            "--base-url",
+            self.live_server_url,
+            "--requests",
+            "10",
+            "--no-auth",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("p95 ms", output)
+        self.assertNotIn("write", output)
+        self.assertIn("total", output)
+
+    @override_settings(TOKEN_BUCKET_THROTTLE={"CAPACITY": 2, "REFILL_RATE": 0.01})
+    def test_throttled_run_fails(self):
+        """Test that a run measuring mostly 429s fails loudly."""
+        with self.assertRaisesMessage(CommandError, "were throttled (429)"):
+            call_command(
+                "load_test",
+                "--base-url",
+                self.live_server_url,
+                "--requests",
+                "20",
+                "--no-auth",
+                stdout=StringIO(),
+            )
+
+    def test_password_required_to_log_in(self):
+        """Test that authenticated runs need the accounts' password."""
+        with self.assertRaisesMessage(CommandError, "--password is required"):
+            call_command("load_test", "--base-url", self.live_server_url)
+
+    def test_unknown_endpoint(self):
+        """Test that an unknown endpoint in the mix is rejected."""
+        with self.assertRaises(CommandError):
+            call_command("load_test", "--mix", "viewport=1,sitemap=2")
@@ -0,0 +1,197 @@
+"""
+Tests for memory profiling and memory budgets.
+
+This module tests:
+- memory_profile() peak, retained memory and allocation sites, also with
+  concurrent profiles
+- MemoryProfilingMiddleware logging and headers
+- The streaming CSV export
+- profile_memory command
+- Peak memory of a 100-row list page and of a full export with large
+  raw_data payloads
+"""
+
+import csv
+import io
+import logging
+import threading
+import tracemalloc
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.services.synthetic_data import SyntheticData
+from core.memory import memory_profile
+from core.testing import MemoryBudgetTestMixin
+
+KIB = 1024
+MIB = 1024 * KIB
+
+
+class MemoryProfileTest(TestCase):
+    """Test cases for the memory_profile context manager."""
+
+    def test_peak_and_retained(self):
+        """Test that temporary and retained allocations are told apart."""
+        kept = []
+        with memory_profile() as profile:
+            temporary = bytearray(4 * MIB)
+            del temporary
+            kept.append(bytearray(MIB))
+
+        self.assertGreaterEqual(profile.peak, 4 * MIB)
+        self.assertGreaterEqual(profile.retained, MIB)
+        self.assertLess(profile.retained, 2 * MIB)
+        site, size, _count = profile.top[0]
+        self.assertIn("test_memory_budgets.py", site)
+        self.assertGreaterEqual(size, MIB)
+        self.assertIn("Peak", profile.format())
+
+    def test_concurrent_profiles(self):
+        """Test that overlapping profiles keep tracing and their peaks."""
+        spiked, inner_done = threading.Event(), threading.Event()
+        results = {}
+
+        def outer():
+            with memory_profile() as profile:
+                temporary = bytearray(4 * MIB)
+                del temporary
+                spiked.set()
+                inner_done.wait(10)
+                results["tracing"] = tracemalloc.is_tracing()
+            results["outer"] = profile
+
+        def inner():
+            spiked.wait(10)
+            with memory_profile() as profile:
+                pass
+            results["inner"] = profile
+            inner_done.set()
+
+        threads = [threading.Thread(target=outer), threading.Thread(target=inner)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        # The inner profile ended first without stopping tracing or
+        # discarding the outer profile's earlier peak
+        self.assertTrue(results["tracing"])
+        self.assertGreaterEqual(results["outer"].peak, 4 * MIB)
+        self.assertLess(results["inner"].peak, MIB)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class ExportTest(TestCase):
+    """Test cases for the streaming CSV export."""
+
+    def setUp(self):
+        """Set up test client and data."""
+        cache.clear()
+        self.client = APIClient()
+        SyntheticData.generate(30, raw_data_size=2)
+
+    def test_export_csv(self):
+        """Test that every filtered listing is exported with its region."""
+        response = self.client.get("/api/properties/export/", {"listing_status": "all"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(response).decode())))
+        self.assertEqual(len(rows), 30)
+        self.assertIn(rows[0]["region_code"], {"LIS", "OPO", "CAS", "FAO", "BRG"})
+        self.assertTrue(float(rows[0]["longitude"]) < 0)
+        self.assertNotIn("raw_data", rows[0])
+
+    def test_export_filters(self):
+        """Test that the list filters apply to the export."""
+        response = self.client.get(
+            "/api/properties/export/", {"property_type": "apartment"}
+        )
+
+        rows = list(csv.DictReader(io.StringIO(b"".join(response).decode())))
+        self.assertTrue(rows)
+        self.assertEqual({row["property_type"] for row in rows}, {"apartment"})
+
+
+class MemoryProfilingMiddlewareTest(TestCase):
+    """Test cases for MemoryProfilingMiddleware."""
+
+    def setUp(self):
+        """Set up test client and data."""
+        cache.clear()
+        self.client = APIClient()
+        SyntheticData.generate(5, raw_data_size=2)
+
+    def test_disabled_by_default(self):
+        """Test that requests are not traced unless enabled."""
+        response = self.client.get("/api/properties/")
+
+        self.assertNotIn("X-Memory-Peak", response)
+
+    @override_settings(MEMORY_PROFILING=True, MEMORY_PROFILING_TOP=3)
+    def test_buffered_response(self):
+        """Test that a buffered response reports its peak."""
+        with self.assertLogs("core.memory", level="INFO") as logs:
+            response = self.client.get("/api/properties/")
+
+        self.assertGreater(int(response["X-Memory-Peak"]), 0)
+        record = logs.records[0]
+        self.assertEqual(record.path, "/api/properties/")
+        self.assertLessEqual(len(record.top_sites), 3)
+
+    @override_settings(MEMORY_PROFILING=True)
+    def test_streaming_response(self):
+        """Test that a streaming response is measured once sent."""
+        with self.assertLogs("core.memory", level="INFO") as logs:
+            response = self.client.get("/api/properties/export/")
+            self.assertEqual(logs.records, [])
+            b"".join(response)
+
+        self.assertNotIn("X-Memory-Peak", response)
+        self.assertEqual(logs.records[0].path, "/api/properties/export/")
+        self.assertGreater(logs.records[0].peak_kb, 0)
+
+
+class ProfileMemoryCommandTest(TestCase):
+    """Test cases for profile_memory management command."""
+
+    def test_profile_command(self):
+        """Test that a command's output and memory report are printed."""
+        out = StringIO()
+        call_command(
+            "profile_memory",
+            "--top",
+            "2",
+            "seed_dataset",
+            "--size",
+            "5",
+            "--force",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("Generated 5 listings", output)
+        self.assertIn("Peak", output)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=200)
+class MemoryBudgetTest(MemoryBudgetTestMixin, TestCase):
+    """Peak memory budgets of the heavy read paths."""
+
+    def setUp(self):
+        """Listings with roughly 20 KiB of raw_data each."""
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.client = APIClient()
+        SyntheticData.generate(1000, raw_data_size=800, batch_size=250)
+
+    def test_list_page_budget(self):
+        """Test that a 100-row page never loads the raw_data payloads."""
+        self.assertMemoryBudget("/api/properties/", 4 * MIB, {"page_size": 100})
+
+    def test_export_budget(self):
+        """Test that exporting every listing stays within a fixed budget."""
+        self.assertMemoryBudget("/api/properties/export/", MIB)
@@ -5,12 +5,15 @@ This module tests all model functionality including:
 - Property model (all fields, methods, edge cases)
 - Region model (all fields, methods)
 - SavedProperty model (relationships, constraints)
+- PropertyPayload model and CompressedJSONField
 """
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.db import connection
 from decimal import Decimal
-from api.models import Property, Region, SavedProperty
+from api.fields import CODEC_NONE, CODEC_ZLIB
+from api.models import Property, PropertyPayload, Region, SavedProperty
 
 User = get_user_model()
 
@@ -187,6 +190,29 @@ class PropertyModelTest(TestCase):
         self.assertIsNone(prop.has_elevator)
         self.assertIsNone(prop.energy_rating)
 
+    def test_property_postal_code_extracted_on_save(self):
+        """Test Property derives postal code columns from the address."""
+        prop = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TEST-CP",
+            address="Rua do Ouro 20, 1100-060 Lisboa",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+        )
+
+        self.assertEqual(prop.postal_code, "1100-060")
+        self.assertEqual(prop.postal_code_prefix, "1100")
+        self.assertEqual(self.property.postal_code, "")
+
+    def test_property_postal_code_follows_address_update_fields(self):
+        """Test saving only the address also updates the postal code."""
+        self.property.address = "Avenida da Boavista, 4100-123 Porto"
+        self.property.save(update_fields=["address"])
+
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.postal_code, "4100-123")
+        self.assertEqual(self.property.postal_code_prefix, "4100")
+
 
 class RegionModelTest(TestCase):
     """Test cases for Region model."""
@@ -507,3 +533,87 @@ class SavedPropertyModelTest(TestCase):
         result = str(self.saved_property)
         self.assertIn("test@example.com", result)
         self.assertIn("Test Address 123", result)
+
+
+class PropertyPayloadModelTest(TestCase):
+    """Test cases for PropertyPayload and the Property payload accessors."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.property = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TEST-PAYLOAD",
+            address="Test Payload",
+            description="Long description",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+            images=["https://example.com/a.jpg"],
+            raw_data={"source": "feed", "rooms": [1, 2]},
+        )
+
+    def test_payload_stored_in_side_table(self):
+        """Test payload values are persisted to PropertyPayload."""
+        payload = PropertyPayload.objects.get(pk=self.property.pk)  # type: ignore[attr-defined]  # noqa: E501
+
+        self.assertEqual(payload.description, "Long description")
+        self.assertEqual(payload.images, ["https://example.com/a.jpg"])
+        self.assertEqual(payload.raw_data, {"source": "feed", "rooms": [1, 2]})
+
+    def test_payload_loaded_lazily(self):
+        """Test loading a property does not read the payload until accessed."""
+        prop = Property.objects.get(pk=self.property.pk)  # type: ignore[attr-defined]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(prop.raw_data["source"], "feed")
+        with self.assertNumQueries(0):
+            self.assertEqual(prop.description, "Long description")
+
+    def test_payload_defaults_without_row(self):
+        """Test properties without a payload row expose empty defaults."""
+        prop = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TEST-NO-PAYLOAD",
+            address="No Payload",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+        )
+
+        self.assertFalse(PropertyPayload.objects.filter(pk=prop.pk).exists())  # type: ignore[attr-defined]  # noqa: E501
+        self.assertEqual(prop.description, "")
+        self.assertEqual(prop.images, [])
+        self.assertEqual(prop.raw_data, {})
+
+    def test_payload_update(self):
+        """Test updating a payload value through the property."""
+        self.property.raw_data = {"source": "updated"}
+        self.property.save()
+
+        prop = Property.objects.get(pk=self.property.pk)  # type: ignore[attr-defined]
+        self.assertEqual(prop.raw_data, {"source": "updated"})
+
+    def test_raw_data_is_compressed(self):
+        """Test raw_data is stored as codec-prefixed compressed bytes."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT raw_data FROM api_propertypayload WHERE property_id = %s",
+                [self.property.pk],
+            )
+            stored = bytes(cursor.fetchone()[0])
+
+        self.assertEqual(stored[:1], CODEC_ZLIB)
+
+    @override_settings(PAYLOAD_COMPRESSION="none")
+    def test_raw_data_readable_across_codecs(self):
+        """Test values written with another codec remain readable."""
+        self.property.raw_data = {"source": "plain"}
+        self.property.save()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT raw_data FROM api_propertypayload WHERE property_id = %s",
+                [self.property.pk],
+            )
+            self.assertEqual(bytes(cursor.fetchone()[0])[:1], CODEC_NONE)
+
+        payload = PropertyPayload.objects.get(pk=self.property.pk)  # type: ignore[attr-defined]  # noqa: E501
+        self.assertEqual(payload.raw_data, {"source": "plain"})
@@ -0,0 +1,133 @@
+"""
+Tests for query budgets.
+
+This module tests:
+- query_budget() limits, duplicate detection and modes
+- QueryBudgetMixin enforcement on viewsets
+- The declared budgets of every router endpoint at several page sizes
+"""
+
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Property, Region
+from api.services.archive_service import ArchiveService
+from api.urls import router
+from api.views import PropertyViewSet
+from core.query_budget import QueryBudgetExceeded, query_budget
+from core.testing import QueryBudgetTestMixin
+
+
+class QueryBudgetTest(TestCase):
+    """Test cases for the query_budget context manager."""
+
+    def setUp(self):
+        """Set up test data."""
+        Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]
+
+    def test_within_budget(self):
+        """Test that a block within its budget passes and records queries."""
+        with query_budget(2, "regions", mode="raise") as log:
+            list(Region.objects.all())  # type: ignore[attr-defined]
+
+        self.assertEqual(len(log), 1)
+
+    def test_over_budget_raises(self):
+        """Test that exceeding the budget raises with the queries listed."""
+        with self.assertRaises(QueryBudgetExceeded) as ctx:
+            with query_budget(1, "regions", mode="raise"):
+                list(Region.objects.all())  # type: ignore[attr-defined]
+                Region.objects.count()  # type: ignore[attr-defined]
+
+        self.assertIn("regions ran 2 queries (budget 1)", str(ctx.exception))
+        self.assertIn("COUNT(*)", str(ctx.exception))
+
+    @override_settings(QUERY_BUDGET_DUPLICATE_THRESHOLD=3)
+    def test_duplicate_queries_show_stack(self):
+        """Test that repeated SQL is reported with the calling stack."""
+        with self.assertRaises(QueryBudgetExceeded) as ctx:
+            with query_budget(None, "lookups", mode="raise"):
+                for _ in range(3):
+                    Region.objects.filter(code="LIS").first()  # type: ignore[attr-defined]  # noqa: E501
+
+        message = str(ctx.exception)
+        self.assertIn("Duplicate query x3", message)
+        self.assertIn("test_query_budgets.py", message)
+        self.assertIn("test_duplicate_queries_show_stack", message)
+
+    def test_warn_mode_logs(self):
+        """Test that warn mode logs the report instead of raising."""
+        with self.assertLogs("core.query_budget", level="WARNING") as logs:
+            with query_budget(0, "regions", mode="warn"):
+                list(Region.objects.all())  # type: ignore[attr-defined]
+
+        self.assertIn("regions ran 1 queries (budget 0)", logs.output[0])
+
+    def test_off_mode_records_nothing(self):
+        """Test that off mode does not record queries."""
+        with query_budget(0, "regions", mode="off") as log:
+            list(Region.objects.all())  # type: ignore[attr-defined]
+
+        self.assertIsNone(log)
+
+
+class QueryBudgetMixinTest(TestCase):
+    """Test cases for QueryBudgetMixin on viewsets."""
+
+    def setUp(self):
+        """Set up test client."""
+        self.client = APIClient()
+        Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]
+
+    def test_test_runner_raises(self):
+        """Test that the test runner enforces budgets."""
+        with mock.patch.object(PropertyViewSet, "query_budgets", {"list": 0}):
+            with self.assertRaises(QueryBudgetExceeded) as ctx:
+                self.client.get("/api/properties/")
+
+        self.assertIn("PropertyViewSet GET /api/properties/", str(ctx.exception))
+
+    @override_settings(QUERY_BUDGET_MODE="off")
+    def test_mode_off(self):
+        """Test that budgets are not checked with QUERY_BUDGET_MODE=off."""
+        with mock.patch.object(PropertyViewSet, "query_budgets", {"list": 0}):
+            response = self.client.get("/api/properties/")
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_region_filter(self):
+        """Test that the region filter is validated without a query."""
+        response = self.client.get("/api/properties/", {"region": 999})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("region", response.data)
+
+
+class RouterQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """Test the declared query budgets of all router endpoints."""
+
+    budget_params = {
+        "price_range": {"min_price": "0", "max_price": "100000000"},
+        "postal_codes": {"prefix": "1000"},
+    }
+
+    def setUp(self):
+        """Seed listings and archive a few of them."""
+        self.client = APIClient()
+        call_command("seed_data", stdout=StringIO())
+        sold = Property.objects.all()[:3]  # type: ignore[attr-defined]
+        Property.objects.filter(  # type: ignore[attr-defined]
+            pk__in=[p.pk for p in sold]
+        ).update(listing_status="sold")
+        ArchiveService.archive(older_than_days=-1)
+
+    def test_router_budgets(self):
+        """Test every budgeted endpoint at several page sizes."""
+        checked = self.assertRouterQueryBudgets(router)
+
+        self.assertIn("property-list", checked)
+        self.assertIn("property-compare_to_region", checked)
+        self.assertIn("archived-property-retrieve", checked)
+        self.assertIn("region-list", checked)
@@ -3,12 +3,66 @@ Tests for API services.
 
 This module tests all service functionality including:
 - PropertyService (all methods, edge cases, error handling)
+- IngestionService (listing sources, idempotent upserts)
+- GeocodingService (gazetteer resolution, cache tiers)
+- ArchiveService (batched moves to the archive table)
+- RegionCache (two-tier region lookups and invalidation)
+- PropertyFragmentCache (serialized row hydration)
+- ResponseCache (single-flight, stale-while-revalidate responses)
+- QueryShapeLog and CacheWarmer (post-deploy cache warming)
+- SlowQueryLog (slow-query capture, plans and ring buffer)
+- SyntheticData (deterministic benchmark and load-test datasets)
+- Load tests (mix parsing, percentiles, summaries, targets, worker errors)
 """
 
-from django.test import TestCase
+import os
+import random
+import tempfile
+from unittest.mock import Mock, patch
+import requests
+from django.test import RequestFactory, TestCase, override_settings
 from decimal import Decimal
-from api.models import Property, Region
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from api.models import (
+    ArchivedProperty,
+    GeocodeCacheEntry,
+    Property,
+    Region,
+    SavedProperty,
+    SlowQuery,
+    SyncRun,
+)
+from api.services.archive_service import ArchiveService
+from api.services.region_cache import RegionCache
+from api.throttling import LocalTokenBuckets
+from api.services.fragment_cache import PropertyFragmentCache
+from api.services.response_cache import LOCK_KEY, PROPERTIES_SCOPE, ResponseCache
+from api.services.cache_warming import (
+    CacheWarmer,
+    QueryShapeLog,
+    is_warming_request,
+)
+from api.serializers.property_serializers import PropertyListSerializer
+from django.core.cache import cache
+from prometheus_client import REGISTRY
 from api.services.property_service import PropertyService
+from api.services.ingestion_service import (
+    IngestionService,
+    JSONFileSource,
+    ListingSource,
+)
+from api.services.geocoding_service import GeocodingService, normalize_address_key
+from api.services.slow_query_log import REDACTED, SlowQueryLog, fingerprint
+from api.services.synthetic_data import SyntheticData
+from api.services.load_test import (
+    EndpointStats,
+    LoadTest,
+    Targets,
+    parse_mix,
+    percentile,
+)
 
 
 class PropertyServiceTest(TestCase):
@@ -552,3 +606,977 @@ class PropertyServiceTest(TestCase):
         self.assertIsNone(result["property_price_per_sqm"])
         self.assertIsNone(result["region_avg_price_per_sqm"])
         self.assertNotIn("price_difference", result)
+
+    def test_refresh_region_statistics(self):
+        """Test refresh_region_statistics averages active listings only."""
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TEST-002",
+            address="Test Address 456",
+            price=Decimal("500000.00"),
+            size_sqm=Decimal("100.00"),
+            property_type="apartment",
+            region=self.region,
+        )
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TEST-003",
+            address="Sold Address",
+            price=Decimal("900000.00"),
+            size_sqm=Decimal("100.00"),
+            property_type="apartment",
+            listing_status="sold",
+            region=self.region,
+        )
+
+        updated = PropertyService.refresh_region_statistics()
+
+        self.assertEqual(updated, 1)
+        self.region.refresh_from_db()
+        self.assertEqual(self.region.avg_price_per_sqm, Decimal("4000.00"))
+
+
+class IngestionServiceTest(TestCase):
+    """Test cases for IngestionService and listing sources."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.region = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS"
+        )
+
+    def test_json_file_source_page_partitions(self):
+        """Test JSONFileSource splits rows into page ranges."""
+        import json
+
+        rows = [{"external_id": f"P-{i}"} for i in range(5)]
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(rows, f)
+        self.addCleanup(os.unlink, f.name)
+
+        source = JSONFileSource(f.name, partition_by="page", page_size=2)
+
+        self.assertEqual(source.partitions(), ["page:0-2", "page:2-4", "page:4-5"])
+        self.assertEqual(source.fetch("page:4-5"), [{"external_id": "P-4"}])
+
+    def test_listing_source_is_abstract(self):
+        """Test sources must implement partitions and fetch."""
+
+        class PartialSource(ListingSource):
+            def partitions(self):
+                return []
+
+        with self.assertRaises(TypeError):
+            PartialSource()  # type: ignore[abstract]
+
+    def test_upsert_listings_skips_invalid_rows(self):
+        """Test upsert_listings ignores rows without external_id or price."""
+        count = IngestionService.upsert_listings(
+            [
+                {"address": "No id", "price": "1", "size_sqm": "1"},
+                {"external_id": "X-1", "address": "No price", "size_sqm": "1"},
+                {
+                    "external_id": "X-2",
+                    "address": "Valid",
+                    "price": "100000",
+                    "size_sqm": "50",
+                    "property_type": "house",
+                    "region": "LIS",
+                },
+            ]
+        )
+
+        self.assertEqual(count, 1)
+        property_obj = Property.objects.get(external_id="X-2")  # type: ignore[attr-defined]  # noqa: E501
+        self.assertEqual(property_obj.region, self.region)
+        self.assertIsNotNone(property_obj.last_synced_at)
+
+    def test_upsert_listings_counts_rows(self):
+        """Test upsert_listings updates the ingestion throughput counters."""
+
+        def rows(outcome):
+            return (
+                REGISTRY.get_sample_value(
+                    "atlas_ingestion_rows_total", {"outcome": outcome}
+                )
+                or 0
+            )
+
+        upserted, rejected = rows("upserted"), rows("rejected")
+        IngestionService.upsert_listings(
+            [
+                {"address": "No id", "price": "1", "size_sqm": "1"},
+                {
+                    "external_id": "X-3",
+                    "address": "Valid",
+                    "price": "100000",
+                    "size_sqm": "50",
+                },
+            ]
+        )
+
+        self.assertEqual(rows("upserted"), upserted + 1)
+        self.assertEqual(rows("rejected"), rejected + 1)
+
+    def test_upsert_listings_writes_payload(self):
+        """Test upsert_listings stores and updates the payload side table."""
+        row = {
+            "external_id": "X-1",
+            "address": "Payload",
+            "description": "First",
+            "price": "100000",
+            "size_sqm": "50",
+            "property_type": "house",
+        }
+        IngestionService.upsert_listings([row])
+        IngestionService.upsert_listings([dict(row, description="Second")])
+
+        property_obj = Property.objects.get(external_id="X-1")  # type: ignore[attr-defined]  # noqa: E501
+        self.assertEqual(property_obj.description, "Second")
+        self.assertEqual(property_obj.raw_data["description"], "Second")
+
+    def test_ingestion_bumps_responses_after_commit(self):
+        """Test upserts and withdrawals start a new generation after commit."""
+        row = {
+            "external_id": "X-1",
+            "address": "Bump",
+            "price": "100000",
+            "size_sqm": "50",
+            "property_type": "house",
+        }
+        run = SyncRun.objects.create(source="test")  # type: ignore[attr-defined]
+
+        for write in (
+            lambda: IngestionService.upsert_listings([row], source="test"),
+            lambda: IngestionService.withdraw_unseen(run),
+        ):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                write()
+                # A read racing the commit may cache under this generation
+                during = ResponseCache.generation(PROPERTIES_SCOPE)
+
+            self.assertEqual(len(callbacks), 1)
+            self.assertNotEqual(ResponseCache.generation(PROPERTIES_SCOPE), during)
+
+    def test_upsert_listings_deduplicates_external_ids(self):
+        """Test upsert_listings keeps the last row for a repeated external_id."""
+        row = {
+            "external_id": "X-1",
+            "address": "First",
+            "price": "100000",
+            "size_sqm": "50",
+            "property_type": "house",
+        }
+
+        count = IngestionService.upsert_listings([row, dict(row, address="Second")])
+
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            Property.objects.get(external_id="X-1").address, "Second"  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+
+GAZETTEER_CSV = """postal_code,locality,longitude,latitude
+1100-053,Lisboa,-9.1365,38.7100
+1100-060,Lisboa,-9.1385,38.7120
+4000-123,Porto,-8.6110,41.1490
+"""
+
+
+class GeocodingServiceTest(TestCase):
+    """Test cases for GeocodingService."""
+
+    def setUp(self):
+        """Point the service at a temporary gazetteer."""
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False, encoding="utf-8"
+        ) as f:
+            f.write(GAZETTEER_CSV)
+        self.addCleanup(os.unlink, f.name)
+        self.gazetteer_path = f.name
+
+        override = override_settings(GEOCODING_GAZETTEER_PATH=f.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        GeocodingService.reset()
+        self.addCleanup(GeocodingService.reset)
+
+    def test_normalize_address_key(self):
+        """Test keys use the postal code when present, else folded text."""
+        self.assertEqual(
+            normalize_address_key("Rua Augusta, 1100-053 Lisboa"), "cp:1100-053"
+        )
+        self.assertEqual(
+            normalize_address_key("Praça do Comércio,  LISBOA"),
+            "addr:praca do comercio lisboa",
+        )
+        self.assertIsNone(normalize_address_key("   "))
+
+    def test_long_address_key_fits_the_cache_table(self):
+        """Test that long addresses get short keys that still resolve."""
+        address = "Rua " + "muito comprida " * 40 + "Lisboa"
+        other = "Avenida " + "muito comprida " * 40 + "Lisboa"
+
+        key = normalize_address_key(address)
+
+        self.assertLessEqual(len(key), 255)
+        self.assertTrue(key.endswith(" lisboa"))
+        self.assertNotEqual(key, normalize_address_key(other))
+        self.assertEqual(
+            GeocodingService.geocode(address), GeocodingService.geocode("Lisboa")
+        )
+        self.assertTrue(
+            GeocodeCacheEntry.objects.filter(key=key).exists()  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+    def test_geocode_exact_postal_code(self):
+        """Test an exact CP4-CP3 match."""
+        result = GeocodingService.geocode("Rua Augusta 10, 1100-053 Lisboa")
+
+        self.assertEqual(result, [-9.1365, 38.71])
+
+    def test_geocode_falls_back_to_cp4_centroid(self):
+        """Test an unknown CP3 resolves to the CP4 centroid."""
+        result = GeocodingService.geocode("1100-999 Lisboa")
+
+        self.assertEqual(result, [-9.1375, 38.711])
+
+    def test_geocode_locality(self):
+        """Test addresses without a postal code resolve by trailing locality."""
+        result = GeocodingService.geocode("Avenida dos Aliados, Porto")
+
+        self.assertEqual(result, [-8.611, 41.149])
+
+    def test_geocode_unknown_address(self):
+        """Test unresolvable addresses return None and are not persisted."""
+        self.assertIsNone(GeocodingService.geocode("Somewhere, Atlantis"))
+        self.assertFalse(GeocodeCacheEntry.objects.exists())  # type: ignore[attr-defined]  # noqa: E501
+
+    def test_geocode_miss_resolves_after_gazetteer_update(self):
+        """Test remembered misses are dropped when the gazetteer file changes."""
+        self.assertIsNone(GeocodingService.geocode("Rua Nova, Coimbra"))
+
+        with open(self.gazetteer_path, "a", encoding="utf-8") as f:
+            f.write("3000-001,Coimbra,-8.4290,40.2110\n")
+        stat = os.stat(self.gazetteer_path)
+        os.utime(self.gazetteer_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertEqual(
+            GeocodingService.geocode("Rua Nova, Coimbra"), [-8.429, 40.211]
+        )
+
+    def test_geocode_batch_deduplicates_and_persists(self):
+        """Test identical keys are resolved once and written to the table."""
+        addresses = ["1100-053 Lisboa", "Rua X, 1100-053 LISBOA", "4000-123 Porto"]
+
+        with self.assertNumQueries(2):
+            result = GeocodingService.geocode_batch(addresses)
+
+        self.assertEqual(result["Rua X, 1100-053 LISBOA"], [-9.1365, 38.71])
+        self.assertEqual(GeocodeCacheEntry.objects.count(), 2)  # type: ignore[attr-defined]  # noqa: E501
+
+    def test_geocode_batch_uses_cache_tiers(self):
+        """Test the LRU serves repeats and the table serves new processes."""
+        GeocodingService.geocode_batch(["1100-053 Lisboa"])
+
+        with self.assertNumQueries(0):
+            GeocodingService.geocode("1100-053 Lisboa")
+
+        GeocodeCacheEntry.objects.filter(key="cp:1100-053").update(  # type: ignore[attr-defined]  # noqa: E501
+            coordinates=[1.0, 2.0]
+        )
+        GeocodingService.reset()
+        with self.assertNumQueries(1):
+            self.assertEqual(GeocodingService.geocode("1100-053 Lisboa"), [1.0, 2.0])
+
+    def test_upsert_listings_geocodes_missing_coordinates(self):
+        """Test ingestion fills coordinates for address-only rows."""
+        IngestionService.upsert_listings(
+            [
+                {
+                    "external_id": "G-1",
+                    "address": "Rua Augusta 10, 1100-053 Lisboa",
+                    "price": "100000",
+                    "size_sqm": "50",
+                    "property_type": "apartment",
+                }
+            ]
+        )
+
+        self.assertEqual(
+            Property.objects.get(external_id="G-1").coordinates,  # type: ignore[attr-defined]  # noqa: E501
+            [-9.1365, 38.71],
+        )
+
+
+class ArchiveServiceTest(TestCase):
+    """Test cases for ArchiveService."""
+
+    def setUp(self):
+        """Set up listings in various states."""
+        self.region = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS"
+        )
+        self.sold = self.create_property("SOLD-1", "sold")
+        self.withdrawn = self.create_property("WD-1", "withdrawn")
+        self.active = self.create_property("ACT-1", "active")
+        Property.objects.update(  # type: ignore[attr-defined]
+            updated_at=timezone.now() - timedelta(days=60)
+        )
+
+    def create_property(self, external_id, status):
+        """Create a listing with a payload."""
+        return Property.objects.create(  # type: ignore[attr-defined]
+            external_id=external_id,
+            address=f"Rua {external_id}, 1100-053 Lisboa",
+            description="Archived description",
+            price=Decimal("250000.00"),
+            size_sqm=Decimal("80.00"),
+            property_type="apartment",
+            bathrooms=Decimal("1.5"),
+            listing_status=status,
+            region=self.region,
+            raw_data={"source": "feed"},
+        )
+
+    def test_archive_moves_inactive_listings(self):
+        """Test archive moves sold and withdrawn listings in batches."""
+        moved = ArchiveService.archive(batch_size=1)
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(
+            list(Property.objects.values_list("pk", flat=True)),  # type: ignore[attr-defined]  # noqa: E501
+            [self.active.pk],
+        )
+        archived = ArchivedProperty.objects.get(original_id=self.sold.pk)  # type: ignore[attr-defined]  # noqa: E501
+        self.assertEqual(archived.listing_status, "sold")
+        self.assertEqual(archived.postal_code, "1100-053")
+        self.assertEqual(archived.region, self.region)
+        self.assertEqual(archived.data["description"], "Archived description")
+        self.assertEqual(archived.data["raw_data"], {"source": "feed"})
+        self.assertEqual(archived.data["bathrooms"], "1.5")
+
+    def test_archive_skips_recent_listings(self):
+        """Test listings updated recently stay in the hot table."""
+        Property.objects.filter(pk=self.sold.pk).update(  # type: ignore[attr-defined]
+            updated_at=timezone.now()
+        )
+
+        ArchiveService.archive()
+
+        self.assertTrue(Property.objects.filter(pk=self.sold.pk).exists())  # type: ignore[attr-defined]  # noqa: E501
+
+    def test_archive_skips_saved_listings(self):
+        """Test listings saved by a user are not archived."""
+        user = get_user_model().objects.create_user(  # type: ignore[attr-defined]
+            username="saver", email="saver@example.com", password="testpass123"
+        )
+        SavedProperty.objects.create(user=user, property=self.sold)  # type: ignore[attr-defined]  # noqa: E501
+
+        moved = ArchiveService.archive()
+
+        self.assertEqual(moved, 1)
+        self.assertTrue(Property.objects.filter(pk=self.sold.pk).exists())  # type: ignore[attr-defined]  # noqa: E501
+
+    def test_archive_bumps_responses_once_per_batch(self):
+        """Test a batch bumps the response cache once, not once per row."""
+        with patch.object(ResponseCache, "bump") as bump:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                moved = ArchiveService.archive_batch()
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(bump.call_count, 2)
+        bump.assert_called_with(PROPERTIES_SCOPE)
+
+    def test_archive_respects_max_batches(self):
+        """Test max_batches bounds a single run."""
+        moved = ArchiveService.archive(batch_size=1, max_batches=1)
+
+        self.assertEqual(moved, 1)
+        self.assertEqual(ArchivedProperty.objects.count(), 1)  # type: ignore[attr-defined]  # noqa: E501
+
+
+class RegionCacheTest(TestCase):
+    """Test cases for RegionCache."""
+
+    def setUp(self):
+        """Start from empty cache tiers."""
+        cache.clear()
+        RegionCache.invalidate()
+        self.lisbon = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS", avg_price_per_sqm=Decimal("3500.00")
+        )
+        self.porto = Region.objects.create(  # type: ignore[attr-defined]
+            name="Porto", code="OPO"
+        )
+
+    def reset_local_tier(self):
+        """Simulate a fresh worker process sharing the same cache."""
+        RegionCache._local.clear()
+        RegionCache._version = None
+
+    def test_get_loads_once(self):
+        """Test the table is read once and then served from memory."""
+        with self.assertNumQueries(1):
+            self.assertEqual(RegionCache.get(self.lisbon.pk), self.lisbon)
+        with self.assertNumQueries(0):
+            self.assertEqual(RegionCache.get(self.porto.pk).name, "Porto")
+            self.assertIsNone(RegionCache.get(None))
+            self.assertIsNone(RegionCache.get(-1))
+
+    def test_shared_tier_serves_other_workers(self):
+        """Test a new worker is served from the shared cache without queries."""
+        RegionCache.get(self.lisbon.pk)
+        self.reset_local_tier()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(RegionCache.get(self.lisbon.pk), self.lisbon)
+
+    def test_save_invalidates(self):
+        """Test saving a region publishes fresh data."""
+        RegionCache.get(self.lisbon.pk)
+
+        self.lisbon.avg_price_per_sqm = Decimal("4000.00")
+        self.lisbon.save()
+
+        self.assertEqual(
+            RegionCache.get(self.lisbon.pk).avg_price_per_sqm, Decimal("4000.00")
+        )
+
+    def test_delete_invalidates(self):
+        """Test deleting a region removes it from the cache."""
+        RegionCache.get(self.porto.pk)
+        porto_pk = self.porto.pk
+
+        self.porto.delete()
+
+        self.assertIsNone(RegionCache.get(porto_pk))
+
+    def test_get_many_and_all(self):
+        """Test batch lookup and ordered listing."""
+        self.assertEqual(
+            RegionCache.get_many([self.porto.pk, -1]), {self.porto.pk: self.porto}
+        )
+        self.assertEqual([r.code for r in RegionCache.all()], ["LIS", "OPO"])
+
+    def test_compare_to_region_average_uses_cache(self):
+        """Test compare_to_region_average resolves the region without queries."""
+        property_obj = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="RC-1",
+            address="Region Cache",
+            price=Decimal("300000.00"),
+            size_sqm=Decimal("100.00"),
+            property_type="apartment",
+            region=self.lisbon,
+        )
+        property_obj = Property.objects.get(pk=property_obj.pk)  # type: ignore[attr-defined]  # noqa: E501
+        RegionCache.get(self.lisbon.pk)
+
+        with self.assertNumQueries(0):
+            result = PropertyService.compare_to_region_average(property_obj)
+
+        self.assertEqual(result["region_avg_price_per_sqm"], 3500.0)
+
+
+class PropertyFragmentCacheTest(TestCase):
+    """Test cases for PropertyFragmentCache."""
+
+    def setUp(self):
+        """Create a few listings."""
+        cache.clear()
+        self.properties = [
+            Property.objects.create(  # type: ignore[attr-defined]
+                external_id=f"FR-{i}",
+                address=f"Fragment {i}",
+                price=Decimal("100000.00"),
+                size_sqm=Decimal("50.00"),
+                property_type="apartment",
+            )
+            for i in range(3)
+        ]
+        self.rows = [(p.pk, p.updated_at) for p in reversed(self.properties)]
+
+    def test_hydrate_preserves_order(self):
+        """Test hydrated rows follow the requested order."""
+        data = PropertyFragmentCache.hydrate(self.rows, PropertyListSerializer)
+
+        self.assertEqual([d["external_id"] for d in data], ["FR-2", "FR-1", "FR-0"])
+
+    def test_hydrate_only_loads_misses(self):
+        """Test cached rows are not loaded again."""
+        PropertyFragmentCache.hydrate(self.rows[:2], PropertyListSerializer)
+
+        with self.assertNumQueries(1):
+            data = PropertyFragmentCache.hydrate(self.rows, PropertyListSerializer)
+        with self.assertNumQueries(0):
+            PropertyFragmentCache.hydrate(self.rows, PropertyListSerializer)
+
+        self.assertEqual(len(data), 3)
+
+    def test_hydrate_skips_deleted_rows(self):
+        """Test rows deleted after the page was read are left out."""
+        self.properties[0].delete()
+
+        data = PropertyFragmentCache.hydrate(self.rows, PropertyListSerializer)
+
+        self.assertEqual([d["external_id"] for d in data], ["FR-2", "FR-1"])
+
+
+class ResponseCacheTest(TestCase):
+    """Test cases for ResponseCache."""
+
+    def setUp(self):
+        """Start from an empty cache and count recomputations."""
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value="fresh", cacheable=True):
+        def inner():
+            self.calls += 1
+            return value, cacheable
+
+        return inner
+
+    def test_make_digest_ignores_parameter_order(self):
+        """Test query parameter order does not change the key."""
+        self.assertEqual(
+            ResponseCache.make_digest("/p/", [("a", "1"), ("b", "2")]),
+            ResponseCache.make_digest("/p/", [("b", "2"), ("a", "1")]),
+        )
+
+    def test_fresh_entry_is_not_recomputed(self):
+        """Test a fresh entry is served from cache."""
+        ResponseCache.get_or_compute("t", "k", "g1", self.compute())
+        value = ResponseCache.get_or_compute("t", "k", "g1", self.compute("other"))
+
+        self.assertEqual(value, "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_new_generation_recomputes(self):
+        """Test a superseded generation is recomputed by the lock holder."""
+        ResponseCache.get_or_compute("t", "k", "g1", self.compute())
+        value = ResponseCache.get_or_compute("t", "k", "g2", self.compute("new"))
+
+        self.assertEqual(value, "new")
+        self.assertEqual(self.calls, 2)
+
+    def test_stale_entry_served_while_another_worker_recomputes(self):
+        """Test only the lock holder recomputes; others get the stale entry."""
+        ResponseCache.get_or_compute("t", "k", "g1", self.compute("old"))
+        cache.add(LOCK_KEY.format(scope="t", digest="k"), "other-worker")
+
+        value = ResponseCache.get_or_compute("t", "k", "g2", self.compute("new"))
+
+        self.assertEqual(value, "old")
+        self.assertEqual(self.calls, 1)
+
+    @override_settings(RESPONSE_CACHE_WAIT=0.1)
+    def test_cold_miss_computes_after_waiting_for_lock_holder(self):
+        """Test a cold miss falls back to computing when the holder stalls."""
+        cache.add(LOCK_KEY.format(scope="t", digest="k"), "other-worker")
+
+        value = ResponseCache.get_or_compute("t", "k", "g1", self.compute())
+
+        self.assertEqual(value, "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_uncacheable_values_are_not_stored(self):
+        """Test error results are recomputed every time."""
+        ResponseCache.get_or_compute("t", "k", "g1", self.compute(cacheable=False))
+        ResponseCache.get_or_compute("t", "k", "g1", self.compute(cacheable=False))
+
+        self.assertEqual(self.calls, 2)
+
+    def test_lock_released_after_compute_error(self):
+        """Test a failing computation does not leave the key locked."""
+
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            ResponseCache.get_or_compute("t", "k", "g1", failing)
+
+        self.assertIsNone(cache.get(LOCK_KEY.format(scope="t", digest="k")))
+
+    def test_early_refresh_near_expiry(self):
+        """Test entries are refreshed probabilistically before they expire."""
+        entry = {"generation": "g1", "expires_at": 100.0, "delta": 1.0}
+
+        with override_settings(RESPONSE_CACHE_BETA=1e9):
+            self.assertTrue(ResponseCache.is_stale(entry, "g1", now=99.0))
+        with override_settings(RESPONSE_CACHE_BETA=0.0):
+            self.assertFalse(ResponseCache.is_stale(entry, "g1", now=99.0))
+            self.assertTrue(ResponseCache.is_stale(entry, "g1", now=100.0))
+
+
+@override_settings(CACHE_WARMING_SAMPLE_RATE=1.0)
+class CacheWarmingTest(TestCase):
+    """Test cases for QueryShapeLog and CacheWarmer."""
+
+    def setUp(self):
+        """Start from empty caches with one region and listing."""
+        cache.clear()
+        QueryShapeLog.clear()
+        self.region = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS"
+        )
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="WARM-1",
+            address="Warm Address",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+            region=self.region,
+        )
+
+    def test_top_ranks_shapes_by_frequency(self):
+        """Test the most requested shapes come first."""
+        url = "http://testserver/api/properties/"
+        for _ in range(3):
+            QueryShapeLog.record(url, [("search", "lisboa ")])
+        QueryShapeLog.record(url, [("ordering", "price")])
+
+        self.assertEqual(
+            QueryShapeLog.top(10),
+            [(url, [("search", "lisboa")]), (url, [("ordering", "price")])],
+        )
+        self.assertEqual(len(QueryShapeLog.top(1)), 1)
+
+    @override_settings(CACHE_WARMING_SAMPLE_RATE=0.0)
+    def test_record_respects_sample_rate(self):
+        """Test nothing is recorded when sampling is off."""
+        QueryShapeLog.record("http://testserver/api/regions/", [])
+
+        self.assertEqual(QueryShapeLog.top(10), [])
+
+    @override_settings(CACHE_WARMING_MAX_SHAPES=2)
+    def test_registry_is_bounded(self):
+        """Test the least requested shapes are dropped past the limit."""
+        url = "http://testserver/api/properties/"
+        for _ in range(2):
+            QueryShapeLog.record(url, [("page", "1")])
+        QueryShapeLog.record(url, [("page", "2")])
+        QueryShapeLog.record(url, [("page", "3")])
+
+        shapes = [params for _, params in QueryShapeLog.top(10)]
+        self.assertEqual(shapes, [[("page", "1")], [("page", "3")]])
+
+    def test_warm_fills_response_cache(self):
+        """Test replayed shapes are served from cache afterwards."""
+        self.client.get("/api/properties/?ordering=price")
+        self.client.get("/api/regions/")
+        # A deploy-time write leaves every cached response stale
+        ResponseCache.bump(PROPERTIES_SCOPE)
+        RegionCache.invalidate()
+
+        summary = CacheWarmer.warm(limit=10, concurrency=1)
+
+        self.assertEqual(summary, {"warmed": 2, "failed": 0})
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/properties/?ordering=price")
+        self.assertEqual(response.data["results"][0]["external_id"], "WARM-1")
+
+    def test_warm_does_not_count_replayed_requests(self):
+        """Test warm-up traffic does not inflate shape counts."""
+        self.client.get("/api/regions/")
+
+        CacheWarmer.warm(limit=10, concurrency=1)
+        CacheWarmer.warm(limit=10, concurrency=1)
+
+        self.assertEqual(
+            QueryShapeLog._counts(cache.get("warming:shapes")).popitem()[1], 1
+        )
+
+    def test_registration_waits_for_the_registry_lock(self):
+        """Test a shape is registered by a later sample while the lock is held."""
+        url = "http://testserver/api/properties/"
+        cache.set("warming:shapes:lock", "other-worker")
+
+        QueryShapeLog.record(url, [("page", "1")])
+        self.assertEqual(QueryShapeLog.top(10), [])
+
+        cache.delete("warming:shapes:lock")
+        QueryShapeLog.record(url, [("page", "1")])
+        self.assertEqual(QueryShapeLog.top(10), [(url, [("page", "1")])])
+
+    @override_settings(TOKEN_BUCKET_THROTTLE={"CAPACITY": 1, "REFILL_RATE": 0.001})
+    def test_warm_bypasses_throttling(self):
+        """Test replays spend no tokens and are never throttled."""
+        LocalTokenBuckets.clear()
+        self.addCleanup(LocalTokenBuckets.clear)
+        for ordering in ("price", "-price", "size_sqm"):
+            QueryShapeLog.record(
+                "http://testserver/api/properties/", [("ordering", ordering)]
+            )
+
+        summary = CacheWarmer.warm(limit=10, concurrency=1)
+
+        self.assertEqual(summary, {"warmed": 3, "failed": 0})
+        # The single token is still there for real traffic
+        response = self.client.get("/api/properties/", {"ordering": "-size_sqm"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_warming_header_does_not_bypass_throttling(self):
+        """Test clients can't skip the throttle by sending the warming header."""
+        request = RequestFactory().get("/api/properties/", HTTP_X_CACHE_WARMING="1")
+
+        self.assertFalse(is_warming_request(request))
+
+    def test_warm_skips_unknown_paths(self):
+        """Test shapes whose route no longer exists are reported as failed."""
+        QueryShapeLog.record("http://testserver/api/gone/", [])
+
+        summary = CacheWarmer.warm(limit=10, concurrency=1)
+
+        self.assertEqual(summary, {"warmed": 0, "failed": 1})
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=1e-6, SLOW_QUERY_LOG_SIZE=1000)
+class SlowQueryLogTest(TestCase):
+    """Test cases for SlowQueryLog."""
+
+    def setUp(self):
+        """Set up test data with every query counting as slow."""
+        cache.clear()
+        self.region = Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]  # noqa: E501
+        SlowQueryLog.clear()
+        self.addCleanup(SlowQueryLog.clear)
+
+    def test_capture_with_plan_and_source(self):
+        """Test that a slow query is stored with params, plan and caller."""
+        list(Region.objects.filter(code="LIS"))  # type: ignore[attr-defined]
+        SlowQueryLog.flush()
+
+        entry = SlowQuery.objects.get()  # type: ignore[attr-defined]
+        self.assertIn('FROM "api_region"', entry.sql)
+        self.assertEqual(entry.params, ["LIS"])
+        self.assertEqual(entry.database, "default")
+        self.assertTrue(entry.plan)
+        self.assertIn("test_services.py", entry.source)
+        self.assertIn("test_capture_with_plan_and_source", entry.source)
+
+    def test_write_params_redacted(self):
+        """Test that parameters of writes are not stored or explained."""
+        Region.objects.filter(code="LIS").update(name="Porto")  # type: ignore[attr-defined]  # noqa: E501
+        SlowQueryLog.flush()
+
+        entry = SlowQuery.objects.get()  # type: ignore[attr-defined]
+        self.assertTrue(entry.sql.startswith('UPDATE "api_region"'))
+        self.assertEqual(entry.params, [REDACTED, REDACTED])
+        self.assertEqual(entry.plan, "")
+
+    def test_sensitive_table_params_redacted(self):
+        """Test that reads of user tables keep their parameters out."""
+        get_user_model().objects.filter(email="owner@example.com").exists()  # type: ignore[attr-defined]  # noqa: E501
+        SlowQueryLog.flush()
+
+        entry = SlowQuery.objects.get()  # type: ignore[attr-defined]
+        self.assertIn('FROM "users_user"', entry.sql)
+        self.assertTrue(entry.params)
+        self.assertEqual(set(entry.params), {REDACTED})
+        self.assertEqual(entry.plan, "")
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_disabled(self):
+        """Test that nothing is captured with a zero threshold."""
+        list(Region.objects.all())  # type: ignore[attr-defined]
+        SlowQueryLog.flush()
+
+        self.assertFalse(SlowQuery.objects.exists())  # type: ignore[attr-defined]
+
+    def test_plan_once_per_shape(self):
+        """Test that repeated shapes are explained once per interval."""
+        Region.objects.filter(pk__in=[1, 2]).count()  # type: ignore[attr-defined]
+        Region.objects.filter(pk__in=[3]).count()  # type: ignore[attr-defined]
+        SlowQueryLog.flush()
+
+        entries = list(SlowQuery.objects.order_by("captured_at"))  # type: ignore[attr-defined]  # noqa: E501
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0].fingerprint, entries[1].fingerprint)
+        self.assertTrue(entries[0].plan)
+        self.assertEqual(entries[1].plan, "")
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=2)
+    def test_ring_buffer_bounded(self):
+        """Test that captures overwrite the oldest slot."""
+        for code in ("A", "B", "C"):
+            list(Region.objects.filter(code=code))  # type: ignore[attr-defined]
+        SlowQueryLog.flush()
+
+        self.assertEqual(SlowQuery.objects.count(), 2)  # type: ignore[attr-defined]
+        self.assertEqual(
+            sorted(SlowQuery.objects.values_list("params", flat=True)),  # type: ignore[attr-defined]  # noqa: E501
+            [["B"], ["C"]],
+        )
+
+    @patch("api.services.slow_query_log.MAX_PENDING", 2)
+    def test_pending_captures_bounded(self):
+        """Test that unflushed captures keep only the latest ones."""
+        for code in ("A", "B", "C"):
+            list(Region.objects.filter(code=code))  # type: ignore[attr-defined]
+        SlowQueryLog.flush()
+
+        self.assertEqual(
+            sorted(SlowQuery.objects.values_list("params", flat=True)),  # type: ignore[attr-defined]  # noqa: E501
+            [["B"], ["C"]],
+        )
+
+    def test_request_flushes_and_top_offenders(self):
+        """Test that request captures are written when the request ends."""
+        self.client.get("/api/regions/")
+
+        self.assertTrue(SlowQuery.objects.filter(source__startswith="api/").exists())  # type: ignore[attr-defined]  # noqa: E501
+        top = SlowQueryLog.top_offenders()
+        self.assertEqual(sum(shape["count"] for shape in top), SlowQuery.objects.count())  # type: ignore[attr-defined]  # noqa: E501
+        totals = [shape["total_ms"] for shape in top]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+
+    def test_admin_summary(self):
+        """Test that the admin changelist lists the top offenders."""
+        list(Region.objects.filter(code="LIS"))  # type: ignore[attr-defined]
+        SlowQueryLog.flush()
+        admin = get_user_model().objects.create_superuser(  # type: ignore[attr-defined]
+            username="admin", email="admin@example.com", password="pw"
+        )
+        self.client.force_login(admin)
+
+        response = self.client.get("/admin/api/slowquery/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Top offenders by total time")
+        self.assertContains(response, "api_region")
+
+    def test_fingerprint_ignores_placeholder_count(self):
+        """Test that IN lists of any length share a fingerprint."""
+        self.assertEqual(
+            fingerprint("SELECT 1 WHERE id IN (%s, %s)"),
+            fingerprint("SELECT 1  WHERE id IN (%s)"),
+        )
+
+
+class SyntheticDataTest(TestCase):
+    """Test cases for SyntheticData."""
+
+    def test_rows_deterministic(self):
+        """Test that rows depend only on the seed and their index."""
+        rows = list(SyntheticData.rows(10, seed=3))
+
+        self.assertEqual(rows, list(SyntheticData.rows(10, seed=3)))
+        self.assertEqual(rows[5:], list(SyntheticData.rows(5, seed=3, start=5)))
+        self.assertNotEqual(rows, list(SyntheticData.rows(10, seed=4)))
+
+    def test_properties_unsaved(self):
+        """Test that unsaved listings carry their payload and postal code."""
+        listings = SyntheticData.properties(5, raw_data_size=3)
+
+        self.assertEqual(len(listings), 5)
+        self.assertIsNone(listings[0].pk)
+        self.assertRegex(listings[0].postal_code, r"^\d{4}-\d{3}$")
+        self.assertEqual(len(listings[0].raw_data["attributes"]), 3)
+
+    def test_generate_idempotent(self):
+        """Test that generating the same dataset twice upserts it."""
+        self.assertEqual(SyntheticData.generate(25, batch_size=10), 25)
+        SyntheticData.generate(25, batch_size=10)
+
+        self.assertEqual(Property.objects.count(), 25)  # type: ignore[attr-defined]
+        self.assertEqual(Region.objects.count(), 5)  # type: ignore[attr-defined]
+        listing = Property.objects.get(external_id="SYN-0-00000000")  # type: ignore[attr-defined]  # noqa: E501
+        self.assertIsNotNone(listing.region)
+        self.assertEqual(listing.raw_data["external_id"], "SYN-0-00000000")
+
+
+class LoadTestStatsTest(TestCase):
+    """Test cases for load test statistics."""
+
+    def test_parse_mix(self):
+        """Test that mixes are parsed and unknown endpoints rejected."""
+        self.assertEqual(parse_mix("list=3, detail=1"), {"list": 3, "detail": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("sitemap=1")
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+        self.assertIsNone(percentile([], 50))
+
+    def test_endpoint_summary(self):
+        """Test RPS, error rate and status counts of an endpoint."""
+        stats = EndpointStats()
+        for latency, status in [(0.01, "200"), (0.02, "200"), (0.03, "500")]:
+            stats.record(latency, status, status == "200")
+
+        summary = stats.summary(elapsed=1.5)
+        self.assertEqual(summary["requests"], 3)
+        self.assertEqual(summary["rps"], 2.0)
+        self.assertEqual(summary["error_rate"], 0.3333)
+        self.assertEqual(summary["p50_ms"], 20.0)
+        self.assertEqual(summary["statuses"], {"200": 2, "500": 1})
+
+    def test_mix_without_credentials(self):
+        """Test that login and writes are dropped without an account."""
+        load_test = LoadTest("http://testserver/", mix={"list": 1, "write": 1})
+
+        self.assertEqual(load_test.mix, {"list": 1})
+        self.assertEqual(load_test.base_url, "http://testserver")
+
+    def test_endpoints_without_targets_skipped(self):
+        """Test that endpoints the dataset has no targets for are dropped."""
+        targets = Targets(region_ids=[], postal_prefixes=[], property_ids=[1], pages=1)
+        load_test = LoadTest(
+            "http://testserver", mix={"viewport": 1, "list": 1}, max_requests=5
+        )
+
+        with patch.object(Targets, "discover", return_value=targets), patch(
+            "api.services.load_test.requests.Session.request",
+            return_value=Mock(status_code=200),
+        ):
+            report = load_test.run()
+
+        self.assertEqual(report["skipped"], ["viewport"])
+        self.assertEqual(report["mix"], {"list": 1})
+        self.assertEqual(report["total"]["requests"], 5)
+
+    def test_writes_target_synthetic_listings_only(self):
+        """Test that writes only patch synthetic listings, or are skipped."""
+        rng = random.Random(0)
+        targets = Targets(
+            region_ids=[1], postal_prefixes=[], property_ids=[1, 2], pages=1
+        )
+        load_test = LoadTest(
+            "http://testserver",
+            mix={"write": 1},
+            credentials=[("user@example.com", "pw")],
+        )
+
+        self.assertFalse(targets.supports("write"))
+        targets.writable_ids = [2]
+        paths = {load_test.write_request(rng, targets)[1] for _ in range(10)}
+        self.assertEqual(paths, {"/api/properties/2/"})
+
+    def test_worker_errors_recorded(self):
+        """Test that failed logins and requests are counted, not fatal."""
+        targets = Targets(region_ids=[1], postal_prefixes=[], property_ids=[1], pages=1)
+        load_test = LoadTest(
+            "http://testserver",
+            mix={"detail": 1},
+            max_requests=3,
+            credentials=[("user@example.com", "pw")],
+        )
+
+        with patch.object(Targets, "discover", return_value=targets), patch(
+            "api.services.load_test.requests.Session.post",
+            side_effect=requests.ConnectionError,
+        ), patch(
+            "api.services.load_test.requests.Session.request",
+            side_effect=KeyError("region"),
+        ):
+            report = load_test.run()
+
+        detail = report["endpoints"]["detail"]
+        self.assertEqual(detail["requests"], 3)
+        self.assertEqual(detail["statuses"], {"KeyError": 3})
+        self.assertEqual(detail["error_rate"], 1.0)
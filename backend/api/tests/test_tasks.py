@@ -0,0 +1,251 @@
+"""
+Tests for Celery tasks.
+
+This module tests the listing ingestion pipeline including:
+- sync_listings fan-out and finalization
+- idempotent chunk upserts and resume after failure
+- withdrawal of unseen listings and region statistics refresh
+- post-deploy cache warming
+- task duration metrics
+"""
+
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from core.celery import app as celery_app
+from api.models import Property, Region, SyncChunk, SyncRun
+from api.services.cache_warming import QueryShapeLog
+from api.services.ingestion_service import IngestionService
+from api.tasks import finalize_sync, ingest_chunk, sync_listings, warm_caches
+
+
+def listing(external_id, region="LIS", price="300000.00", size="100.00", **extra):
+    """Build a source listing row."""
+    row = {
+        "external_id": external_id,
+        "address": f"Rua {external_id}, Lisboa",
+        "price": price,
+        "size_sqm": size,
+        "property_type": "apartment",
+        "region": region,
+    }
+    row.update(extra)
+    return row
+
+
+class SyncListingsTaskTest(TestCase):
+    """Test cases for the listing sync chord."""
+
+    def setUp(self):
+        """Run tasks eagerly against a temporary JSON source."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = Path(self.tmpdir) / "listings.json"
+        self.settings_override = override_settings(
+            INGESTION_SOURCES={
+                "test": {
+                    "BACKEND": "api.services.ingestion_service.JSONFileSource",
+                    "OPTIONS": {"path": str(self.path), "partition_by": "region"},
+                }
+            }
+        )
+        self.settings_override.enable()
+        self.previous_eager = celery_app.conf.task_always_eager
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+
+        self.lisbon = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS", avg_price_per_sqm=Decimal("1000.00")
+        )
+        self.porto = Region.objects.create(  # type: ignore[attr-defined]
+            name="Porto", code="OPO"
+        )
+
+    def tearDown(self):
+        """Restore Celery and settings state."""
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=self.previous_eager)
+        self.settings_override.disable()
+        shutil.rmtree(self.tmpdir)
+
+    def write_source(self, rows):
+        """Write the source file."""
+        self.path.write_text(json.dumps(rows), encoding="utf-8")
+
+    def test_sync_creates_chunks_and_properties(self):
+        """Test that a sync upserts every chunk and completes the run."""
+        self.write_source(
+            [listing("A-1"), listing("A-2"), listing("B-1", region="OPO")]
+        )
+
+        run_id = sync_listings.delay("test").get()
+
+        run = SyncRun.objects.get(pk=run_id)  # type: ignore[attr-defined]
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(run.rows_upserted, 3)
+        self.assertEqual(
+            sorted(run.chunks.values_list("key", flat=True)),  # type: ignore[attr-defined]  # noqa: E501
+            ["region:LIS", "region:OPO"],
+        )
+        self.assertEqual(Property.objects.count(), 3)  # type: ignore[attr-defined]
+        self.assertEqual(
+            Property.objects.get(external_id="B-1").region, self.porto  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+    def test_sync_is_idempotent(self):
+        """Test that re-running a sync updates rather than duplicates rows."""
+        self.write_source([listing("A-1")])
+        sync_listings.delay("test").get()
+
+        self.write_source([listing("A-1", price="350000.00")])
+        sync_listings.delay("test").get()
+
+        self.assertEqual(Property.objects.count(), 1)  # type: ignore[attr-defined]
+        self.assertEqual(
+            Property.objects.get(external_id="A-1").price,  # type: ignore[attr-defined]
+            Decimal("350000.00"),
+        )
+
+    def test_sync_withdraws_unseen_listings(self):
+        """Test that listings missing from the source are withdrawn."""
+        self.write_source([listing("A-1"), listing("A-2")])
+        sync_listings.delay("test").get()
+
+        self.write_source([listing("A-1")])
+        run_id = sync_listings.delay("test").get()
+
+        self.assertEqual(
+            Property.objects.get(external_id="A-2").listing_status,  # type: ignore[attr-defined]  # noqa: E501
+            "withdrawn",
+        )
+        self.assertEqual(
+            SyncRun.objects.get(pk=run_id).rows_withdrawn, 1  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+    def test_sync_withdraws_only_its_source(self):
+        """Test that a sync leaves listings from other sources alone."""
+        IngestionService.upsert_listings([listing("O-1")], source="other")
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="M-1",
+            address="Manual import",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="house",
+        )
+        self.write_source([listing("A-1")])
+
+        run_id = sync_listings.delay("test").get()
+
+        self.assertEqual(
+            Property.objects.get(external_id="A-1").source, "test"  # type: ignore[attr-defined]  # noqa: E501
+        )
+        self.assertEqual(
+            set(
+                Property.objects.filter(  # type: ignore[attr-defined]
+                    listing_status="active"
+                ).values_list("external_id", flat=True)
+            ),
+            {"A-1", "O-1", "M-1"},
+        )
+        self.assertEqual(
+            SyncRun.objects.get(pk=run_id).rows_withdrawn, 0  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+    def test_sync_refreshes_region_statistics(self):
+        """Test that finalization recomputes region averages."""
+        self.write_source([listing("A-1", price="400000.00", size="100.00")])
+        sync_listings.delay("test").get()
+
+        self.lisbon.refresh_from_db()
+        self.assertEqual(self.lisbon.avg_price_per_sqm, Decimal("4000.00"))
+
+    def test_ingest_chunk_skips_done_chunk(self):
+        """Test that a redelivered done chunk is not processed again."""
+        run = SyncRun.objects.create(source="test")  # type: ignore[attr-defined]
+        SyncChunk.objects.create(  # type: ignore[attr-defined]
+            run=run, key="region:LIS", status="done", rows=7
+        )
+        self.write_source([listing("A-1")])
+
+        self.assertEqual(ingest_chunk.delay(run.pk, "region:LIS").get(), 7)
+        self.assertEqual(Property.objects.count(), 0)  # type: ignore[attr-defined]
+
+    def test_finalize_waits_for_pending_chunks(self):
+        """Test that finalization leaves runs with unfinished chunks resumable."""
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="OLD-1",
+            address="Old",
+            price=Decimal("1.00"),
+            size_sqm=Decimal("1.00"),
+            property_type="house",
+        )
+        run = SyncRun.objects.create(source="test")  # type: ignore[attr-defined]
+        SyncChunk.objects.create(run=run, key="region:LIS")  # type: ignore[attr-defined]  # noqa: E501
+
+        finalize_sync.delay(run.pk).get()
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, "running")
+        self.assertEqual(
+            Property.objects.get(external_id="OLD-1").listing_status,  # type: ignore[attr-defined]  # noqa: E501
+            "active",
+        )
+
+    def test_sync_resumes_unfinished_run(self):
+        """Test that a resumed sync only dispatches chunks that are not done."""
+        self.write_source([listing("A-1"), listing("B-1", region="OPO")])
+        run = SyncRun.objects.create(source="test")  # type: ignore[attr-defined]
+        SyncChunk.objects.create(  # type: ignore[attr-defined]
+            run=run, key="region:LIS", status="done", rows=1
+        )
+        SyncChunk.objects.create(run=run, key="region:OPO")  # type: ignore[attr-defined]  # noqa: E501
+
+        self.assertEqual(sync_listings.delay("test").get(), run.pk)
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(run.rows_upserted, 2)
+        self.assertFalse(
+            Property.objects.filter(external_id="A-1").exists()  # type: ignore[attr-defined]  # noqa: E501
+        )
+        self.assertTrue(
+            Property.objects.filter(external_id="B-1").exists()  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+
+@override_settings(CACHE_WARMING_SAMPLE_RATE=1.0, CACHE_WARMING_CONCURRENCY=1)
+class WarmCachesTaskTest(TestCase):
+    """Test cases for the warm_caches task."""
+
+    def test_warm_caches_uses_settings_defaults(self):
+        """Test the task replays recorded shapes with configured limits."""
+        cache.clear()
+        QueryShapeLog.clear()
+        self.client.get("/api/regions/")
+
+        result = warm_caches.apply()
+
+        self.assertEqual(result.get(), {"warmed": 1, "failed": 0})
+
+
+class TaskMetricsTest(TestCase):
+    """Test cases for Celery task metrics."""
+
+    def test_task_duration_recorded(self):
+        """Test that a task run is observed with its final state."""
+        labels = {"task": "api.tasks.warm_caches", "state": "SUCCESS"}
+        before = (
+            REGISTRY.get_sample_value(
+                "atlas_celery_task_duration_seconds_count", labels
+            )
+            or 0
+        )
+
+        warm_caches.apply()
+
+        after = REGISTRY.get_sample_value(
+            "atlas_celery_task_duration_seconds_count", labels
+        )
+        self.assertEqual(after, before + 1)
@@ -0,0 +1,114 @@
+"""
+Tests for API throttling.
+
+This module tests the token-bucket throttle including:
+- bucket refill and Retry-After computation
+- per-action cost weights on PropertyViewSet
+- separate buckets per user and per IP
+"""
+
+from unittest import mock
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from api.models import Property
+from api.throttling import LocalTokenBuckets
+from api.views import PropertyViewSet
+
+User = get_user_model()
+
+
+class LocalTokenBucketsTest(TestCase):
+    """Test cases for the per-process token bucket."""
+
+    def setUp(self):
+        """Start with empty buckets."""
+        LocalTokenBuckets.clear()
+
+    def test_consume_until_empty(self):
+        """Test requests pass until the bucket runs dry."""
+        results = [LocalTokenBuckets.consume("k", 5, 1, 2)[0] for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+
+    def test_wait_reflects_missing_tokens(self):
+        """Test the wait is the time needed to refill the shortfall."""
+        with mock.patch("api.throttling.time.monotonic", return_value=100.0):
+            LocalTokenBuckets.consume("k", 4, 2, 4)
+            allowed, wait = LocalTokenBuckets.consume("k", 4, 2, 3)
+
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 1.5)
+
+    def test_bucket_refills_over_time(self):
+        """Test tokens come back at the refill rate, capped at capacity."""
+        with mock.patch("api.throttling.time.monotonic", return_value=100.0):
+            LocalTokenBuckets.consume("k", 4, 2, 4)
+        with mock.patch("api.throttling.time.monotonic", return_value=101.0):
+            self.assertTrue(LocalTokenBuckets.consume("k", 4, 2, 2)[0])
+            self.assertFalse(LocalTokenBuckets.consume("k", 4, 2, 1)[0])
+
+
+@override_settings(TOKEN_BUCKET_THROTTLE={"CAPACITY": 6, "REFILL_RATE": 0.01})
+class PropertyViewSetThrottleTest(TestCase):
+    """Test cases for throttling of PropertyViewSet."""
+
+    def setUp(self):
+        """Create a listing and reset buckets."""
+        LocalTokenBuckets.clear()
+        self.client = APIClient()
+        self.property = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="THR-1",
+            address="Throttle Address",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+        )
+
+    def tearDown(self):
+        """Do not leave drained buckets behind for other tests."""
+        LocalTokenBuckets.clear()
+
+    def test_expensive_actions_spend_more_tokens(self):
+        """Test two comparisons use up the bucket six detail reads would."""
+        url = f"/api/properties/{self.property.pk}/compare_to_region/"
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.get(f"/api/properties/{self.property.pk}/")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "100")
+
+    def test_users_have_separate_buckets(self):
+        """Test an authenticated client is not throttled by anonymous use."""
+        for _ in range(6):
+            self.client.get(f"/api/properties/{self.property.pk}/")
+        self.assertEqual(
+            self.client.get(f"/api/properties/{self.property.pk}/").status_code, 429
+        )
+
+        user = User.objects.create_user(  # type: ignore[attr-defined]
+            username="reader", email="reader@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=user)
+
+        response = self.client.get(f"/api/properties/{self.property.pk}/")
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_search_and_deep_pages_cost_extra(self):
+        """Test search terms and deep pages raise the cost."""
+        view = PropertyViewSet()
+        view.action = "list"
+
+        def cost(query):
+            request = mock.Mock(query_params=query)
+            return view.get_throttle_cost(request)
+
+        self.assertEqual(cost({}), 1)
+        self.assertEqual(cost({"search": "lisboa"}), 3)
+        self.assertEqual(cost({"search": "lisboa", "page": "50"}), 6)
+        view.action = "price_range"
+        self.assertEqual(cost({"page": "2"}), 3)
@@ -0,0 +1,293 @@
+"""
+Tests for request tracing.
+
+This module tests:
+- span() parenting, error status and traceparent parsing
+- The span exporters and the TRACING_EXPORTER setting
+- TracingMiddleware request spans with query, service and cache children
+- traceparent propagation into Celery tasks
+"""
+
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Property, Region
+from api.tasks import refresh_region_statistics
+from core import tracing
+from core.celery import app as celery_app
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+@override_settings(
+    TRACING_ENABLED=True, TRACING_EXPORTER="core.tracing.InMemoryExporter"
+)
+class SpanTest(SimpleTestCase):
+    """Test cases for span() and its helpers."""
+
+    def setUp(self):
+        """Start each test with no exported spans."""
+        self.exporter = tracing.get_exporter()
+        self.exporter.clear()
+
+    def test_child_spans_share_the_trace(self):
+        """Test that nested spans are children of the current span."""
+        with tracing.span("parent") as parent:
+            with tracing.span("child", attributes={"key": "value"}) as child:
+                self.assertIs(tracing.current_span(), child)
+            self.assertIs(tracing.current_span(), parent)
+        self.assertIsNone(tracing.current_span())
+
+        self.assertEqual([s.name for s in self.exporter.spans], ["child", "parent"])
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertEqual(child.parent_id, parent.span_id)
+        self.assertIsNone(parent.parent_id)
+        self.assertEqual(child.attributes, {"key": "value"})
+        self.assertGreaterEqual(parent.duration_ms, child.duration_ms)
+
+    def test_remote_parent(self):
+        """Test that a parsed traceparent becomes the span's parent."""
+        with tracing.span(
+            "server", parent=tracing.parse_traceparent(TRACEPARENT)
+        ) as span:
+            pass
+
+        self.assertEqual(span.trace_id, "4bf92f3577b34da6a3ce929d0e0e4736")
+        self.assertEqual(span.parent_id, "00f067aa0ba902b7")
+        self.assertEqual(span.traceparent(), f"00-{span.trace_id}-{span.span_id}-01")
+
+    def test_exception_marks_span_failed(self):
+        """Test that an exception is recorded on the span and re-raised."""
+        with self.assertRaises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+
+        span = self.exporter.spans[0]
+        self.assertEqual(span.status, "error")
+        self.assertEqual(span.attributes["error.type"], "ValueError")
+        self.assertEqual(span.attributes["error.message"], "boom")
+
+    def test_parse_traceparent_rejects_invalid_values(self):
+        """Test that malformed or all-zero traceparents are ignored."""
+        for value in (
+            None,
+            "",
+            "garbage",
+            "01-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+            "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-0000000000000000-01",
+        ):
+            self.assertIsNone(tracing.parse_traceparent(value), value)
+
+    @override_settings(TRACING_ENABLED=False)
+    def test_disabled(self):
+        """Test that nothing is recorded when tracing is disabled."""
+        with tracing.span("ignored") as span:
+            tracing.set_attributes(key="value")
+
+        self.assertIsNone(span)
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_file_exporter(self):
+        """Test that FileExporter appends spans as JSON lines."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = Path(tmpdir) / "spans.jsonl"
+
+        with override_settings(
+            TRACING_EXPORTER="core.tracing.FileExporter", TRACING_FILE=str(path)
+        ):
+            with tracing.span("first"):
+                pass
+            with tracing.span("second"):
+                pass
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual([line["name"] for line in lines], ["first", "second"])
+        self.assertEqual(lines[0]["status"], "ok")
+        self.assertIsNotNone(lines[0]["duration_ms"])
+
+    def test_console_exporter(self):
+        """Test that ConsoleExporter writes a line per span to stderr."""
+        stderr = io.StringIO()
+        with override_settings(TRACING_EXPORTER="core.tracing.ConsoleExporter"):
+            with mock.patch("sys.stderr", stderr):
+                with tracing.span("outer"):
+                    with tracing.span("inner"):
+                        pass
+
+        inner, outer = stderr.getvalue().splitlines()
+        self.assertRegex(inner, r"^\[trace [0-9a-f]{8}\]   inner [\d.]+ms ok$")
+        self.assertRegex(outer, r"^\[trace [0-9a-f]{8}\] outer [\d.]+ms ok$")
+
+    def test_export_errors_are_swallowed(self):
+        """Test that a failing exporter does not break the traced block."""
+        with mock.patch.object(
+            tracing.InMemoryExporter, "export", side_effect=OSError("disk full")
+        ):
+            with self.assertLogs("core.tracing", level="WARNING"):
+                with tracing.span("unexported"):
+                    result = 1
+        self.assertEqual(result, 1)
+
+    def test_exporters_implement_export(self):
+        """Test that exporters must implement export()."""
+
+        class PartialExporter(tracing.SpanExporter):
+            pass
+
+        with self.assertRaises(TypeError):
+            PartialExporter()  # type: ignore[abstract]
+
+
+@override_settings(
+    TRACING_ENABLED=True, TRACING_EXPORTER="core.tracing.InMemoryExporter"
+)
+class TracingMiddlewareTest(TestCase):
+    """Test cases for request spans."""
+
+    def setUp(self):
+        """Create a listing and reset the exporter and caches."""
+        cache.clear()
+        self.client = APIClient()
+        self.region = Region.objects.create(  # type: ignore[attr-defined]
+            name="Lisbon", code="LIS", avg_price_per_sqm=Decimal("5000.00")
+        )
+        self.property = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TRACE-1",
+            address="Rua Augusta 1, Lisboa",
+            price=Decimal("400000.00"),
+            size_sqm=Decimal("100.00"),
+            property_type="apartment",
+            region=self.region,
+        )
+        self.exporter = tracing.get_exporter()
+        self.exporter.clear()
+
+    def test_request_span_tree(self):
+        """Test that queries, services and caches are children of the request."""
+        response = self.client.get(
+            f"/api/properties/{self.property.pk}/compare_to_region/",
+            HTTP_TRACEPARENT=TRACEPARENT,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        spans = {span.span_id: span for span in self.exporter.spans}
+        server = self.exporter.spans[-1]
+        self.assertEqual(server.kind, "server")
+        self.assertEqual(server.name, "GET api/properties/<pk>/compare_to_region/")
+        self.assertEqual(server.attributes["http.status_code"], 200)
+        self.assertEqual(server.parent_id, "00f067aa0ba902b7")
+        self.assertEqual(response["X-Trace-Id"], server.trace_id)
+        self.assertTrue(
+            all(span.trace_id == server.trace_id for span in spans.values())
+        )
+
+        def ancestors(span):
+            while span.parent_id in spans:
+                span = spans[span.parent_id]
+                yield span.name
+
+        names = {span.name: span for span in self.exporter.spans}
+        service = names["PropertyService.compare_to_region_average"]
+        self.assertIn(server.name, list(ancestors(service)))
+        self.assertEqual(names["cache.response"].attributes["cache.result"], "miss")
+        self.assertFalse(names["cache.region.snapshot"].attributes["cache.hit"])
+        queries = [span for span in spans.values() if span.name == "db.query"]
+        self.assertTrue(queries)
+        self.assertTrue(all(server.name in list(ancestors(query)) for query in queries))
+        self.assertIn("db.statement", queries[0].attributes)
+
+    def test_request_without_traceparent_starts_a_trace(self):
+        """Test that requests without a traceparent are trace roots."""
+        response = self.client.get("/api/properties/")
+
+        server = self.exporter.spans[-1]
+        self.assertIsNone(server.parent_id)
+        self.assertEqual(response["X-Trace-Id"], server.trace_id)
+        self.assertEqual(server.name, "GET api/properties/")
+
+    def test_query_spans_survive_scoped_wrappers(self):
+        """Test that a connection opened inside execute_wrapper() keeps spans."""
+
+        def scoped(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        connection = mock.Mock(execute_wrappers=[scoped])
+        tracing.QuerySpans.install(connection=connection)
+        # What leaving the ``execute_wrapper(scoped)`` block does
+        connection.execute_wrappers.pop()
+
+        self.assertEqual(
+            connection.execute_wrappers, [tracing.QuerySpans.execute_wrapper]
+        )
+
+    @override_settings(TRACING_ENABLED=False)
+    def test_disabled(self):
+        """Test that untraced requests carry no trace id."""
+        response = self.client.get("/api/properties/")
+
+        self.assertNotIn("X-Trace-Id", response)
+        self.assertEqual(self.exporter.spans, [])
+
+
+@override_settings(
+    TRACING_ENABLED=True, TRACING_EXPORTER="core.tracing.InMemoryExporter"
+)
+class TaskTracingTest(TestCase):
+    """Test cases for trace propagation into Celery tasks."""
+
+    def setUp(self):
+        """Run tasks eagerly with an empty exporter."""
+        self.previous_eager = celery_app.conf.task_always_eager
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]
+        self.exporter = tracing.get_exporter()
+        self.exporter.clear()
+
+    def tearDown(self):
+        """Restore Celery state."""
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=self.previous_eager)
+
+    def test_eager_task_joins_the_current_trace(self):
+        """Test that an eager task is a child of the span that queued it."""
+        with tracing.span("caller") as caller:
+            refresh_region_statistics.delay()
+
+        task = next(s for s in self.exporter.spans if s.kind == "consumer")
+        self.assertEqual(task.name, "celery.task api.tasks.refresh_region_statistics")
+        self.assertEqual(task.parent_id, caller.span_id)
+        self.assertEqual(task.attributes["celery.state"], "SUCCESS")
+        service = next(
+            s
+            for s in self.exporter.spans
+            if s.name == "PropertyService.refresh_region_statistics"
+        )
+        self.assertEqual(service.parent_id, task.span_id)
+
+    def test_task_continues_the_traceparent_header(self):
+        """Test that the published traceparent header parents the task span."""
+        headers = {}
+        with tracing.span("caller") as caller:
+            tracing.TaskTracing.on_before_publish(headers=headers)
+        self.assertEqual(headers, {"traceparent": caller.traceparent()})
+        self.exporter.clear()
+
+        refresh_region_statistics.apply(headers=headers)
+
+        task = next(s for s in self.exporter.spans if s.kind == "consumer")
+        self.assertEqual(task.trace_id, caller.trace_id)
+        self.assertEqual(task.parent_id, caller.span_id)
+
+    def test_no_header_outside_a_trace(self):
+        """Test that publishing outside a span adds no header."""
+        headers = {}
+        tracing.TaskTracing.on_before_publish(headers=headers)
+        self.assertEqual(headers, {})
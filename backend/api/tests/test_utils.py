@@ -4,10 +4,18 @@ Tests for API utility functions.
 This module tests all utility functionality including:
 - normalize_coordinates function
 - create_point_from_coordinates function
+- postal code extraction
+- LRUCache
+- GIS capability detection
 """
 
+import os
+from unittest import mock
 from django.test import TestCase
 from api.utils.coordinates import normalize_coordinates, create_point_from_coordinates
+from api.utils.lru import LRUCache
+from api.utils.postal_codes import extract_postal_code, postal_code_prefix
+from core.gis import get_point_class, gis_available
 
 
 class NormalizeCoordinatesTest(TestCase):
@@ -102,3 +110,95 @@ class CreatePointFromCoordinatesTest(TestCase):
         # Result should be None if PostGIS is not available, or a Point if it is
         # Both are acceptable behaviors
         self.assertTrue(result is None or hasattr(result, "x"))
+
+
+class PostalCodeTest(TestCase):
+    """Test cases for postal code helpers."""
+
+    def test_extract_postal_code(self):
+        """Test extract_postal_code finds a CP4-CP3 code in an address."""
+        result = extract_postal_code("Rua Augusta 10, 1100-053 Lisboa")
+
+        self.assertEqual(result, "1100-053")
+
+    def test_extract_postal_code_normalizes_spacing(self):
+        """Test extract_postal_code accepts spaces around the dash."""
+        self.assertEqual(extract_postal_code("4000 - 123 Porto"), "4000-123")
+
+    def test_extract_postal_code_ignores_longer_numbers(self):
+        """Test extract_postal_code does not match inside longer digit runs."""
+        self.assertIsNone(extract_postal_code("Ref 123456-7890"))
+
+    def test_extract_postal_code_none(self):
+        """Test extract_postal_code with empty input."""
+        self.assertIsNone(extract_postal_code(None))
+        self.assertIsNone(extract_postal_code("Rua sem codigo"))
+
+    def test_postal_code_prefix(self):
+        """Test postal_code_prefix returns the CP4 part."""
+        self.assertEqual(postal_code_prefix("1250-096"), "1250")
+        self.assertIsNone(postal_code_prefix(None))
+
+
+class LRUCacheTest(TestCase):
+    """Test cases for LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched key is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_get_many_returns_cached_subset(self):
+        """Test get_many only returns keys that are cached."""
+        cache = LRUCache()
+        cache.set("a", None)
+        cache.set("b", 2)
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": None, "b": 2})
+
+
+class GisAvailableTest(TestCase):
+    """Test cases for gis_available detection."""
+
+    def setUp(self):
+        gis_available.cache_clear()
+
+    def tearDown(self):
+        gis_available.cache_clear()
+
+    def test_gis_disabled_by_env(self):
+        """Test that GIS_ENABLED=false skips probing."""
+        with mock.patch.dict(os.environ, {"GIS_ENABLED": "false"}), mock.patch(
+            "core.gis.ctypes.util.find_library"
+        ) as find_library:
+            self.assertFalse(gis_available())
+            self.assertIsNone(get_point_class())
+        find_library.assert_not_called()
+
+    def test_gis_without_library(self):
+        """Test that a missing GDAL library disables GIS without importing it."""
+        env = {
+            k: v
+            for k, v in os.environ.items()
+            if k not in ("GIS_ENABLED", "GDAL_LIBRARY_PATH")
+        }  # noqa: E501
+        with mock.patch.dict(os.environ, env, clear=True), mock.patch(
+            "core.gis.ctypes.util.find_library", return_value=None
+        ):
+            self.assertFalse(gis_available())
+            # Exported so child processes skip probing
+            self.assertEqual(os.environ["GIS_ENABLED"], "false")
+
+    def test_gis_result_cached(self):
+        """Test that detection runs once per process."""
+        with mock.patch.dict(os.environ, {"GIS_ENABLED": "false"}):
+            self.assertFalse(gis_available())
+        with mock.patch.dict(os.environ, {"GIS_ENABLED": "true"}):
+            self.assertFalse(gis_available())
@@ -2,17 +2,44 @@
 Tests for API views and ViewSets.
 
 This module tests all view functionality including:
-- health_check endpoint
+- health_check, liveness and readiness endpoints
 - PropertyViewSet (CRUD, filtering, search, ordering, custom actions)
 - RegionViewSet (list, retrieve, search)
+- Single-flight response caching of list and aggregate actions
+- Read-replica routing with read-your-writes pinning
+- Per-action statement timeouts
+- Server-Timing instrumentation
+- Prometheus metrics endpoint
+- On-demand request profiling
 """
 
-from django.test import TestCase
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.db import OperationalError, connection
 from django.contrib.auth import get_user_model
 from decimal import Decimal
+from prometheus_client import REGISTRY
 from rest_framework.test import APIClient
 from rest_framework import status
-from api.models import Property, Region
+from api.models import ArchivedProperty, Property, Region
+from api.services.archive_service import ArchiveService
+from api.services.health import HealthProbes
+from api.services.response_cache import PROPERTIES_SCOPE, ResponseCache
+from api.services.statement_timeout import StatementTimeout
+from core.db_routers import ReplicaRouter, replica_reads
+from core.metrics import QueryCounter, get_registry
+from core.profiling import Sampler, make_token
+from core.timing import RequestTiming, request_timing, timed
+from api.views import PropertyViewSet, RegionViewSet
 
 User = get_user_model()
 
@@ -49,6 +76,92 @@ class HealthCheckViewTest(TestCase):
         self.assertEqual(response.data["version"], "0.1.0")
 
 
+@override_settings(
+    HEALTH_CHECK_THRESHOLDS_MS={"database": 500, "cache": 200, "broker": 1000}
+)
+class ReadinessTest(TestCase):
+    """Test cases for the liveness and readiness endpoints."""
+
+    def setUp(self):
+        """Set up test client with a reachable broker."""
+        self.client = APIClient()
+        HealthProbes.clear()
+        patcher = mock.patch.object(HealthProbes, "probe_broker")
+        self.probe_broker = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(HealthProbes.clear)
+
+    def test_liveness(self):
+        """Test that liveness answers without probing dependencies."""
+        response = self.client.get("/api/health/live/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "alive")
+        self.probe_broker.assert_not_called()
+
+    def test_readiness_ok(self):
+        """Test that readiness reports each dependency's latency."""
+        response = self.client.get("/api/health/ready/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "ready")
+        self.assertEqual(set(response.data["checks"]), {"database", "cache", "broker"})
+        database = response.data["checks"]["database"]
+        self.assertEqual(database["status"], "ok")
+        self.assertEqual(database["threshold_ms"], 500)
+        self.assertIn("latency_ms", database)
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+    def test_readiness_dependency_down(self):
+        """Test that a failing dependency makes the instance unavailable."""
+        self.probe_broker.side_effect = OSError("Connection refused")
+
+        with self.assertLogs("api.services.health", level="WARNING") as logs:
+            response = self.client.get("/api/health/ready/")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["checks"]["broker"]["status"], "error")
+        # Only the error type is public; the message is logged
+        self.assertEqual(response.data["checks"]["broker"]["error"], "OSError")
+        self.assertNotIn("Connection refused", str(response.data))
+        self.assertIn("Connection refused", logs.output[0])
+        self.assertEqual(response.data["checks"]["database"]["status"], "ok")
+
+    def test_readiness_slow_dependency(self):
+        """Test that a dependency slower than its threshold fails readiness."""
+        with override_settings(HEALTH_CHECK_THRESHOLDS_MS={"broker": -1}):
+            response = self.client.get("/api/health/ready/")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["checks"]["broker"]["status"], "degraded")
+
+    def test_readiness_cached(self):
+        """Test that probe results are reused within the cache window."""
+        first = self.client.get("/api/health/ready/")
+        second = self.client.get("/api/health/ready/")
+
+        self.assertFalse(first.data["cached"])
+        self.assertTrue(second.data["cached"])
+        self.assertEqual(self.probe_broker.call_count, 1)
+
+    @override_settings(HEALTH_CHECK_CACHE_SECONDS=0)
+    def test_readiness_recovers(self):
+        """Test that an expired result is probed again."""
+        self.probe_broker.side_effect = OSError("Connection refused")
+        self.assertEqual(self.client.get("/api/health/ready/").status_code, 503)
+
+        self.probe_broker.side_effect = None
+        self.assertEqual(self.client.get("/api/health/ready/").status_code, 200)
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_readiness_eager_celery_skips_broker(self):
+        """Test that eager Celery needs no broker."""
+        response = self.client.get("/api/health/ready/")
+
+        self.assertNotIn("broker", response.data["checks"])
+        self.probe_broker.assert_not_called()
+
+
 class PropertyViewSetTest(TestCase):
     """Test cases for PropertyViewSet."""
 
@@ -85,6 +198,134 @@ class PropertyViewSetTest(TestCase):
         results = get_response_results(response)
         self.assertEqual(len(results), 1)
 
+    def test_list_properties_defaults_to_active(self):
+        """Test sold listings awaiting archival are only listed on request."""
+        sold = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TEST-SOLD",
+            address="Sold Address",
+            price=Decimal("250000.00"),
+            size_sqm=Decimal("90.00"),
+            property_type="apartment",
+            listing_status="sold",
+        )
+
+        default = get_response_results(self.client.get("/api/properties/"))
+        sold_only = get_response_results(
+            self.client.get("/api/properties/", {"listing_status": "sold"})
+        )
+        every = get_response_results(
+            self.client.get("/api/properties/", {"listing_status": "all"})
+        )
+        detail = self.client.get(f"/api/properties/{sold.pk}/")
+
+        self.assertEqual([r["id"] for r in default], [self.property.pk])
+        self.assertEqual([r["id"] for r in sold_only], [sold.pk])
+        self.assertEqual(len(every), 2)
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+
+    def test_list_properties_omits_payload(self):
+        """Test list responses never read the payload side table."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/properties/")
+
+        results = get_response_results(response)
+        self.assertNotIn("raw_data", results[0])
+        self.assertNotIn("description", results[0])
+        self.assertFalse(
+            any("api_propertypayload" in q["sql"] for q in queries.captured_queries)
+        )
+
+    def test_list_properties_region_queries_do_not_scale(self):
+        """Test nested regions come from the region cache, not per-row queries."""
+        for i in range(5):
+            Property.objects.create(  # type: ignore[attr-defined]
+                external_id=f"BULK-{i}",
+                address=f"Bulk {i}",
+                price=Decimal("100000.00"),
+                size_sqm=Decimal("50.00"),
+                property_type="apartment",
+                region=self.region,
+            )
+        self.client.get("/api/properties/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/properties/")
+
+        results = get_response_results(response)
+        self.assertEqual(results[0]["region"]["code"], "LIS")
+        self.assertFalse(
+            any("api_region" in q["sql"] for q in queries.captured_queries)
+        )
+
+    def test_list_properties_served_from_fragment_cache(self):
+        """Test a repeated list page only reads the count and page ids."""
+        self.client.get("/api/properties/")
+        # Skip the whole-response cache so the page is rebuilt from fragments
+        ResponseCache.bump(PROPERTIES_SCOPE)
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/properties/")
+
+        results = get_response_results(response)
+        self.assertEqual(results[0]["address"], "Test Address 123")
+
+    def test_list_properties_response_cached(self):
+        """Test a repeated list request is served without queries."""
+        self.client.get("/api/properties/?ordering=price&page_size=5")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/properties/?page_size=5&ordering=price")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_response_results(response)[0]["external_id"], "TEST-001")
+
+    def test_list_properties_response_refreshes_after_create(self):
+        """Test creating a listing makes cached list responses stale."""
+        self.client.get("/api/properties/")
+        self.client.force_authenticate(user=self.user)
+
+        self.client.post(
+            "/api/properties/",
+            {
+                "address": "New Address",
+                "price": "150000.00",
+                "size_sqm": "60.00",
+                "property_type": "apartment",
+            },
+            format="json",
+        )
+        response = self.client.get("/api/properties/")
+
+        self.assertEqual(response.data["count"], 2)
+
+    def test_compare_to_region_response_cached(self):
+        """Test region comparisons are cached per property."""
+        url = f"/api/properties/{self.property.pk}/compare_to_region/"
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+
+        self.assertEqual(first.data, second.data)
+
+    def test_list_properties_fragment_refreshes_after_update(self):
+        """Test edited rows are re-serialized instead of served stale."""
+        self.client.get("/api/properties/")
+
+        self.property.address = "Changed Address"
+        self.property.save()
+        response = self.client.get("/api/properties/")
+
+        results = get_response_results(response)
+        self.assertEqual(results[0]["address"], "Changed Address")
+
+    def test_retrieve_property_includes_payload(self):
+        """Test detail responses include the payload fields."""
+        response = self.client.get(f"/api/properties/{self.property.pk}/")
+
+        self.assertEqual(response.data["description"], "Test property")
+        self.assertEqual(response.data["raw_data"], {})
+
     def test_retrieve_property_unauthenticated(self):
         """Test retrieving a property without authentication."""
         url = f"/api/properties/{self.property.pk}/"
@@ -331,6 +572,138 @@ class PropertyViewSetTest(TestCase):
         self.assertIn("error", response.data)
 
 
+class PropertyPostalCodeViewTest(TestCase):
+    """Test cases for postal code filtering and lookup on PropertyViewSet."""
+
+    def setUp(self):
+        """Set up properties in two CP4 areas."""
+        self.client = APIClient()
+        for external_id, address in [
+            ("CP-1", "Rua A, 1250-096 Lisboa"),
+            ("CP-2", "Rua B, 1250-096 Lisboa"),
+            ("CP-3", "Rua C, 1250-100 Lisboa"),
+            ("CP-4", "Rua D, 4000-123 Porto"),
+        ]:
+            Property.objects.create(  # type: ignore[attr-defined]
+                external_id=external_id,
+                address=address,
+                price=Decimal("200000.00"),
+                size_sqm=Decimal("80.00"),
+                property_type="apartment",
+            )
+
+    def test_filter_by_postal_code(self):
+        """Test filtering by full postal code."""
+        response = self.client.get("/api/properties/", {"postal_code": "1250-096"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = get_response_results(response)
+        self.assertEqual({r["external_id"] for r in results}, {"CP-1", "CP-2"})
+        self.assertEqual(results[0]["postal_code"], "1250-096")
+
+    def test_filter_by_postal_code_prefix(self):
+        """Test filtering by CP4 prefix."""
+        response = self.client.get("/api/properties/", {"postal_code_prefix": "1250"})
+
+        results = get_response_results(response)
+        self.assertEqual(len(results), 3)
+
+    def test_filter_by_invalid_postal_code_prefix(self):
+        """Test invalid CP4 prefixes match nothing."""
+        response = self.client.get("/api/properties/", {"postal_code_prefix": "12"})
+
+        self.assertEqual(len(get_response_results(response)), 0)
+
+    def test_search_by_postal_code(self):
+        """Test postal code searches use the postal code columns."""
+        response = self.client.get("/api/properties/", {"search": "4000-123"})
+        self.assertEqual(
+            [r["external_id"] for r in get_response_results(response)], ["CP-4"]
+        )
+
+        response = self.client.get("/api/properties/", {"search": "1250"})
+        self.assertEqual(len(get_response_results(response)), 3)
+
+    def test_postal_codes_lookup(self):
+        """Test postal_codes action lists codes in a CP4 area with counts."""
+        response = self.client.get("/api/properties/postal_codes/", {"prefix": "1250"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {"postal_code": "1250-096", "count": 2},
+                {"postal_code": "1250-100", "count": 1},
+            ],
+        )
+
+    def test_postal_codes_lookup_invalid_prefix(self):
+        """Test postal_codes action rejects malformed prefixes."""
+        response = self.client.get("/api/properties/postal_codes/", {"prefix": "12a"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ArchivedPropertyViewSetTest(TestCase):
+    """Test cases for ArchivedPropertyViewSet."""
+
+    def setUp(self):
+        """Archive one sold listing and keep one active listing."""
+        self.client = APIClient()
+        self.sold = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="SOLD-1",
+            address="Sold Address",
+            price=Decimal("300000.00"),
+            size_sqm=Decimal("100.00"),
+            property_type="apartment",
+            listing_status="sold",
+        )
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="ACT-1",
+            address="Active Address",
+            price=Decimal("200000.00"),
+            size_sqm=Decimal("80.00"),
+            property_type="apartment",
+        )
+        ArchiveService.archive(older_than_days=-1)
+
+    def test_default_list_excludes_archived(self):
+        """Test the property list only reads the hot table."""
+        response = self.client.get("/api/properties/")
+
+        results = get_response_results(response)
+        self.assertEqual([r["external_id"] for r in results], ["ACT-1"])
+
+    def test_list_archived(self):
+        """Test archived listings are listed explicitly."""
+        response = self.client.get(
+            "/api/archived-properties/", {"listing_status": "sold"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = get_response_results(response)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["id"], self.sold.pk)
+        self.assertNotIn("data", results[0])
+
+    def test_retrieve_archived_by_original_id(self):
+        """Test archived listings are retrieved by their former property id."""
+        response = self.client.get(f"/api/archived-properties/{self.sold.pk}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["external_id"], "SOLD-1")
+        self.assertIn("data", response.data)
+        self.assertTrue(
+            ArchivedProperty.objects.filter(original_id=self.sold.pk).exists()  # type: ignore[attr-defined]  # noqa: E501
+        )
+
+    def test_archived_is_read_only(self):
+        """Test archived listings cannot be modified through the API."""
+        response = self.client.delete(f"/api/archived-properties/{self.sold.pk}/")
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
 class RegionViewSetTest(TestCase):
     """Test cases for RegionViewSet."""
 
@@ -360,6 +733,18 @@ class RegionViewSetTest(TestCase):
         else:
             self.assertEqual(len(response.data), 2)
 
+    def test_list_regions_response_refreshes_after_region_change(self):
+        """Test editing a region makes cached region responses stale."""
+        self.client.get("/api/regions/")
+        with self.assertNumQueries(0):
+            self.client.get("/api/regions/")
+
+        self.region.name = "Lisboa"
+        self.region.save()
+        response = self.client.get("/api/regions/")
+
+        self.assertEqual(get_response_results(response)[0]["name"], "Lisboa")
+
     def test_retrieve_region(self):
         """Test retrieving a region."""
         url = f"/api/regions/{self.region.pk}/"
@@ -562,3 +947,524 @@ class RegionViewSetTest(TestCase):
         self.assertEqual(response_page2.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response_page2.data["results"]), 5)  # Remaining 5 items
         self.assertIsNone(response_page2.data["next"])  # Should be last page
+
+
+class ReplicaRoutingTest(TestCase):
+    """Test cases for ReplicaRouter and ReplicaReadMixin."""
+
+    def setUp(self):
+        """Pretend a replica is configured and record replica blocks."""
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(  # type: ignore[attr-defined]
+            username="writer", email="writer@example.com", password="testpass123"
+        )
+        self.property = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="REP-1",
+            address="Replica Address",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+        )
+        self.replica_blocks = []
+
+        @contextmanager
+        def recording_replica_reads(enabled=True):
+            self.replica_blocks.append(enabled)
+            yield
+
+        for target, value in [
+            ("core.db_routers.replica_configured", True),
+            ("api.views.replica_configured", True),
+            ("api.services.response_cache.replica_configured", True),
+        ]:
+            patcher = mock.patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch("api.views.replica_reads", recording_replica_reads)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_router_reads_replica_only_inside_block(self):
+        """Test reads use the replica only where a view opted in."""
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Property), "default")
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Property), "replica")
+            self.assertEqual(router.db_for_write(Property), "default")
+            with replica_reads(False):
+                self.assertEqual(router.db_for_read(Property), "default")
+        self.assertFalse(router.allow_migrate("replica", "api"))
+
+    def test_safe_requests_read_from_replica(self):
+        """Test a GET runs inside a replica block."""
+        self.client.get(f"/api/properties/{self.property.pk}/")
+
+        self.assertEqual(self.replica_blocks, [True])
+
+    def test_writer_pinned_to_primary(self):
+        """Test a client reads from the primary right after writing."""
+        self.client.force_authenticate(user=self.user)
+        self.client.patch(
+            f"/api/properties/{self.property.pk}/", {"bedrooms": 3}, format="json"
+        )
+
+        self.client.get(f"/api/properties/{self.property.pk}/")
+        APIClient().get(f"/api/properties/{self.property.pk}/")
+
+        # Only the anonymous client used the replica
+        self.assertEqual(self.replica_blocks, [True])
+
+    def test_recompute_after_write_reads_primary(self):
+        """Test cached responses are rebuilt from the primary after a write."""
+        ResponseCache.bump(PROPERTIES_SCOPE)
+
+        self.client.get("/api/properties/")
+
+        # Replica block for the request, then a primary block for the rebuild
+        self.assertEqual(self.replica_blocks, [True, False])
+
+
+class StatementTimeoutTest(TestCase):
+    """Test cases for StatementTimeoutMixin."""
+
+    def setUp(self):
+        """Create a listing to compare."""
+        cache.clear()
+        self.client = APIClient()
+        self.property = Property.objects.create(  # type: ignore[attr-defined]
+            external_id="SLOW-1",
+            address="Slow Address",
+            price=Decimal("100000.00"),
+            size_sqm=Decimal("50.00"),
+            property_type="apartment",
+        )
+
+    def test_timeouts_configured_per_action(self):
+        """Test actions use their own budget or the default."""
+
+        def timeout(viewset, method, action):
+            view = viewset()
+            view.action_map = {method: action}
+            view.request = mock.Mock(method=method.upper())
+            return view.get_statement_timeout()
+
+        self.assertEqual(timeout(PropertyViewSet, "get", "list"), 3000)
+        self.assertEqual(timeout(PropertyViewSet, "get", "retrieve"), 5000)
+        self.assertEqual(timeout(RegionViewSet, "get", "list"), 1000)
+
+    def test_cancelled_query_returns_503_with_hint(self):
+        """Test a statement cancelled by the timeout maps to a clean 503."""
+
+        class QueryCanceled(Exception):
+            pgcode = "57014"
+
+        error = OperationalError("canceling statement due to statement timeout")
+        error.__cause__ = QueryCanceled()
+
+        with mock.patch(
+            "api.views.PropertyService.compare_to_region_average", side_effect=error
+        ):
+            response = self.client.get(
+                f"/api/properties/{self.property.pk}/compare_to_region/"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("2000 ms", response.data["hint"])
+
+    @contextmanager
+    def timeouts_on_default(self):
+        """Apply timeouts to the test database and record the ones set."""
+        applied = []
+        connection.ensure_connection()
+        connection.connection.create_function(
+            "set_config", 3, lambda name, value, local: applied.append(value)
+        )
+        with connection.execute_wrapper(
+            StatementTimeout.execute_wrapper
+        ), mock.patch.object(StatementTimeout, "reset") as reset:
+            yield applied, reset
+
+    def test_timeout_set_lazily_and_reset(self):
+        """Test the timeout is set on the first query only, then reset."""
+        with self.timeouts_on_default() as (applied, reset):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f"/api/properties/{self.property.pk}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(applied, ["5000"])
+        # The set_config call is not one of the request's queries
+        self.assertFalse(any("set_config" in q["sql"] for q in queries))
+        reset.assert_called_once_with(connection)
+
+    def test_timeout_covers_streamed_body(self):
+        """Test a streaming response keeps the timeout until it is closed."""
+        with self.timeouts_on_default() as (applied, reset):
+            response = self.client.get("/api/properties/export/")
+            # Rows are fetched while the body is sent
+            self.assertEqual(applied, [])
+            reset.assert_not_called()
+            # The test client closes the response once the body is read
+            body = b"".join(response.streaming_content)
+
+        self.assertIn(b"SLOW-1", body)
+        self.assertEqual(applied, ["5000"])
+        reset.assert_called_once_with(connection)
+
+    def test_unqueried_connection_is_not_reset(self):
+        """Test a request without queries leaves the connection alone."""
+        with self.timeouts_on_default() as (applied, reset):
+            with mock.patch.object(
+                PropertyViewSet, "compare_to_region", side_effect=ValueError
+            ):
+                with self.assertRaises(ValueError):
+                    self.client.get(
+                        f"/api/properties/{self.property.pk}/compare_to_region/"
+                    )
+
+        self.assertEqual(applied, [])
+        reset.assert_not_called()
+
+    def test_wrapper_is_installed_on_postgresql_only(self):
+        """Test other databases never get the timeout wrapper."""
+        StatementTimeout.install(connection=connection)
+
+        self.assertNotIn(StatementTimeout.execute_wrapper, connection.execute_wrappers)
+
+    def test_other_database_errors_propagate(self):
+        """Test unrelated database errors are not reported as timeouts."""
+        with mock.patch(
+            "api.views.PropertyService.compare_to_region_average",
+            side_effect=OperationalError("disk full"),
+        ):
+            with self.assertRaises(OperationalError):
+                self.client.get(
+                    f"/api/properties/{self.property.pk}/compare_to_region/"
+                )
+
+
+class ServerTimingTest(TestCase):
+    """Test cases for the Server-Timing middleware and DRF hooks."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.region = Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]  # noqa: E501
+        Property.objects.create(  # type: ignore[attr-defined]
+            external_id="TIMING-001",
+            address="Rua A, 1",
+            price=Decimal("250000.00"),
+            size_sqm=Decimal("80.00"),
+            property_type="apartment",
+            region=self.region,
+        )
+
+    @staticmethod
+    def parse(header):
+        metrics = {}
+        for metric in header.split(", "):
+            name, *params = metric.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+        return metrics
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """Test that unsampled requests get no Server-Timing header."""
+        response = self.client.get("/api/properties/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_breakdown_header(self):
+        """Test that a sampled list request reports each phase."""
+        with self.assertLogs("core.timing", level="INFO") as logs:
+            response = self.client.get("/api/properties/")
+
+        metrics = self.parse(response["Server-Timing"])
+        self.assertEqual(
+            set(metrics), {"db", "paginate", "serialize", "render", "total"}
+        )
+        self.assertRegex(metrics["db"]["desc"], r'^"[1-9]\d* queries"$')
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["render"]["dur"])
+        )
+
+        record = logs.records[0]
+        self.assertEqual(record.path, "/api/properties/")
+        self.assertEqual(record.status_code, 200)
+        self.assertGreater(record.db_queries, 0)
+        self.assertIn("serialize_ms", record.__dict__)
+
+    def test_nested_phases_counted_once(self):
+        """Test that nested blocks of a phase are not double counted."""
+        timing = RequestTiming()
+        with request_timing(timing):
+            with timed("serialize"):
+                with timed("serialize"):
+                    time.sleep(0.02)
+
+        self.assertGreaterEqual(timing.phases["serialize"], 0.02)
+        self.assertLess(timing.phases["serialize"], 0.04)
+
+    def test_phase_excludes_queries(self):
+        """Test that queries run inside a phase count as db time only."""
+        timing = RequestTiming()
+        with request_timing(timing), connection.execute_wrapper(timing.execute_wrapper):
+            with timed("serialize"):
+                list(Region.objects.all())  # type: ignore[attr-defined]
+
+        self.assertEqual(timing.queries, 1)
+        self.assertLess(timing.phases["serialize"], timing.total())
+        self.assertAlmostEqual(
+            timing.phases["serialize"] + timing.phases["db"],
+            timing.total(),
+            delta=0.01,
+        )
+
+
+class MetricsTest(TestCase):
+    """Test cases for the Prometheus metrics endpoint."""
+
+    def setUp(self):
+        """Set up test client and data."""
+        cache.clear()
+        self.client = APIClient()
+        Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]
+
+    @staticmethod
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint(self):
+        """Test that /metrics serves the text exposition format."""
+        self.client.get("/api/regions/")
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("atlas_http_request_duration_seconds_bucket", body)
+        self.assertIn('route="region-list"', body)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        """Test that a configured token is required."""
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metrics_closed_without_token(self):
+        """Test that metrics need a token outside DEBUG."""
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+    def test_request_latency_and_queries(self):
+        """Test that requests are observed per route with their queries."""
+        labels = {"route": "region-list", "method": "GET"}
+        latency_before = self.sample(
+            "atlas_http_request_duration_seconds_count", status="200", **labels
+        )
+        queries_before = self.sample("atlas_http_request_db_queries_sum", **labels)
+
+        self.client.get("/api/regions/")
+
+        self.assertEqual(
+            self.sample(
+                "atlas_http_request_duration_seconds_count", status="200", **labels
+            ),
+            latency_before + 1,
+        )
+        self.assertGreater(
+            self.sample("atlas_http_request_db_queries_sum", **labels), queries_before
+        )
+
+    def test_query_counter_installed_once(self):
+        """Test that requests count queries without adding wrappers."""
+        self.client.get("/api/regions/")
+        wrappers = list(connection.execute_wrappers)
+
+        self.client.get("/api/regions/")
+
+        self.assertEqual(connection.execute_wrappers, wrappers)
+        self.assertEqual(wrappers.count(QueryCounter.execute_wrapper), 1)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        """Test that disabled metrics skip the middleware and the wrapper."""
+        labels = {"route": "region-list", "method": "GET", "status": "200"}
+        before = self.sample("atlas_http_request_duration_seconds_count", **labels)
+        new_connection = mock.Mock(execute_wrappers=[])
+
+        self.client.get("/api/regions/")
+        QueryCounter.install(connection=new_connection)
+
+        self.assertEqual(
+            self.sample("atlas_http_request_duration_seconds_count", **labels), before
+        )
+        self.assertEqual(new_connection.execute_wrappers, [])
+
+    def test_response_cache_hits_and_misses(self):
+        """Test that response cache lookups are counted by result."""
+        hits = self.sample("atlas_cache_requests_total", cache="response", result="hit")
+        misses = self.sample(
+            "atlas_cache_requests_total", cache="response", result="miss"
+        )
+
+        self.client.get("/api/regions/")
+        self.client.get("/api/regions/")
+
+        self.assertEqual(
+            self.sample("atlas_cache_requests_total", cache="response", result="miss"),
+            misses + 1,
+        )
+        self.assertEqual(
+            self.sample("atlas_cache_requests_total", cache="response", result="hit"),
+            hits + 1,
+        )
+
+    def test_multiprocess_aggregation(self):
+        """Test that samples written by several processes are summed."""
+        script = (
+            "from core.metrics import INGESTED_ROWS; "
+            "INGESTED_ROWS.labels(outcome='upserted').inc(5)"
+        )
+        with tempfile.TemporaryDirectory() as path:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": path}
+            for _ in range(2):
+                subprocess.run(
+                    [sys.executable, "-c", script], env=env, check=True, timeout=60
+                )
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": path}):
+                registry = get_registry()
+
+            self.assertEqual(
+                registry.get_sample_value(
+                    "atlas_ingestion_rows_total", {"outcome": "upserted"}
+                ),
+                10,
+            )
+
+
+@override_settings(PROFILING_INTERVAL_MS=1)
+class ProfilingTest(TestCase):
+    """Test cases for on-demand request profiling."""
+
+    def setUp(self):
+        """Set up test client and data."""
+        cache.clear()
+        self.client = APIClient()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass", is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username="user", email="user@example.com", password="pass"
+        )
+        Region.objects.create(name="Lisbon", code="LIS")  # type: ignore[attr-defined]
+
+    def test_unprofiled_request(self):
+        """Test that requests without X-Profile carry no profile."""
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/regions/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_staff_profile(self):
+        """Test that a staff request is profiled and downloadable."""
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            "/api/properties/price_range/?min_price=0&max_price=1000000",
+            HTTP_X_PROFILE="1",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response["X-Profile-Id"]
+        self.assertTrue(response["X-Profile-URL"].endswith(f"/profiles/{profile_id}"))
+
+        download = self.client.get(f"/profiles/{profile_id}")
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertIn("attachment", download["Content-Disposition"])
+        for line in download.content.decode().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertIn(":", stack)
+            self.assertGreater(int(count), 0)
+
+    def test_streaming_profile_covers_body(self):
+        """Test that a streaming response is sampled until its body is sent."""
+        self.client.force_login(self.staff)
+        with mock.patch.object(
+            Sampler, "stop", autospec=True, side_effect=Sampler.stop
+        ) as stop:
+            response = self.client.get("/api/properties/export/", HTTP_X_PROFILE="1")
+            profile_id = response["X-Profile-Id"]
+            stop.assert_not_called()
+            self.assertEqual(
+                self.client.get(f"/profiles/{profile_id}").status_code, 404
+            )
+
+            b"".join(response.streaming_content)
+
+        stop.assert_called_once()
+        download = self.client.get(f"/profiles/{profile_id}")
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+
+    def test_non_staff_ignored(self):
+        """Test that X-Profile from a regular user is ignored."""
+        self.client.force_login(self.user)
+        response = self.client.get("/api/regions/", HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_jwt_staff_profile(self):
+        """Test that staff authenticated with a JWT can profile."""
+        token = self.client.post(
+            "/api/auth/jwt/create/", {"email": "staff@example.com", "password": "pass"}
+        ).data["access"]
+        response = self.client.get(
+            "/api/regions/", HTTP_X_PROFILE="1", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertIn("X-Profile-Id", response)
+
+    def test_signed_token(self):
+        """Test that a signed token profiles anonymous requests."""
+        token = make_token()
+        response = self.client.get("/api/regions/", HTTP_X_PROFILE=token)
+        profile_id = response["X-Profile-Id"]
+
+        self.assertEqual(self.client.get(f"/profiles/{profile_id}").status_code, 403)
+        download = self.client.get(f"/profiles/{profile_id}", HTTP_X_PROFILE=token)
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+
+        forged = self.client.get("/api/regions/", HTTP_X_PROFILE=token + "x")
+        self.assertNotIn("X-Profile-Id", forged)
+
+    def test_unknown_profile(self):
+        """Test that expired or unknown profiles are not found."""
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get("/profiles/missing").status_code, 404)
+
+    def test_sampler_collapsed_stacks(self):
+        """Test that the sampler aggregates the sampled thread's stacks."""
+        done = threading.Event()
+
+        def busy_wait():
+            while not done.is_set():
+                time.sleep(0.001)
+
+        worker = threading.Thread(target=busy_wait)
+        worker.start()
+        sampler = Sampler(worker.ident, 0.001)
+        sampler.start()
+        time.sleep(0.05)
+        sampler.stop()
+        done.set()
+        worker.join()
+
+        collapsed = sampler.collapsed()
+        self.assertIn(f"{__name__}:busy_wait", collapsed)
+        self.assertTrue(collapsed.splitlines()[0].startswith("threading:_bootstrap"))
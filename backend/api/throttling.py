@@ -0,0 +1,152 @@
+"""
+Cost-weighted token-bucket throttling for the API.
+
+Each client (user id, or IP for anonymous requests) owns a bucket of
+``CAPACITY`` tokens refilled at ``REFILL_RATE`` tokens per second. A request
+spends as many tokens as its action costs, so one expensive search or
+comparison counts as several cheap detail reads. Bursts up to the capacity
+are allowed; sustained scraping is held to the refill rate.
+
+With a Redis cache the bucket lives in Redis and is updated by a Lua script,
+which is atomic across every worker and uses the Redis clock. Other cache
+backends (development, tests) fall back to a per-process bucket.
+"""
+
+import math
+import threading
+import time
+from typing import Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+from .utils.lru import LRUCache
+
+BUCKET_KEY = "throttle:bucket:{ident}"
+
+# KEYS[1]: bucket hash; ARGV: capacity, refill rate (tokens/s), cost.
+# Returns {allowed (0/1), seconds to wait as a string}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  wait = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(wait)}
+"""
+
+
+def get_bucket_settings() -> Tuple[float, float]:
+    """Return ``(capacity, refill rate)`` from ``TOKEN_BUCKET_THROTTLE``."""
+    config = getattr(settings, "TOKEN_BUCKET_THROTTLE", {})
+    return float(config.get("CAPACITY", 300)), float(config.get("REFILL_RATE", 5))
+
+
+class LocalTokenBuckets:
+    """Per-process token buckets for caches without Lua scripting."""
+
+    _lock = threading.Lock()
+    _buckets = LRUCache(maxsize=10_000)
+
+    @classmethod
+    def consume(
+        cls, key: str, capacity: float, rate: float, cost: float
+    ) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with cls._lock:
+            tokens, ts = cls._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            if tokens >= cost:
+                cls._buckets.set(key, (tokens - cost, now))
+                return True, 0.0
+            cls._buckets.set(key, (tokens, now))
+            return False, (cost - tokens) / rate
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._buckets.clear()
+
+
+class RedisTokenBuckets:
+    """Token buckets updated atomically by ``TOKEN_BUCKET_LUA``."""
+
+    _script = None
+
+    @classmethod
+    def consume(
+        cls, backend: RedisCache, key: str, capacity: float, rate: float, cost: float
+    ) -> Tuple[bool, float]:
+        client = backend._cache.get_client(write=True)
+        if cls._script is None:
+            # The script object caches its SHA and falls back to EVAL on
+            # NOSCRIPT; each call runs on the client passed to it
+            cls._script = client.register_script(TOKEN_BUCKET_LUA)
+        script = cls._script
+        allowed, wait = script(
+            keys=[backend.make_key(key)], args=[capacity, rate, cost], client=client
+        )
+        return bool(int(allowed)), float(wait)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle spending ``view.get_throttle_cost(request)`` tokens per request.
+
+    Views without that hook cost one token per request. A cost of zero
+    bypasses the bucket entirely.
+    """
+
+    def __init__(self):
+        self.wait_seconds = 0.0
+
+    def get_bucket_ident(self, request) -> str:
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view) -> bool:
+        get_cost = getattr(view, "get_throttle_cost", None)
+        cost = get_cost(request) if get_cost is not None else 1
+        if cost <= 0:
+            return True
+
+        capacity, rate = get_bucket_settings()
+        # A request costing more than the burst size could never pass
+        cost = min(cost, capacity)
+        key = BUCKET_KEY.format(ident=self.get_bucket_ident(request))
+        backend = caches["default"]
+        if isinstance(backend, RedisCache):
+            allowed, wait = RedisTokenBuckets.consume(
+                backend, key, capacity, rate, cost
+            )
+        else:
+            allowed, wait = LocalTokenBuckets.consume(key, capacity, rate, cost)
+
+        self.wait_seconds = wait
+        return allowed
+
+    def wait(self) -> Optional[float]:
+        """Seconds until enough tokens have refilled; sent as Retry-After."""
+        return math.ceil(self.wait_seconds) if self.wait_seconds else None
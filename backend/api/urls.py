@@ -4,9 +4,16 @@ from . import views
 
 router = DefaultRouter()
 router.register(r"properties", views.PropertyViewSet, basename="property")
+router.register(
+    r"archived-properties",
+    views.ArchivedPropertyViewSet,
+    basename="archived-property",
+)
 router.register(r"regions", views.RegionViewSet, basename="region")
 
 urlpatterns = [
     path("health/", views.health_check, name="health-check"),
+    path("health/live/", views.liveness, name="health-live"),
+    path("health/ready/", views.readiness, name="health-ready"),
     path("", include(router.urls)),
 ]
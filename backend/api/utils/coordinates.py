@@ -2,16 +2,8 @@
 Coordinate utility functions.
 """
 
-from typing import Optional, List
-
-# Try to import PostGIS Point, fallback if not available
-try:
-    from django.contrib.gis.geos import Point
-
-    HAS_POSTGIS = True
-except (ImportError, Exception):
-    HAS_POSTGIS = False
-    Point = None  # type: ignore[assignment, misc]
+from typing import Any, Optional, List
+from core.gis import get_point_class
 
 
 def normalize_coordinates(coordinates) -> Optional[List[float]]:
@@ -37,13 +29,14 @@ def normalize_coordinates(coordinates) -> Optional[List[float]]:
 
 def create_point_from_coordinates(
     coordinates: Optional[List[float]], srid: int = 4326
-) -> Optional[Point]:  # type: ignore[valid-type]
+) -> Optional[Any]:
     """
     Create a PostGIS Point from [longitude, latitude] coordinates.
 
     Returns None if PostGIS is not available or coordinates is None.
     """
-    if not HAS_POSTGIS or Point is None:
+    Point = get_point_class()
+    if Point is None:
         return None
 
     if coordinates is None:
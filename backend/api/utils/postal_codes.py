@@ -0,0 +1,33 @@
+"""
+Portuguese postal code utility functions.
+
+Portuguese postal codes have the form ``CP4-CP3`` (e.g. ``1100-053``), where
+the four-digit CP4 identifies the delivery area and CP3 the street segment.
+"""
+
+import re
+from typing import Optional
+
+POSTAL_CODE_RE = re.compile(r"(?<!\d)(\d{4})\s*[-‐–]\s*(\d{3})(?!\d)")
+
+
+def extract_postal_code(text: Optional[str]) -> Optional[str]:
+    """
+    Extract the first ``CP4-CP3`` postal code from free text.
+
+    Returns the code in canonical ``NNNN-NNN`` form, or None if absent.
+    """
+    if not text:
+        return None
+
+    match = POSTAL_CODE_RE.search(text)
+    if match is None:
+        return None
+    return f"{match.group(1)}-{match.group(2)}"
+
+
+def postal_code_prefix(postal_code: Optional[str]) -> Optional[str]:
+    """Return the CP4 part of a canonical postal code."""
+    if not postal_code or len(postal_code) < 4:
+        return None
+    return postal_code[:4]
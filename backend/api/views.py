@@ -1,13 +1,49 @@
+import csv
 from decimal import Decimal, InvalidOperation
-from rest_framework.decorators import api_view, action
+from typing import Optional
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from rest_framework.decorators import action, api_view, authentication_classes
 from rest_framework.response import Response
 from rest_framework import viewsets, filters, status
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Property, Region
-from .serializers.property_serializers import PropertySerializer, RegionSerializer
+from core.db_routers import (
+    is_pinned,
+    pin_to_primary,
+    replica_configured,
+    replica_reads,
+)
+from core.middleware import ClosingIterator
+from core.query_budget import OFF, get_mode, query_budget
+from core.timing import timed
+from .exceptions import QueryTimeout, is_statement_timeout
+from .filters import PropertyFilter, PropertySearchFilter
+from .models import ArchivedProperty, Property, Region
+from .serializers.property_serializers import (
+    ArchivedPropertyListSerializer,
+    ArchivedPropertySerializer,
+    PropertyListSerializer,
+    PropertySerializer,
+    RegionSerializer,
+)
+from .services.cache_warming import (
+    WARMING_HEADER,
+    QueryShapeLog,
+    is_warming_request,
+)
+from .services.fragment_cache import PropertyFragmentCache
+from .services.health import HealthProbes
 from .services.property_service import PropertyService
+from .services.region_cache import REGIONS_SCOPE, RegionCache
+from .services.response_cache import PROPERTIES_SCOPE, ResponseCache
+from .services.statement_timeout import StatementTimeout
 from .permissions import IsAuthenticatedOrReadOnly as CustomIsAuthenticatedOrReadOnly
+from .throttling import TokenBucketThrottle
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -18,6 +54,198 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class Echo:
+    """File-like object returning what is written, for streaming ``csv``."""
+
+    def write(self, value):
+        return value
+
+
+class StatementTimeoutMixin:
+    """
+    Cap the database time of each request by action.
+
+    On PostgreSQL the first query the request sends to each database alias
+    sets ``statement_timeout`` (see ``services.statement_timeout``), so a
+    runaway query is cancelled by the server; the cancellation is returned
+    as a 503 with a hint. The timeout also covers the queries that produce
+    a streaming body and is reset once the response is closed.
+    ``statement_timeouts`` maps actions to milliseconds, other actions use
+    ``API_STATEMENT_TIMEOUT_MS``, and 0 disables the budget.
+    """
+
+    statement_timeouts: dict = {}
+
+    def get_statement_timeout(self) -> int:
+        action = self.action_map.get(self.request.method.lower())  # type: ignore[attr-defined]  # noqa: E501
+        return self.statement_timeouts.get(
+            action, getattr(settings, "API_STATEMENT_TIMEOUT_MS", 5000)
+        )
+
+    @staticmethod
+    def statement_timeout_aliases():
+        return [
+            alias for alias in connections if connections[alias].vendor == "postgresql"
+        ]
+
+    def dispatch(self, request, *args, **kwargs):
+        # self.request is normally set inside dispatch; the action is needed
+        # before DRF initializes the request
+        self.request = request
+        self._statement_timeout = self.get_statement_timeout()
+        if not self._statement_timeout:
+            return super().dispatch(request, *args, **kwargs)
+
+        timeout = StatementTimeout(self._statement_timeout)
+        timeout.start()
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            timeout.finish()
+            raise
+        if response.streaming:
+            # Django closes the body iterator once the response is sent
+            response.streaming_content = ClosingIterator(
+                response.streaming_content, timeout.finish
+            )
+        else:
+            timeout.finish()
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, DatabaseError) and is_statement_timeout(exc):
+            # The transaction is aborted; make the wrapping blocks roll back
+            for alias in self.statement_timeout_aliases():
+                if connections[alias].in_atomic_block:
+                    transaction.set_rollback(True, using=alias)
+            exc = QueryTimeout(self._statement_timeout)
+        return super().handle_exception(exc)
+
+
+class QueryBudgetMixin:
+    """
+    Declare per-action upper bounds on the queries of a request.
+
+    ``query_budgets`` maps actions to a query count that must hold at any
+    page size; actions without a budget are still checked for duplicated
+    (N+1) queries. ``QUERY_BUDGET_MODE`` decides whether a violation raises
+    or logs a warning (see ``core.query_budget``).
+    """
+
+    query_budgets: dict = {}
+
+    def get_query_budget(self) -> Optional[int]:
+        action = self.action_map.get(self.request.method.lower())  # type: ignore[attr-defined]  # noqa: E501
+        return self.query_budgets.get(action)
+
+    def dispatch(self, request, *args, **kwargs):
+        if get_mode() == OFF:
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+        self.request = request
+        label = f"{type(self).__name__} {request.method} {request.path}"
+        with query_budget(self.get_query_budget(), label):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests from the read replica, if one is configured.
+
+    After a successful write the client (user, or IP when anonymous) is
+    pinned to the primary for ``REPLICA_PIN_SECONDS`` so it reads its own
+    writes despite replication lag.
+    """
+
+    _replica_block = None
+
+    def replica_ident(self, request) -> str:
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{BaseThrottle().get_ident(request)}"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and replica_configured()
+            and not is_pinned(self.replica_ident(request))
+        ):
+            self._replica_block = replica_reads()
+            self._replica_block.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._replica_block is not None:
+            self._replica_block.__exit__(None, None, None)
+            self._replica_block = None
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and replica_configured()
+        ):
+            pin_to_primary(self.replica_ident(request))
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    """
+    Serve read actions through the single-flight ``ResponseCache``.
+
+    Actions listed in ``cached_actions`` wrap their body in
+    ``cached_response``; the key is the request path plus its normalized
+    query string, and ``response_generation`` decides when it goes stale.
+    A sample of these keys is logged for post-deploy cache warming.
+    """
+
+    cached_actions: tuple = ()
+    # Write scopes the cached data depends on; right after a write to one of
+    # them, recomputation reads the primary so lagging replica data is never
+    # cached under the new generation
+    response_scopes: tuple = ()
+
+    def response_generation(self) -> str:
+        """Combine the ``ResponseCache`` generations of ``response_scopes``."""
+        return ":".join(
+            ResponseCache.generation(scope) for scope in self.response_scopes
+        )
+
+    def cached_response(self, compute):
+        """Return ``compute()`` or its cached data for the current request."""
+        request = self.request
+        if request.method != "GET" or self.action not in self.cached_actions:
+            return compute()
+
+        params = [
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        ]
+        url = request.build_absolute_uri(request.path)
+        digest = ResponseCache.make_digest(url, params)
+        if WARMING_HEADER not in request.META:
+            QueryShapeLog.record(url, params)
+
+        computed = {}
+        primary_only = replica_configured() and any(
+            is_pinned(f"scope:{scope}") for scope in self.response_scopes
+        )
+
+        def compute_data():
+            if primary_only:
+                with replica_reads(False):
+                    response = computed["response"] = compute()
+            else:
+                response = computed["response"] = compute()
+            return response.data, response.status_code == status.HTTP_200_OK
+
+        data = ResponseCache.get_or_compute(
+            self.basename, digest, self.response_generation(), compute_data
+        )
+        # Responses computed here (including uncacheable errors) pass through
+        if "response" in computed:
+            return computed["response"]
+        return Response(data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 def health_check(request):
     """Health check endpoint for testing."""
@@ -30,23 +258,180 @@ def health_check(request):
     )
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+@api_view(["GET"])
+@authentication_classes([])
+def liveness(request):
+    """Liveness probe: the process serves requests; no dependencies checked."""
+    return Response({"status": "alive"})
+
+
+@api_view(["GET"])
+@authentication_classes([])
+def readiness(request):
+    """
+    Readiness probe: database, cache and broker answer within thresholds.
+
+    Responds 503 with per-dependency latencies when any of them is down or
+    slower than allowed, so the load balancer stops routing here.
+    """
+    result = HealthProbes.readiness()
+    ready = result["status"] == "ready"
+    return Response(
+        result,
+        status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+class PropertyViewSet(
+    StatementTimeoutMixin,
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet for Property model."""
 
     queryset = Property.objects.all()  # type: ignore[attr-defined]
     serializer_class = PropertySerializer
     permission_classes = [CustomIsAuthenticatedOrReadOnly]
+    throttle_classes = [TokenBucketThrottle]
     pagination_class = StandardResultsSetPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        PropertySearchFilter,
         filters.OrderingFilter,
     ]
-    filterset_fields = ["property_type", "region"]
+    filterset_class = PropertyFilter
     search_fields = ["address"]
     ordering_fields = ["price", "size_sqm", "created_at"]
     ordering = ["-created_at"]
 
+    # Actions that render many rows and skip the PropertyPayload side table
+    list_actions = ("list", "price_range", "export")
+
+    # Multi-row actions only return listings with this status unless
+    # ``?listing_status=`` names another one, or ``all``. Sold and withdrawn
+    # listings stay in the table until the archive job moves them.
+    default_listing_status = "active"
+    cached_actions = ("list", "price_range", "compare_to_region")
+    response_scopes = (PROPERTIES_SCOPE, REGIONS_SCOPE)
+
+    # Token bucket cost per action (others cost 1); searches and pages past
+    # ``throttle_deep_page`` cost extra since they scan far more rows
+    throttle_costs = {
+        "price_range": 3,
+        "compare_to_region": 3,
+        "postal_codes": 2,
+        "export": 20,
+    }
+    throttle_search_cost = 2
+    throttle_deep_page = 10
+
+    # Query time budgets in ms; detail reads and writes use the default
+    statement_timeouts = {
+        "list": 3000,
+        "price_range": 3000,
+        "compare_to_region": 2000,
+        "postal_codes": 2000,
+    }
+
+    # Queries per request at any page size, including one for a cold
+    # region snapshot (list: count, page ids, rows of fragment cache misses)
+    query_budgets = {
+        "list": 4,
+        "price_range": 4,
+        "retrieve": 2,
+        "compare_to_region": 2,
+        "postal_codes": 1,
+        # Rows are read while the response streams, after the view returns
+        "export": 0,
+    }
+
+    # Columns of the CSV export read with values_list(); the region code and
+    # coordinates are appended
+    export_fields = (
+        "id",
+        "external_id",
+        "address",
+        "postal_code",
+        "price",
+        "size_sqm",
+        "property_type",
+        "bedrooms",
+        "bathrooms",
+        "year_built",
+        "condition",
+        "energy_rating",
+        "listing_status",
+        "region_id",
+        "created_at",
+        "updated_at",
+    )
+
+    def get_queryset(self):
+        """Join the payload only where the detail serializer needs it."""
+        queryset = super().get_queryset()
+        if self.action in self.list_actions:
+            return self.filter_listing_status(queryset)
+        return queryset.select_related("payload")
+
+    def filter_listing_status(self, queryset):
+        """Apply the requested listing status, ``active`` unless asked."""
+        listing_status = self.request.query_params.get(
+            "listing_status", self.default_listing_status
+        )
+        if listing_status == "all":
+            return queryset
+        return queryset.filter(listing_status=listing_status)
+
+    def get_serializer_class(self):
+        """Use the narrow list serializer for multi-row actions."""
+        if self.action in self.list_actions:
+            return PropertyListSerializer
+        return super().get_serializer_class()
+
+    def get_throttle_cost(self, request) -> int:
+        """Return how many throttle tokens this request spends."""
+        if is_warming_request(request):
+            # Warm-up replays must neither spend real tokens nor be refused
+            return 0
+        cost = self.throttle_costs.get(self.action, 1)
+        if request.query_params.get("search"):
+            cost += self.throttle_search_cost
+        page = request.query_params.get("page", "")
+        if page.isdigit() and int(page) > self.throttle_deep_page:
+            cost *= 2
+        return cost
+
+    def response_generation(self) -> str:
+        """Listings embed regions, so either changing invalidates responses."""
+        return f"{ResponseCache.generation(PROPERTIES_SCOPE)}:{RegionCache.version()}"
+
+    def list_response(self, queryset):
+        """
+        Paginate ``queryset`` and hydrate the page from the fragment cache.
+
+        Only ``(id, updated_at)`` pairs are read for the page itself; full
+        rows are loaded and serialized for cache misses only.
+        """
+        with timed("paginate"):
+            page = self.paginate_queryset(queryset.values_list("id", "updated_at"))
+        if page is None:
+            # Fallback if pagination is not configured (should not happen)
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        data = PropertyFragmentCache.hydrate(
+            page, self.get_serializer_class(), self.get_serializer_context()
+        )
+        return self.get_paginated_response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            lambda: self.list_response(self.filter_queryset(self.get_queryset()))
+        )
+
     @action(detail=True, methods=["get"])
     def compare_to_region(self, request, pk=None):
         """
@@ -54,9 +439,70 @@ class PropertyViewSet(viewsets.ModelViewSet):
 
         Returns comparison data including price per sqm differences.
         """
-        property_obj = self.get_object()
-        comparison = PropertyService.compare_to_region_average(property_obj)
-        return Response(comparison, status=status.HTTP_200_OK)
+
+        def compute():
+            property_obj = self.get_object()
+            comparison = PropertyService.compare_to_region_average(property_obj)
+            return Response(comparison, status=status.HTTP_200_OK)
+
+        return self.cached_response(compute)
+
+    @action(detail=False, methods=["get"])
+    def postal_codes(self, request):
+        """
+        List postal codes within a CP4 area with their listing counts.
+
+        Query parameters:
+        - prefix: CP4 area, e.g. 1250
+        """
+        prefix = (request.query_params.get("prefix") or "").strip()
+        if len(prefix) != 4 or not prefix.isdigit():
+            return Response(
+                {"error": "prefix must be a 4-digit CP4 code"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        codes = (
+            Property.objects.filter(  # type: ignore[attr-defined]
+                postal_code_prefix=prefix
+            )
+            .values("postal_code")
+            .annotate(count=Count("id"))
+            .order_by("postal_code")
+        )
+        return Response(list(codes), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream the filtered listings as CSV.
+
+        Accepts the list filters, search and ordering. Rows are fetched
+        ``EXPORT_CHUNK_SIZE`` at a time and written as they arrive, so
+        memory stays flat however many listings match.
+        """
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*self.export_fields, "coordinates")
+            .iterator(chunk_size=getattr(settings, "EXPORT_CHUNK_SIZE", 2000))
+        )
+        region_column = self.export_fields.index("region_id")
+        writer = csv.writer(Echo())
+
+        def stream():
+            yield writer.writerow(
+                [*self.export_fields, "region_code", "longitude", "latitude"]
+            )
+            for *values, coordinates in rows:
+                region = RegionCache.get(values[region_column])
+                longitude, latitude = (coordinates or [None, None])[:2]
+                yield writer.writerow(
+                    [*values, region.code if region else "", longitude, latitude]
+                )
+
+        response = StreamingHttpResponse(stream(), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="properties.csv"'
+        return response
 
     @action(detail=False, methods=["get"])
     def price_range(self, request):
@@ -67,6 +513,9 @@ class PropertyViewSet(viewsets.ModelViewSet):
         - min_price: Minimum price
         - max_price: Maximum price
         """
+        return self.cached_response(lambda: self.price_range_response(request))
+
+    def price_range_response(self, request):
         min_price = request.query_params.get("min_price")
         max_price = request.query_params.get("max_price")
 
@@ -88,19 +537,54 @@ class PropertyViewSet(viewsets.ModelViewSet):
             )
 
         queryset = PropertyService.get_properties_in_price_range(min_price, max_price)
+        return self.list_response(self.filter_listing_status(queryset))
 
-        # Apply pagination to the queryset
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
 
-        # Fallback if pagination is not configured (should not happen)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+class ArchivedPropertyViewSet(QueryBudgetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for archived (sold/withdrawn) listings (read-only).
 
+    PropertyViewSet only reads the hot table; history is queried here
+    explicitly, looked up by the listing's original property id. List pages
+    leave out the compressed ``data`` blob, which only detail reads return.
+    """
 
-class RegionViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ArchivedProperty.objects.all()  # type: ignore[attr-defined]
+    serializer_class = ArchivedPropertySerializer
+    pagination_class = StandardResultsSetPagination
+    lookup_field = "original_id"
+    filter_backends = [
+        DjangoFilterBackend,
+        filters.SearchFilter,
+        filters.OrderingFilter,
+    ]
+    filterset_fields = ["listing_status", "property_type", "region", "external_id"]
+    search_fields = ["address"]
+    ordering_fields = ["price", "size_sqm", "archived_at"]
+    ordering = ["-archived_at"]
+    query_budgets = {"list": 2, "retrieve": 1}
+
+    def get_queryset(self):
+        """Skip loading the ``data`` blob for list pages."""
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = queryset.defer("data")
+        return queryset
+
+    def get_serializer_class(self):
+        """Use the slim list serializer for list pages."""
+        if self.action == "list":
+            return ArchivedPropertyListSerializer
+        return super().get_serializer_class()
+
+
+class RegionViewSet(
+    StatementTimeoutMixin,
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """ViewSet for Region model (read-only)."""
 
     queryset = Region.objects.all()  # type: ignore[attr-defined]
@@ -113,3 +597,18 @@ class RegionViewSet(viewsets.ReadOnlyModelViewSet):
     ]
     search_fields = ["name", "code"]
     ordering = ["name"]
+    cached_actions = ("list", "retrieve")
+    response_scopes = (REGIONS_SCOPE,)
+    statement_timeouts = {"list": 1000, "retrieve": 1000}
+    query_budgets = {"list": 2, "retrieve": 1}
+
+    def response_generation(self) -> str:
+        return RegionCache.version()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(lambda: super(RegionViewSet, self).list(request))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            lambda: super(RegionViewSet, self).retrieve(request, *args, **kwargs)
+        )
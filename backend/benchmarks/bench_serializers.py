@@ -0,0 +1,35 @@
+"""
+Serializer benchmarks.
+
+Listings are unsaved instances built by ``SyntheticData.properties``, so the
+numbers cover serialization only; regions resolve through ``RegionCache``.
+"""
+
+import pytest
+from api.serializers.property_serializers import (
+    PropertyListSerializer,
+    PropertySerializer,
+)
+from api.services.synthetic_data import SyntheticData
+
+
+@pytest.fixture
+def listings(dataset, request):
+    return SyntheticData.properties(request.param, regions=dataset)
+
+
+@pytest.mark.parametrize("listings", [1], indirect=True)
+def bench_property_serializer_single(benchmark, listings):
+    data = benchmark(lambda: PropertySerializer(listings[0]).data)
+    assert data["external_id"] == listings[0].external_id
+
+
+@pytest.mark.parametrize("listings", [100, 10_000], indirect=True)
+@pytest.mark.parametrize(
+    "serializer_class",
+    [PropertySerializer, PropertyListSerializer],
+    ids=["detail_fields", "list_fields"],
+)
+def bench_property_serializer_many(benchmark, listings, serializer_class):
+    data = benchmark(lambda: serializer_class(listings, many=True).data)
+    assert len(data) == len(listings)
@@ -0,0 +1,29 @@
+"""
+Service-layer benchmarks.
+"""
+
+import pytest
+from api.services.property_service import PropertyService
+from api.utils.coordinates import normalize_coordinates
+
+
+class Point:
+    """Stand-in for a PostGIS point."""
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+@pytest.mark.parametrize(
+    "coordinates",
+    [[-9.1393, 38.7223], (-9.1393, 38.7223), Point(-9.1393, 38.7223), None],
+    ids=["list", "tuple", "point", "none"],
+)
+def bench_normalize_coordinates(benchmark, coordinates):
+    benchmark(normalize_coordinates, coordinates)
+
+
+def bench_compare_to_region_average(benchmark, listing):
+    result = benchmark(PropertyService.compare_to_region_average, listing)
+    assert "region_avg_price_per_sqm" in result
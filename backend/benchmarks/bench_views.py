@@ -0,0 +1,80 @@
+"""
+End-to-end ``PropertyViewSet`` benchmarks through the test client.
+
+Each action is measured on a cold cache (``cold``, every round misses the
+response cache) and a warm one (``warm``, cached responses).
+"""
+
+import pytest
+
+ROUNDS = 50
+
+
+def get(client, url, params=None):
+    response = client.get(url, params or {})
+    assert response.status_code == 200, response.status_code
+    return response
+
+
+@pytest.fixture(params=["cold", "warm"])
+def cache_state(request, cold_cache):
+    """``benchmark.pedantic`` setup for the cache state under test."""
+    return cold_cache if request.param == "cold" else None
+
+
+@pytest.mark.parametrize("page_size", [20, 100])
+def bench_list(benchmark, client, dataset, cache_state, page_size):
+    benchmark.pedantic(
+        get,
+        args=(client, "/api/properties/", {"page_size": page_size}),
+        setup=cache_state,
+        rounds=ROUNDS,
+        warmup_rounds=1,
+    )
+
+
+def bench_search(benchmark, client, dataset, cache_state):
+    benchmark.pedantic(
+        get,
+        args=(client, "/api/properties/", {"search": "Rua das Flores"}),
+        setup=cache_state,
+        rounds=ROUNDS,
+        warmup_rounds=1,
+    )
+
+
+def bench_list_filtered(benchmark, client, dataset, cache_state):
+    params = {
+        "region": dataset["LIS"].pk,
+        "property_type": "apartment",
+        "ordering": "-price",
+    }
+    benchmark.pedantic(
+        get,
+        args=(client, "/api/properties/", params),
+        setup=cache_state,
+        rounds=ROUNDS,
+        warmup_rounds=1,
+    )
+
+
+def bench_price_range(benchmark, client, dataset, cache_state):
+    params = {"min_price": 200000, "max_price": 600000, "page_size": 100}
+    benchmark.pedantic(
+        get,
+        args=(client, "/api/properties/price_range/", params),
+        setup=cache_state,
+        rounds=ROUNDS,
+        warmup_rounds=1,
+    )
+
+
+def bench_compare_to_region(benchmark, client, listing, cache_state):
+    response = benchmark.pedantic(
+        get,
+        args=(client, f"/api/properties/{listing.pk}/compare_to_region/"),
+        setup=cache_state,
+        rounds=ROUNDS,
+        warmup_rounds=1,
+    )
+    assert "region_avg_price_per_sqm" in response.json()
@@ -0,0 +1,80 @@
+"""
+Benchmark fixtures.
+
+The session database is filled once with a synthetic dataset of
+``--dataset-size`` listings (seeded by ``--dataset-seed``) before any
+benchmark runs. Query budgets, slow-query capture, Server-Timing sampling
+and throttling are switched off so they do not show up in the numbers.
+"""
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from api.models import Property
+from api.services.synthetic_data import SyntheticData
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("atlas", "Atlas benchmarks")
+    group.addoption(
+        "--dataset-size",
+        type=int,
+        default=2000,
+        help="Listings generated for view and service benchmarks",
+    )
+    group.addoption(
+        "--dataset-seed",
+        type=int,
+        default=0,
+        help="Seed of the generated dataset",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def benchmark_settings():
+    settings.QUERY_BUDGET_MODE = "off"
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SERVER_TIMING_SAMPLE_RATE = 0
+    settings.TOKEN_BUCKET_THROTTLE = {"CAPACITY": 1e12, "REFILL_RATE": 1e12}
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker, request):
+    """Create the test database and generate the dataset once."""
+    with django_db_blocker.unblock():
+        SyntheticData.generate(
+            request.config.getoption("--dataset-size"),
+            seed=request.config.getoption("--dataset-seed"),
+        )
+
+
+@pytest.fixture
+def dataset(db):
+    """The generated listings' regions by code."""
+    return SyntheticData.ensure_regions()
+
+
+@pytest.fixture
+def listing(dataset):
+    """A listing of the generated dataset with a region."""
+    return (
+        Property.objects.filter(region__isnull=False)  # type: ignore[attr-defined]
+        .order_by("pk")
+        .first()
+    )
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def cold_cache():
+    """``setup`` for ``benchmark.pedantic`` measuring response-cache misses."""
+
+    def setup():
+        cache.clear()
+
+    return setup
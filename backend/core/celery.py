@@ -0,0 +1,43 @@
+"""
+Celery application for the core project.
+
+Workers are started with ``celery -A core worker``. Configuration is read
+from Django settings using the ``CELERY_`` namespace, and tasks are
+auto-discovered from the ``tasks.py`` module of every installed app.
+"""
+
+import os
+
+from celery import Celery
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_ready,
+)
+from prometheus_client import start_http_server
+from core.metrics import TaskTimer, get_registry
+from core.tracing import TaskTracing
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+app = Celery("core")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
+
+# Task durations are recorded wherever tasks run, eager mode included
+task_prerun.connect(TaskTimer.on_prerun, weak=False)
+task_postrun.connect(TaskTimer.on_postrun, weak=False)
+
+# Tasks join the trace of the request or task that queued them
+before_task_publish.connect(TaskTracing.on_before_publish, weak=False)
+task_prerun.connect(TaskTracing.on_prerun, weak=False)
+task_postrun.connect(TaskTracing.on_postrun, weak=False)
+
+
+@worker_ready.connect
+def start_metrics_server(**kwargs):
+    """Serve task metrics on ``CELERY_METRICS_PORT`` when it is set."""
+    port = os.getenv("CELERY_METRICS_PORT")
+    if port:
+        start_http_server(int(port), registry=get_registry())
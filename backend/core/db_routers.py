@@ -0,0 +1,68 @@
+"""
+Database routing for read replicas.
+
+Reads only go to the replica inside a ``replica_reads()`` block, which the
+API viewsets open for safe-method requests; everything else (writes,
+admin, Celery tasks, migrations) keeps using the primary.
+
+Clients that just wrote are pinned to the primary for
+``REPLICA_PIN_SECONDS`` so they read their own writes while the replica
+catches up.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+PIN_KEY = "db:pin:{ident}"
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in connections.databases
+
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """Route reads inside the block to the replica (or force the primary)."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary(ident: str) -> None:
+    """Send ``ident``'s replica-eligible reads to the primary for a while."""
+    cache.set(
+        PIN_KEY.format(ident=ident),
+        True,
+        timeout=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+    )
+
+
+def is_pinned(ident: str) -> bool:
+    return bool(cache.get(PIN_KEY.format(ident=ident)))
+
+
+class ReplicaRouter:
+    """Route opted-in reads to the replica; all writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replica_configured():
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
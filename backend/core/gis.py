@@ -0,0 +1,56 @@
+"""
+GIS (GDAL/GEOS) capability detection.
+
+Importing ``django.contrib.gis`` without the GDAL library is slow to fail,
+and used to be attempted by several modules at import time in every web
+worker, Celery worker and management command. ``gis_available()`` probes
+once per process, on first use, and the result is cached (and exported as
+``GIS_ENABLED`` for child processes):
+
+- ``GIS_ENABLED=true|false`` in the environment skips probing entirely
+  (recommended for deployments, whose image either has GDAL or not);
+- otherwise a GDAL shared library must be findable before the real import
+  is attempted.
+"""
+
+import ctypes.util
+import functools
+import os
+from typing import Optional, Type
+from django.core.exceptions import ImproperlyConfigured
+
+
+@functools.lru_cache(maxsize=None)
+def gis_available() -> bool:
+    """Return whether GeoDjango can be used in this process."""
+    configured = os.getenv("GIS_ENABLED")
+    if configured is not None:
+        return configured.lower() == "true"
+
+    available = _probe()
+    # Processes started from this one (the autoreloader's server, workers)
+    # inherit the result instead of probing again
+    os.environ["GIS_ENABLED"] = str(available).lower()
+    return available
+
+
+def _probe() -> bool:
+    if not os.getenv("GDAL_LIBRARY_PATH") and not ctypes.util.find_library("gdal"):
+        return False
+
+    try:
+        from django.contrib.gis import gdal  # noqa: F401
+        from django.contrib.gis import geos  # noqa: F401
+    except (ImportError, OSError, ImproperlyConfigured):
+        # ImproperlyConfigured: a library was found but GDAL can't load it
+        return False
+    return True
+
+
+def get_point_class() -> Optional[Type]:
+    """Return ``django.contrib.gis.geos.Point``, or None without GIS."""
+    if not gis_available():
+        return None
+    from django.contrib.gis.geos import Point
+
+    return Point
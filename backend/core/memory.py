@@ -0,0 +1,134 @@
+"""
+Memory profiling with tracemalloc.
+
+``memory_profile()`` measures the peak traced memory of a block above what
+was allocated when it started, and the source lines that still hold the
+most memory when it ends (what a long-lived worker keeps after the block).
+It is used by ``MemoryProfilingMiddleware`` (``MEMORY_PROFILING``), the
+``profile_memory`` management command and the memory budget tests.
+
+Tracing slows Python down several times over; enable it for diagnosis only.
+"""
+
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# Allocations of the profiler and the import system are not the block's
+_IGNORED = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+
+
+@dataclass
+class MemoryProfile:
+    """Peak and retained memory (bytes) of a block, with top retaining sites."""
+
+    peak: int = 0
+    retained: int = 0
+    # (file:line, bytes, allocations) still alive at the end of the block
+    top: List[Tuple[str, int, int]] = field(default_factory=list)
+
+    def log_fields(self) -> dict:
+        """Return the profile as flat structured-logging fields."""
+        return {
+            "peak_kb": round(self.peak / 1024, 1),
+            "retained_kb": round(self.retained / 1024, 1),
+            "top_sites": [f"{site} {size / 1024:.1f}KiB" for site, size, _ in self.top],
+        }
+
+    def format(self) -> str:
+        """Return a human-readable report."""
+        lines = [
+            f"Peak {self.peak / 1024:.1f} KiB, "
+            f"retained {self.retained / 1024:.1f} KiB"
+        ]
+        lines.extend(
+            f"  {size / 1024:>9.1f} KiB {count:>7} blocks  {site}"
+            for site, size, count in self.top
+        )
+        return "\n".join(lines)
+
+
+def _short_path(filename: str) -> str:
+    """Trim site-packages and the working directory off ``filename``."""
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.relpath(filename) if os.path.isabs(filename) else filename
+
+
+# Peak traced memory seen so far by each running profile, by id(). Guarded
+# by _lock, as is starting and stopping tracing (tracemalloc is global)
+_lock = threading.Lock()
+_running: Dict[int, int] = {}
+_tracing_started = False
+
+
+def _credit_peak() -> None:
+    """Credit the peak so far to every running profile, then reset it."""
+    peak = tracemalloc.get_traced_memory()[1]
+    for key, seen in _running.items():
+        _running[key] = max(seen, peak)
+    tracemalloc.reset_peak()
+
+
+@contextmanager
+def memory_profile(top: int = 10):
+    """
+    Profile the memory of the block; yields the ``MemoryProfile`` to fill.
+
+    Starts tracing if needed and stops it when the last running profile
+    ends. Profiles may nest or overlap across threads; tracing is
+    process-wide, so overlapping profiles also count each other's
+    allocations.
+    """
+    global _tracing_started
+    profile = MemoryProfile()
+    key = id(profile)
+    filters = [tracemalloc.Filter(False, pattern) for pattern in _IGNORED]
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        # Registered first, so tracing is not stopped under the snapshot
+        _running[key] = 0
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        with _lock:
+            # Resetting the peak must not hide it from the other profiles
+            _credit_peak()
+            _running[key] = 0
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        yield profile
+
+        with _lock:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, _running[key])
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        profile.peak = max(0, peak - baseline)
+        profile.retained = max(0, current - baseline)
+        growth = [
+            stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0
+        ][:top]
+        profile.top = [
+            (
+                f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                stat.size_diff,
+                stat.count_diff,
+            )
+            for stat in growth
+        ]
+    finally:
+        with _lock:
+            del _running[key]
+            if not _running and _tracing_started:
+                tracemalloc.stop()
+                _tracing_started = False
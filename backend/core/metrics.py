@@ -0,0 +1,179 @@
+"""
+Prometheus metrics.
+
+Metrics are defined here and updated where the work happens: the metrics
+middleware (request latency, and query counts from ``QueryCounter``), the
+cache services, the
+ingestion service, ``PropertyService`` (``timed_service``) and Celery task
+signals. ``metrics_view`` serves them at ``/metrics``.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set (before the process starts), every
+process writes its samples to memory-mapped files in that directory and
+``/metrics`` aggregates all of them, so any gunicorn worker reports the
+totals of the whole instance. Gunicorn clears the directory on start and
+marks exited workers dead (see ``gunicorn.conf.py``).
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    "atlas_http_request_duration_seconds",
+    "Request latency by route.",
+    ["route", "method", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "atlas_http_request_db_queries",
+    "Database queries per request by route.",
+    ["route", "method"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+CACHE_REQUESTS = Counter(
+    "atlas_cache_requests_total",
+    "Application cache lookups by cache and result (hit, stale, miss).",
+    ["cache", "result"],
+)
+INGESTED_ROWS = Counter(
+    "atlas_ingestion_rows_total",
+    "Listing rows processed by ingestion, by outcome.",
+    ["outcome"],
+)
+SERVICE_LATENCY = Histogram(
+    "atlas_service_duration_seconds",
+    "Service method latency.",
+    ["service", "method"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+TASK_DURATION = Histogram(
+    "atlas_celery_task_duration_seconds",
+    "Celery task run time by task and final state.",
+    ["task", "state"],
+    buckets=(0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+
+
+# Query count of the request MetricsMiddleware is measuring, if any
+_query_count: ContextVar[Optional[List[int]]] = ContextVar(
+    "metrics_query_count", default=None
+)
+
+
+def enabled() -> bool:
+    """Whether requests are measured (``METRICS_ENABLED``)."""
+    return getattr(settings, "METRICS_ENABLED", True)
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting the queries of a measured request."""
+
+    @classmethod
+    def install(cls, sender=None, connection=None, **kwargs) -> None:
+        """``connection_created`` receiver adding the wrapper."""
+        if not enabled():
+            return
+        if cls.execute_wrapper not in connection.execute_wrappers:
+            # Stays put when ``execute_wrapper()`` blocks pop their own wrappers
+            connection.execute_wrappers.insert(0, cls.execute_wrapper)
+
+    @staticmethod
+    def execute_wrapper(execute, sql, params, many, context):
+        count = _query_count.get()
+        if count is not None:
+            count[0] += 1
+        return execute(sql, params, many, context)
+
+    @staticmethod
+    @contextmanager
+    def counting():
+        """Count the queries of the block in the yielded one-item list."""
+        count = [0]
+        token = _query_count.set(count)
+        try:
+            yield count
+        finally:
+            _query_count.reset(token)
+
+
+def timed_service(service: str):
+    """Decorator recording a service method's latency (under @staticmethod)."""
+
+    def decorator(func):
+        histogram = SERVICE_LATENCY.labels(service=service, method=func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_cache(cache_name: str, hits: int = 0, misses: int = 0) -> None:
+    """Count ``hits`` and ``misses`` of ``cache_name``."""
+    if hits:
+        CACHE_REQUESTS.labels(cache=cache_name, result="hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache=cache_name, result="miss").inc(misses)
+
+
+def get_registry():
+    """Return the registry to expose: all processes' in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """
+    Serve metrics in the Prometheus text format.
+
+    A bearer token is required when ``METRICS_TOKEN`` is set; without one
+    metrics are only served with ``DEBUG`` on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+class TaskTimer:
+    """Celery signal handlers timing each task run."""
+
+    _started: dict = {}
+
+    @classmethod
+    def on_prerun(cls, task_id=None, **kwargs):
+        cls._started[task_id] = time.perf_counter()
+
+    @classmethod
+    def on_postrun(cls, task_id=None, task=None, state=None, **kwargs):
+        started = cls._started.pop(task_id, None)
+        if started is not None and task is not None:
+            TASK_DURATION.labels(task=task.name, state=state or "UNKNOWN").observe(
+                time.perf_counter() - started
+            )
@@ -0,0 +1,260 @@
+"""
+Project middleware.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import reverse
+from core import metrics, profiling, tracing
+from core.memory import memory_profile
+from core.metrics import REQUEST_LATENCY, REQUEST_QUERIES, QueryCounter
+from core.timing import RequestTiming, request_timing
+
+timing_logger = logging.getLogger("core.timing")
+memory_logger = logging.getLogger("core.memory")
+
+# Named groups of router regexes, shown as "<name>" in span names
+ROUTE_GROUP_RE = re.compile(r"\(\?P<(\w+)>[^)]*\)")
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and query count per route for Prometheus.
+
+    Unused when ``METRICS_ENABLED`` is off. Queries are counted by the
+    ``QueryCounter`` wrapper installed on each connection when it opens.
+    """
+
+    def __init__(self, get_response):
+        if not metrics.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with QueryCounter.counting() as queries:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        # URL names keep the label set bounded (e.g. "property-price-range")
+        match = request.resolver_match
+        route = (match.view_name if match else None) or "unmatched"
+        REQUEST_LATENCY.labels(
+            route=route, method=request.method, status=response.status_code
+        ).observe(elapsed)
+        REQUEST_QUERIES.labels(route=route, method=request.method).observe(queries[0])
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Emit a per-request time breakdown for a sample of requests.
+
+    Sampled requests (``SERVER_TIMING_SAMPLE_RATE``) get a ``Server-Timing``
+    header (db, serialize, render and total) and a ``core.timing`` log
+    record whose ``extra`` fields carry the same numbers. Unsampled requests
+    pass straight through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def sampled(self, request) -> bool:
+        rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0.0)
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def __call__(self, request):
+        if not self.sampled(request):
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        with ExitStack() as stack:
+            stack.enter_context(request_timing(timing))
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing.execute_wrapper))
+            # DRF responses are rendered before this returns
+            response = self.get_response(request)
+
+        response["Server-Timing"] = timing.header()
+        fields = timing.log_fields()
+        timing_logger.info(
+            "%s %s %s %.1fms (%d queries, %.1fms db)",
+            request.method,
+            request.path,
+            response.status_code,
+            fields["total_ms"],
+            fields["db_queries"],
+            fields["db_ms"],
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status_code": response.status_code,
+                **fields,
+            },
+        )
+        return response
+
+
+class ClosingIterator:
+    """Iterable calling ``on_close`` when the response closes it."""
+
+    def __init__(self, iterable, on_close):
+        self.iterable = iterable
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def close(self):
+        self.on_close()
+
+
+class MemoryProfilingMiddleware:
+    """
+    Trace the memory of every request while ``MEMORY_PROFILING`` is on.
+
+    Each request's peak and retained memory and its top retaining source
+    lines are logged to ``core.memory``; buffered responses also get an
+    ``X-Memory-Peak`` header (bytes). Streaming responses are measured until
+    their body has been sent. With the setting off this is one lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "MEMORY_PROFILING", False):
+            return self.get_response(request)
+
+        stack = ExitStack()
+        profile = stack.enter_context(
+            memory_profile(top=getattr(settings, "MEMORY_PROFILING_TOP", 10))
+        )
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            stack.close()
+            raise
+
+        def finish():
+            stack.close()
+            self.log(request, response.status_code, profile)
+
+        if response.streaming:
+            # Django closes the body iterator once the response is sent
+            response.streaming_content = ClosingIterator(
+                response.streaming_content, finish
+            )
+            return response
+        finish()
+        response["X-Memory-Peak"] = str(profile.peak)
+        return response
+
+    @staticmethod
+    def log(request, status_code, profile):
+        fields = profile.log_fields()
+        memory_logger.info(
+            "%s %s %s peak %.1fKiB retained %.1fKiB",
+            request.method,
+            request.path,
+            status_code,
+            fields["peak_kb"],
+            fields["retained_kb"],
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status_code": status_code,
+                **fields,
+            },
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Sample the stack of requests sent with an authorized ``X-Profile``.
+
+    The profile is stored for download and its id and URL are returned in
+    ``X-Profile-Id`` and ``X-Profile-URL``. Streaming responses are sampled
+    until their body has been sent, and their profile can be downloaded
+    from then on. Placed after authentication so session users are known;
+    other requests only pay for a header lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if profiling.HEADER not in request.META or not profiling.authorized(request):
+            return self.get_response(request)
+
+        interval = getattr(settings, "PROFILING_INTERVAL_MS", 5) / 1000
+        sampler = profiling.Sampler(threading.get_ident(), interval)
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            sampler.stop()
+            raise
+
+        profile_id = profiling.new_profile_id()
+
+        def finish():
+            sampler.stop()
+            profiling.save(sampler.collapsed(), profile_id)
+
+        if response.streaming:
+            # Django closes the body iterator once the response is sent
+            response.streaming_content = ClosingIterator(
+                response.streaming_content, finish
+            )
+        else:
+            finish()
+        response["X-Profile-Id"] = profile_id
+        response["X-Profile-URL"] = request.build_absolute_uri(
+            reverse("profile", args=[profile_id])
+        )
+        return response
+
+
+class TracingMiddleware:
+    """
+    Run each request in a server span (``TRACING_ENABLED``).
+
+    A valid ``traceparent`` header makes the request part of the caller's
+    trace. Spans are named by URL route, and the response carries the trace
+    id in ``X-Trace-Id``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not tracing.enabled():
+            return self.get_response(request)
+
+        parent = tracing.parse_traceparent(request.headers.get("traceparent"))
+        with tracing.span(
+            f"{request.method} {request.path}",
+            kind="server",
+            attributes={"http.method": request.method, "http.target": request.path},
+            parent=parent,
+        ) as span:
+            response = self.get_response(request)
+            # Routes keep span names low-cardinality
+            match = request.resolver_match
+            if match is not None and match.route:
+                route = ROUTE_GROUP_RE.sub(r"<\1>", match.route).strip("^$")
+                span.name = f"{request.method} {route}"
+                span.attributes["http.route"] = route
+            span.attributes["http.status_code"] = response.status_code
+            if response.status_code >= 500:
+                span.status = "error"
+        response["X-Trace-Id"] = span.trace_id
+        return response
@@ -0,0 +1,126 @@
+"""
+On-demand sampling profiles of single requests.
+
+A request carrying an ``X-Profile`` header is profiled when it comes from a
+staff user (session or API token, with ``X-Profile: 1``) or when the header holds
+a token signed with the project secret (``manage.py profile_token``), so a
+profile can be taken without staff credentials. Other requests only pay for
+the header lookup; an unauthorized ``X-Profile`` is ignored.
+
+While the request runs, a background thread samples the request thread's
+stack every ``PROFILING_INTERVAL_MS``. The samples are stored in the cache
+for ``PROFILING_TTL`` seconds as collapsed stacks (``a;b;c 12`` per line,
+read by flamegraph.pl and speedscope), and the response carries the
+``X-Profile-Id`` and ``X-Profile-URL`` to download them from (see
+``ProfilingMiddleware``).
+"""
+
+import sys
+import threading
+import uuid
+from collections import Counter
+from typing import Optional
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+HEADER = "HTTP_X_PROFILE"
+PROFILE_KEY = "profile:{profile_id}"
+SALT = "core.profiling"
+
+
+def make_token() -> str:
+    """Return a signed ``X-Profile`` value, valid for ``PROFILING_TOKEN_MAX_AGE``."""
+    return signing.TimestampSigner(salt=SALT).sign("profile")
+
+
+def authorized(request) -> bool:
+    """Whether ``request`` may take or download profiles."""
+    value = request.META.get(HEADER, "")
+    if ":" in value:
+        max_age = getattr(settings, "PROFILING_TOKEN_MAX_AGE", 600)
+        try:
+            signing.TimestampSigner(salt=SALT).unsign(value, max_age=max_age)
+        except signing.BadSignature:
+            return False
+        return True
+
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # Token users are only known to DRF; its authenticators cache them
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            authenticated = authentication_class().authenticate(request)
+        except APIException:
+            return False
+        if authenticated is not None:
+            return authenticated[0].is_staff
+    return False
+
+
+class Sampler(threading.Thread):
+    """Samples the stack of one thread until stopped."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self.collapse(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    @staticmethod
+    def collapse(frame) -> str:
+        """Return the stack of ``frame`` root first, as ``module:function;...``."""
+        names = []
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Return the samples in the collapsed-stacks format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+def save(profile: str, profile_id: Optional[str] = None) -> str:
+    """Store ``profile`` for ``PROFILING_TTL`` seconds and return its id."""
+    profile_id = profile_id or new_profile_id()
+    cache.set(
+        PROFILE_KEY.format(profile_id=profile_id),
+        profile,
+        timeout=getattr(settings, "PROFILING_TTL", 3600),
+    )
+    return profile_id
+
+
+def profile_view(request, profile_id: str):
+    """Download a stored profile as collapsed stacks."""
+    if not authorized(request):
+        return HttpResponseForbidden()
+    profile = cache.get(PROFILE_KEY.format(profile_id=profile_id))
+    if profile is None:
+        return HttpResponseNotFound()
+    response = HttpResponse(profile, content_type="text/plain; charset=utf-8")
+    response["Content-Disposition"] = (
+        f'attachment; filename="profile-{profile_id}.collapsed"'
+    )
+    return response
@@ -0,0 +1,125 @@
+"""
+Query budgets: upper bounds on the number of queries a unit of work runs.
+
+``query_budget()`` records every query of a block (on all database aliases)
+and checks the total against a limit. It also looks for duplicates: the
+same SQL run ``QUERY_BUDGET_DUPLICATE_THRESHOLD`` times or more is
+reported as a likely N+1, with the application stack of the first call.
+
+``QUERY_BUDGET_MODE`` decides what a violation does: ``"raise"`` raises
+``QueryBudgetExceeded`` (used by the test runner), ``"warn"`` logs a
+warning (default with DEBUG), and ``"off"`` skips recording altogether.
+"""
+
+import logging
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+OFF = "off"
+WARN = "warn"
+RAISE = "raise"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block ran more queries than its budget, or duplicated a query."""
+
+
+def get_mode() -> str:
+    return getattr(settings, "QUERY_BUDGET_MODE", OFF)
+
+
+def application_stack() -> List[traceback.FrameSummary]:
+    """Return the current stack limited to this project's frames."""
+    base_dir = str(settings.BASE_DIR)
+    return [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and not frame.filename.endswith("query_budget.py")
+    ]
+
+
+class QueryLog:
+    """``execute_wrapper`` hook keeping each query's SQL and call stack."""
+
+    def __init__(self):
+        self.queries: List[Tuple[str, str, List[traceback.FrameSummary]]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        alias = context["connection"].alias
+        self.queries.append((alias, sql, application_stack()))
+        return execute(sql, params, many, context)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def duplicates(self, threshold: int) -> List[Tuple[str, int, list]]:
+        """Return ``(sql, count, first stack)`` of SQL run ``threshold``+ times."""
+        counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        stacks: Dict[Tuple[str, str], list] = {}
+        for alias, sql, stack in self.queries:
+            counts[(alias, sql)] += 1
+            stacks.setdefault((alias, sql), stack)
+        return [
+            (sql, count, stacks[(alias, sql)])
+            for (alias, sql), count in counts.items()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def recording_queries():
+    """Record the queries of the block on every alias into a ``QueryLog``."""
+    log = QueryLog()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(log))
+        yield log
+
+
+def check_budget(log: QueryLog, limit: Optional[int], label: str) -> Optional[str]:
+    """Return a report of the budget violations in ``log``, if any."""
+    threshold = getattr(settings, "QUERY_BUDGET_DUPLICATE_THRESHOLD", 3)
+    over = limit is not None and len(log) > limit
+    duplicates = log.duplicates(threshold)
+    if not over and not duplicates:
+        return None
+
+    lines = [f"{label} ran {len(log)} queries (budget {limit})."]
+    if over:
+        lines.extend(f"  [{alias}] {sql}" for alias, sql, _ in log.queries)
+    for sql, count, stack in duplicates:
+        lines.append(f"Duplicate query x{count}: {sql}")
+        lines.append("First called from:")
+        lines.extend("  " + line.rstrip() for line in traceback.format_list(stack))
+    return "\n".join(lines)
+
+
+@contextmanager
+def query_budget(limit: Optional[int], label: str, mode: Optional[str] = None):
+    """
+    Enforce ``limit`` queries (None: duplicates only) inside the block.
+
+    Yields the ``QueryLog``, or None when the mode is ``"off"``.
+    """
+    mode = mode or get_mode()
+    if mode == OFF:
+        yield None
+        return
+
+    with recording_queries() as log:
+        yield log
+
+    report = check_budget(log, limit, label)
+    if report is None:
+        return
+    if mode == RAISE:
+        raise QueryBudgetExceeded(report)
+    logger.warning(report)
@@ -14,6 +14,10 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
+from core.gis import gis_available
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -48,13 +52,13 @@ else:
 
 # Application definition
 
-# Try to import PostGIS, only add if available
-try:
-    from django.contrib.gis import gdal  # noqa: F401
-
-    HAS_POSTGIS = True
-except (ImportError, Exception):
-    HAS_POSTGIS = False
+# PostGIS is used only with PostgreSQL and if GDAL is available. SQLite
+# setups never probe for GDAL; set GIS_ENABLED to skip probing entirely
+USES_POSTGRES = (
+    os.getenv("DATABASE_URL", "").startswith("postgres")
+    or os.getenv("USE_POSTGRES", "False").lower() == "true"
+)
+HAS_POSTGIS = USES_POSTGRES and gis_available()
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -78,6 +82,10 @@ if HAS_POSTGIS:
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.TracingMiddleware",
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.MemoryProfilingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -85,6 +93,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -119,13 +128,18 @@ if "DATABASE_URL" in os.environ:
     try:
         import dj_database_url  # type: ignore[import-untyped]
 
-        db_config = dj_database_url.config(conn_max_age=600, conn_health_checks=True)
+        db_config = dj_database_url.config()
 
         # If PostGIS is available and DATABASE_URL uses postgres, try PostGIS backend
         if HAS_POSTGIS and db_config.get("ENGINE") == "django.db.backends.postgresql":
             db_config["ENGINE"] = "django.contrib.gis.db.backends.postgis"
 
         DATABASES = {"default": db_config}
+
+        if os.getenv("DATABASE_REPLICA_URL"):
+            replica_config = dj_database_url.parse(os.environ["DATABASE_REPLICA_URL"])
+            replica_config["ENGINE"] = db_config["ENGINE"]
+            DATABASES["replica"] = replica_config
     except ImportError:
         # Fallback if dj-database-url is not installed
         DATABASES = {
@@ -135,29 +149,27 @@ if "DATABASE_URL" in os.environ:
             }
         }
 elif os.getenv("USE_POSTGRES", "False").lower() == "true":
-    if HAS_POSTGIS:
-        # Use PostGIS backend if available
-        DATABASES = {
-            "default": {
-                "ENGINE": "django.contrib.gis.db.backends.postgis",
-                "NAME": os.getenv("DB_NAME", "atlas_investor"),
-                "USER": os.getenv("DB_USER", "postgres"),
-                "PASSWORD": os.getenv("DB_PASSWORD", "postgres"),
-                "HOST": os.getenv("DB_HOST", "localhost"),
-                "PORT": os.getenv("DB_PORT", "5432"),
-            }
+    DATABASES = {
+        "default": {
+            # Use PostGIS backend if available, standard PostgreSQL otherwise
+            "ENGINE": (
+                "django.contrib.gis.db.backends.postgis"
+                if HAS_POSTGIS
+                else "django.db.backends.postgresql"
+            ),
+            "NAME": os.getenv("DB_NAME", "atlas_investor"),
+            "USER": os.getenv("DB_USER", "postgres"),
+            "PASSWORD": os.getenv("DB_PASSWORD", "postgres"),
+            "HOST": os.getenv("DB_HOST", "localhost"),
+            "PORT": os.getenv("DB_PORT", "5432"),
         }
-    else:
-        # Fall back to standard PostgreSQL if PostGIS is not available
-        DATABASES = {
-            "default": {
-                "ENGINE": "django.db.backends.postgresql",
-                "NAME": os.getenv("DB_NAME", "atlas_investor"),
-                "USER": os.getenv("DB_USER", "postgres"),
-                "PASSWORD": os.getenv("DB_PASSWORD", "postgres"),
-                "HOST": os.getenv("DB_HOST", "localhost"),
-                "PORT": os.getenv("DB_PORT", "5432"),
-            }
+    }
+
+    if os.getenv("DB_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": os.environ["DB_REPLICA_HOST"],
+            "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
         }
 else:
     # SQLite for development (PostGIS features disabled)
@@ -168,6 +180,50 @@ else:
         }
     }
 
+# Connection reuse for PostgreSQL. With DB_POOL=true each worker process
+# keeps a psycopg 3 connection pool (psycopg[pool] in requirements.txt);
+# otherwise connections persist for DB_CONN_MAX_AGE seconds. Both are
+# health-checked. DB_POOL=true without psycopg_pool is a configuration error
+# rather than a silent fallback to persistent connections.
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+try:
+    import psycopg  # type: ignore[import-not-found]  # noqa: F401
+    import psycopg_pool  # type: ignore[import-not-found]  # noqa: F401
+
+    HAS_PSYCOPG_POOL = True
+except ImportError:
+    HAS_PSYCOPG_POOL = False
+
+for db_config in DATABASES.values():
+    if "sqlite3" in db_config["ENGINE"]:
+        continue
+    if DB_POOL:
+        if not HAS_PSYCOPG_POOL:
+            raise ImproperlyConfigured(
+                "DB_POOL=true needs psycopg 3 with psycopg_pool installed"
+            )
+        # Django's native pool requires persistent connections to be off
+        db_config["CONN_MAX_AGE"] = 0
+        db_config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            # Drop connections the server closed before handing them out
+            "check": psycopg_pool.ConnectionPool.check_connection,
+        }
+    else:
+        db_config["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "600"))
+    db_config["CONN_HEALTH_CHECKS"] = True
+
+# Safe-method reads of the property and region APIs go to "replica" when one
+# is configured; a client that just wrote reads from the primary for
+# REPLICA_PIN_SECONDS to see its own writes despite replication lag
+if "replica" in DATABASES:
+    # Tests run against the primary only
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["core.db_routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -219,12 +275,15 @@ AUTH_USER_MODEL = "users.User"
 
 # REST Framework
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("users.authentication.CachedJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # Times rendering for Server-Timing (see core.timing)
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.timing.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "PAGE_SIZE_QUERY_PARAM": "page_size",
@@ -236,8 +295,25 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.ClaimsTokenObtainPairSerializer",
+}
+
+# Seconds an authenticated user is cached between requests, and whether to
+# trust the user claims embedded in tokens instead (no auth query at all)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "60"))
+JWT_TRUSTED_CLAIMS = os.getenv("JWT_TRUSTED_CLAIMS", "False").lower() == "true"
+
+# Token-bucket throttling of PropertyViewSet: burst size in tokens and
+# sustained tokens per second per user/IP (actions weigh 1-6 tokens)
+TOKEN_BUCKET_THROTTLE = {
+    "CAPACITY": float(os.getenv("THROTTLE_BUCKET_CAPACITY", "300")),
+    "REFILL_RATE": float(os.getenv("THROTTLE_BUCKET_REFILL_RATE", "5")),
 }
 
+# Default per-request statement timeout (ms) of the API viewsets on
+# PostgreSQL; actions may set their own, 0 disables
+API_STATEMENT_TIMEOUT_MS = int(os.getenv("API_STATEMENT_TIMEOUT_MS", "5000"))
+
 # Djoser Settings
 DJOSER = {
     "LOGIN_FIELD": "email",
@@ -258,3 +334,169 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
+
+# Redis (shared by Celery and, where configured, the cache)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Cache
+# Use Redis when REDIS_URL is explicitly configured, local memory otherwise
+if "REDIS_URL" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "atlas",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "atlas-default",
+        }
+    }
+
+# Region cache: seconds a worker trusts its local copy before re-checking
+# the shared version key, and lifetime of the shared snapshot
+REGION_CACHE_VERSION_TTL = int(os.getenv("REGION_CACHE_VERSION_TTL", "5"))
+REGION_CACHE_TIMEOUT = int(os.getenv("REGION_CACHE_TIMEOUT", "3600"))
+
+# Lifetime of serialized property list fragments (keys change on every edit)
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv("FRAGMENT_CACHE_TIMEOUT", "86400"))
+
+# Single-flight response cache for hot list/aggregate endpoints: soft
+# lifetime, how long stale entries may still be served while one worker
+# recomputes, recompute lock lifetime, how long a cold miss waits for that
+# worker, and the XFetch early-refresh factor
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "60"))
+RESPONSE_CACHE_STALE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_STALE_TIMEOUT", "300"))
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.getenv("RESPONSE_CACHE_LOCK_TIMEOUT", "30"))
+RESPONSE_CACHE_WAIT = float(os.getenv("RESPONSE_CACHE_WAIT", "2.0"))
+RESPONSE_CACHE_BETA = float(os.getenv("RESPONSE_CACHE_BETA", "1.0"))
+
+# Cache warming: share of cached reads whose query shape is logged, how many
+# distinct shapes are kept, and the defaults of the warm_caches command
+CACHE_WARMING_SAMPLE_RATE = float(os.getenv("CACHE_WARMING_SAMPLE_RATE", "0.1"))
+CACHE_WARMING_MAX_SHAPES = int(os.getenv("CACHE_WARMING_MAX_SHAPES", "500"))
+CACHE_WARMING_LIMIT = int(os.getenv("CACHE_WARMING_LIMIT", "50"))
+CACHE_WARMING_CONCURRENCY = int(os.getenv("CACHE_WARMING_CONCURRENCY", "4"))
+
+# Celery
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL)
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", REDIS_URL)
+CELERY_TASK_ALWAYS_EAGER = (
+    os.getenv("CELERY_TASK_ALWAYS_EAGER", "False").lower() == "true"
+)
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+
+# What a request over its view's query budget, or repeating one query
+# QUERY_BUDGET_DUPLICATE_THRESHOLD+ times, does: "raise", "warn" or "off".
+# The test runner always raises.
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn" if DEBUG else "off")
+QUERY_BUDGET_DUPLICATE_THRESHOLD = int(
+    os.getenv("QUERY_BUDGET_DUPLICATE_THRESHOLD", "3")
+)
+TEST_RUNNER = "core.testing.TestRunner"
+
+# Queries slower than SLOW_QUERY_THRESHOLD_MS (0 disables) are stored with
+# their EXPLAIN plan in the last SLOW_QUERY_LOG_SIZE entries of the
+# SlowQuery table (admin: Slow queries); each query shape is explained at
+# most once per SLOW_QUERY_EXPLAIN_INTERVAL seconds. Slots are numbered in the
+# cache, so processes share the buffer only with REDIS_URL set. Parameters of
+# writes and of queries on SLOW_QUERY_REDACTED_TABLES are not stored
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "1000"))
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+SLOW_QUERY_REDACTED_TABLES = [
+    "users_user",
+    "auth_user",
+    "django_session",
+    "authtoken_token",
+    "token_blacklist_outstandingtoken",
+]
+
+# Whether requests are measured (latency and queries per route); off drops
+# MetricsMiddleware and its per-query counting wrapper
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+# Bearer token required to read /metrics; when empty, /metrics is served
+# only with DEBUG on and answers 403 otherwise. Gunicorn workers share
+# metrics through PROMETHEUS_MULTIPROC_DIR, see core.metrics.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Fraction of requests answered with a Server-Timing header (db, serialize,
+# render, total) and logged to "core.timing"; 0 disables timing entirely
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "0"))
+
+# Requests with an X-Profile header from staff (or with a signed token from
+# "manage.py profile_token", valid PROFILING_TOKEN_MAX_AGE seconds) are
+# sampled every PROFILING_INTERVAL_MS; the collapsed stacks are kept in the
+# cache for PROFILING_TTL seconds at /profiles/<id>, see core.profiling
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_TTL = int(os.getenv("PROFILING_TTL", "3600"))
+PROFILING_TOKEN_MAX_AGE = int(os.getenv("PROFILING_TOKEN_MAX_AGE", "600"))
+
+# Trace every request with tracemalloc and log its peak memory and top
+# MEMORY_PROFILING_TOP retaining source lines to "core.memory"; slows every
+# request down, for diagnosis only (see core.memory)
+MEMORY_PROFILING = os.getenv("MEMORY_PROFILING", "False").lower() == "true"
+MEMORY_PROFILING_TOP = int(os.getenv("MEMORY_PROFILING_TOP", "10"))
+
+# Tracing spans for requests, queries, service calls, cache lookups and
+# Celery tasks, handed to TRACING_EXPORTER (core.tracing.ConsoleExporter,
+# LogExporter, FileExporter writing JSON lines to TRACING_FILE, or a custom
+# class with an export(span) method)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "core.tracing.ConsoleExporter")
+TRACING_FILE = os.getenv("TRACING_FILE", "spans.jsonl")
+
+# Admin changelists of large tables use PostgreSQL planner row estimates
+# instead of COUNT(*) once the estimate reaches this many rows (see
+# core.pagination)
+ADMIN_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv("ADMIN_COUNT_ESTIMATE_THRESHOLD", "100000")
+)
+
+# Rows fetched per database round trip by the streaming CSV export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+# Readiness probes (/api/health/ready/): per-dependency latency limits in ms
+# above which the instance reports not ready, and how long a probe result is
+# reused by each process
+HEALTH_CHECK_THRESHOLDS_MS = {
+    "database": int(os.getenv("HEALTH_CHECK_DATABASE_MS", "500")),
+    "cache": int(os.getenv("HEALTH_CHECK_CACHE_MS", "200")),
+    "broker": int(os.getenv("HEALTH_CHECK_BROKER_MS", "1000")),
+}
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "5"))
+HEALTH_CHECK_BROKER_TIMEOUT = float(os.getenv("HEALTH_CHECK_BROKER_TIMEOUT", "2"))
+
+# Listing ingestion
+# Each source names a backend class and the options passed to it.
+INGESTION_SOURCES = {
+    "sample": {
+        "BACKEND": "api.services.ingestion_service.JSONFileSource",
+        "OPTIONS": {
+            "path": os.getenv(
+                "INGESTION_SAMPLE_PATH",
+                str(BASE_DIR / "data" / "sample_data" / "listings.json"),
+            ),
+            "partition_by": "region",
+        },
+    },
+}
+
+# Geocoding
+# Gazetteer CSV with postal_code,locality,longitude,latitude columns
+GEOCODING_GAZETTEER_PATH = os.getenv(
+    "GEOCODING_GAZETTEER_PATH",
+    str(BASE_DIR / "data" / "gazetteer" / "pt_postal_codes.csv"),
+)
+GEOCODING_LRU_SIZE = int(os.getenv("GEOCODING_LRU_SIZE", "10000"))
+
+# Compression codec for PropertyPayload.raw_data: "zlib", "zstd" or "none"
+# (zstd needs the optional zstandard package and falls back to zlib)
+PAYLOAD_COMPRESSION = os.getenv("PAYLOAD_COMPRESSION", "zlib")
@@ -0,0 +1,127 @@
+"""
+Test support: the project test runner, query-budget and memory-budget
+assertions.
+"""
+
+import gc
+from django.conf import settings
+from django.core.cache import cache
+from django.test.runner import DiscoverRunner
+from django.urls import reverse
+from core.memory import memory_profile
+from core.query_budget import RAISE, check_budget, recording_queries
+
+
+class TestRunner(DiscoverRunner):
+    """Run the suite with query budgets enforced and no slow-query capture."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_MODE = RAISE
+        # Whether a query is slow depends on the machine; tests opt in
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin checking ``query_budgets`` of router-registered viewsets.
+
+    Requests are measured against an empty shared cache, so budgets hold
+    for cache misses, and are repeated at each of ``budget_page_sizes``:
+    the query count of a list must not grow with the page.
+    """
+
+    budget_page_sizes = (1, 20, 100)
+    # Query parameters needed by actions, by action name
+    budget_params: dict = {}
+
+    def assertQueryBudget(self, url, budget, params=None):
+        """GET ``url`` and fail if it exceeds ``budget`` or repeats queries."""
+        # Warm per-process state (connections, local caches), then measure
+        # a request that finds the shared cache empty
+        self.client.get(url, params or {})  # type: ignore[attr-defined]
+        cache.clear()
+        with recording_queries() as log:
+            response = self.client.get(url, params or {})  # type: ignore[attr-defined]  # noqa: E501
+        self.assertLess(response.status_code, 400, f"GET {url}: {response.status_code}")  # type: ignore[attr-defined]  # noqa: E501
+        report = check_budget(log, budget, f"GET {url}")
+        if report:
+            self.fail(report)  # type: ignore[attr-defined]
+        return len(log)
+
+    def assertRouterQueryBudgets(self, router):
+        """Check every budgeted GET action of every viewset in ``router``."""
+        checked = []
+        for prefix, viewset, basename in router.registry:
+            budgets = getattr(viewset, "query_budgets", {})
+            obj = viewset.queryset.first()
+            detail_kwargs = {}
+            if obj is not None:
+                lookup_field = viewset.lookup_field
+                kwarg = viewset.lookup_url_kwarg or lookup_field
+                detail_kwargs[kwarg] = getattr(obj, lookup_field)
+
+            actions = [("list", False, "list"), ("retrieve", True, "detail")]
+            actions += [
+                (extra.__name__, extra.detail, extra.url_name)
+                for extra in viewset.get_extra_actions()
+                if "get" in extra.mapping
+            ]
+            for action, detail, url_name in actions:
+                if action not in budgets or (detail and not detail_kwargs):
+                    continue
+                url = reverse(
+                    f"{basename}-{url_name}", kwargs=detail_kwargs if detail else None
+                )
+                params = self.budget_params.get(action, {})
+                if detail:
+                    self.assertQueryBudget(url, budgets[action], params)
+                else:
+                    counts = {
+                        size: self.assertQueryBudget(
+                            url, budgets[action], {**params, "page_size": size}
+                        )
+                        for size in self.budget_page_sizes
+                    }
+                    self.assertEqual(  # type: ignore[attr-defined]
+                        len(set(counts.values())),
+                        1,
+                        f"{basename} {action}: query count varies with page size {counts}",  # noqa: E501
+                    )
+                checked.append(f"{basename}-{action}")
+        return checked
+
+
+class MemoryBudgetTestMixin:
+    """TestCase mixin checking the peak memory of a request."""
+
+    @staticmethod
+    def _consume(response) -> None:
+        """Read a streaming body without keeping it."""
+        if response.streaming:
+            for _chunk in response.streaming_content:
+                pass
+
+    def assertMemoryBudget(self, url, budget, params=None):
+        """
+        GET ``url`` and fail if its peak traced memory exceeds ``budget`` bytes.
+
+        Streaming bodies are read (not kept) inside the measurement. Returns the
+        ``MemoryProfile``.
+        """
+        # Warm imports and per-process caches so they are not counted, then
+        # measure a request that finds the shared cache empty
+        response = self.client.get(url, params or {})  # type: ignore[attr-defined]
+        self._consume(response)
+        cache.clear()
+        gc.collect()
+        with memory_profile() as profile:
+            response = self.client.get(url, params or {})  # type: ignore[attr-defined]  # noqa: E501
+            self._consume(response)
+        self.assertLess(response.status_code, 400, f"GET {url}: {response.status_code}")  # type: ignore[attr-defined]  # noqa: E501
+        if profile.peak > budget:
+            self.fail(  # type: ignore[attr-defined]
+                f"GET {url} peaked at {profile.peak} bytes (budget {budget}).\n"
+                + profile.format()
+            )
+        return profile
@@ -0,0 +1,120 @@
+"""
+Per-request time breakdown for Server-Timing headers and timing logs.
+
+``ServerTimingMiddleware`` starts a ``RequestTiming`` for sampled requests.
+Database time and query count come from a ``connection.execute_wrapper``.
+Serialization and rendering are timed by the DRF hooks below:
+``TimedSerializerMixin`` and ``TimedListSerializer`` for serializers, and
+``TimedJSONRenderer`` for the renderer. Each phase excludes the queries run
+inside it, so the phases add up to at most the request total.
+
+For unsampled requests ``timed()`` costs one context variable lookup.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+_timing: ContextVar[Optional["RequestTiming"]] = ContextVar(
+    "request_timing", default=None
+)
+
+
+class RequestTiming:
+    """Accumulated phase durations (seconds) and query count of a request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.queries = 0
+        self._active: set = set()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.phases["db"] += time.perf_counter() - started
+            self.queries += 1
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self) -> str:
+        """Return the ``Server-Timing`` header value (durations in ms)."""
+        metrics = [
+            f'db;dur={self.phases["db"] * 1000:.1f};desc="{self.queries} queries"'
+        ]
+        for phase, seconds in self.phases.items():
+            if phase != "db":
+                metrics.append(f"{phase};dur={seconds * 1000:.1f}")
+        metrics.append(f"total;dur={self.total() * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def log_fields(self) -> dict:
+        """Return the breakdown as flat structured-logging fields."""
+        fields = {f"{phase}_ms": round(s * 1000, 1) for phase, s in self.phases.items()}
+        fields.setdefault("db_ms", 0.0)
+        fields["db_queries"] = self.queries
+        fields["total_ms"] = round(self.total() * 1000, 1)
+        return fields
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """Return the timing of the current request, if it is sampled."""
+    return _timing.get()
+
+
+@contextmanager
+def request_timing(timing: RequestTiming):
+    """Make ``timing`` the current request timing inside the block."""
+    token = _timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _timing.reset(token)
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the block's duration, minus its queries, to ``phase``."""
+    timing = _timing.get()
+    # Nested blocks of the same phase (nested serializers) count once
+    if timing is None or phase in timing._active:
+        yield
+        return
+    timing._active.add(phase)
+    db_before = timing.phases["db"]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timing.phases[phase] += elapsed - (timing.phases["db"] - db_before)
+        timing._active.discard(phase)
+
+
+class TimedSerializerMixin:
+    """Time ``.data`` of a serializer as the ``serialize`` phase."""
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data  # type: ignore[misc]
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """``many=True`` counterpart; set as ``Meta.list_serializer_class``."""
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON renderer timing itself as the ``render`` phase."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("render"):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,311 @@
+"""
+Lightweight request tracing.
+
+Spans follow the OpenTelemetry model: each has a 128-bit trace id, a 64-bit
+span id, its parent's span id, a name, a kind, attributes, a status and
+start/end times. The current span lives in a context variable, and
+``span()`` opens a child of it (or a new trace).
+
+Spans are opened by ``TracingMiddleware`` (core.middleware) for requests,
+continuing a W3C ``traceparent`` header, by ``QuerySpans`` for every
+database query, by ``traced()`` on service methods and cache lookups, and
+by ``TaskTracing`` for Celery tasks. The current ``traceparent`` goes into
+the headers of every published task, so a task's spans join the trace that
+queued it.
+
+Finished spans are handed to the exporter named by ``TRACING_EXPORTER``
+(``ConsoleExporter``, ``LogExporter``, ``FileExporter``, ``InMemoryExporter``
+or any other ``SpanExporter`` subclass, which implements ``export(span)``).
+With ``TRACING_ENABLED`` off, ``span()`` only checks the setting.
+"""
+
+import functools
+import json
+import logging
+import re
+import secrets
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed operation of a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    attributes: Dict[str, object] = field(default_factory=dict)
+    status: str = "ok"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def traceparent(self) -> str:
+        """Return the W3C ``traceparent`` value naming this span as parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "duration_ms": self.duration_ms}
+
+
+def enabled() -> bool:
+    return getattr(settings, "TRACING_ENABLED", False)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_traceparent() -> Optional[str]:
+    span_ = _current.get()
+    return span_.traceparent() if span_ is not None else None
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return ``(trace_id, parent span id)`` of a valid ``traceparent``."""
+    match = TRACEPARENT_RE.match((value or "").strip().lower())
+    if match is None or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+def set_attributes(**attributes) -> None:
+    """Add ``attributes`` to the current span, if any."""
+    span_ = _current.get()
+    if span_ is not None:
+        span_.attributes.update(attributes)
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = "internal",
+    attributes: Optional[dict] = None,
+    parent: Optional[Tuple[str, str]] = None,
+):
+    """
+    Run the block in a new span and export it when the block ends.
+
+    The span is a child of ``parent`` (a remote ``(trace_id, span_id)``),
+    else of the current span, else the root of a new trace. Yields the
+    span, or None when tracing is disabled. Exceptions mark it as failed.
+    """
+    if not enabled():
+        yield None
+        return
+
+    current = _current.get()
+    if parent is None and current is not None:
+        parent = (current.trace_id, current.span_id)
+    trace_id, parent_id = parent if parent else (secrets.token_hex(16), None)
+    span_ = Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent_id,
+        kind=kind,
+        attributes=dict(attributes or {}),
+    )
+    token = _current.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.status = "error"
+        span_.attributes["error.type"] = type(e).__name__
+        span_.attributes["error.message"] = str(e)[:500]
+        raise
+    finally:
+        span_.end_ns = time.time_ns()
+        _current.reset(token)
+        export(span_)
+
+
+def traced(name: str, kind: str = "internal"):
+    """Decorator running the function in a span (under @staticmethod)."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with span(name, kind=kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class SpanExporter(ABC):
+    """Receives every finished span."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Handle one finished span."""
+
+
+class ConsoleExporter(SpanExporter):
+    """Write one line per span to stderr."""
+
+    def export(self, span: Span) -> None:
+        indent = "  " if span.parent_id else ""
+        sys.stderr.write(
+            f"[trace {span.trace_id[:8]}] {indent}{span.name} "
+            f"{span.duration_ms:.2f}ms {span.status}\n"
+        )
+
+
+class LogExporter(SpanExporter):
+    """Log spans to ``core.tracing`` with their fields as ``extra``."""
+
+    def export(self, span: Span) -> None:
+        logger.info(
+            "%s %s %.2fms",
+            span.name,
+            span.status,
+            span.duration_ms,
+            extra={"span": span.to_dict()},
+        )
+
+
+class FileExporter(SpanExporter):
+    """Append spans as JSON lines to ``TRACING_FILE``."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or getattr(settings, "TRACING_FILE", "spans.jsonl")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class InMemoryExporter(SpanExporter):
+    """Keep spans in memory, for tests."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans = []
+
+
+@functools.lru_cache(maxsize=None)
+def get_exporter() -> SpanExporter:
+    """Return the configured exporter, created once per process."""
+    path = getattr(settings, "TRACING_EXPORTER", "core.tracing.ConsoleExporter")
+    return import_string(path)()
+
+
+def export(span_: Span) -> None:
+    try:
+        get_exporter().export(span_)
+    except Exception:
+        # Tracing must never break the traced work
+        logger.warning("Could not export span %s", span_.name, exc_info=True)
+
+
+def _reset_exporter(setting=None, **kwargs):
+    if setting in ("TRACING_EXPORTER", "TRACING_FILE"):
+        get_exporter.cache_clear()
+
+
+setting_changed.connect(_reset_exporter)
+
+
+class QuerySpans:
+    """``execute_wrapper`` opening a span per query inside a traced block."""
+
+    @classmethod
+    def install(cls, sender=None, connection=None, **kwargs) -> None:
+        """``connection_created`` receiver adding the wrapper."""
+        if cls.execute_wrapper not in connection.execute_wrappers:
+            # Stays put when ``execute_wrapper()`` blocks pop their own wrappers
+            connection.execute_wrappers.insert(0, cls.execute_wrapper)
+
+    @staticmethod
+    def execute_wrapper(execute, sql, params, many, context):
+        if _current.get() is None:
+            return execute(sql, params, many, context)
+        connection = context["connection"]
+        with span(
+            "db.query",
+            kind="client",
+            attributes={
+                "db.system": connection.vendor,
+                "db.alias": connection.alias,
+                "db.statement": sql[:1000],
+                "db.many": many,
+            },
+        ):
+            return execute(sql, params, many, context)
+
+
+class TaskTracing:
+    """Celery signal handlers propagating and recording task spans."""
+
+    # task id: (span context manager, span), between prerun and postrun
+    _open: Dict[str, tuple] = {}
+
+    @staticmethod
+    def on_before_publish(headers=None, **kwargs):
+        """Pass the current span to the task as its ``traceparent`` header."""
+        traceparent = current_traceparent()
+        if traceparent is not None and headers is not None:
+            headers["traceparent"] = traceparent
+
+    @classmethod
+    def on_prerun(cls, task_id=None, task=None, **kwargs):
+        if not enabled() or task is None:
+            return
+        # Custom headers are request attributes on workers and under
+        # request.headers for apply(); eager delay() runs in the caller's span
+        request = task.request
+        traceparent = getattr(request, "traceparent", None) or (
+            getattr(request, "headers", None) or {}
+        ).get("traceparent")
+        parent = parse_traceparent(traceparent)
+        block = span(
+            f"celery.task {task.name}",
+            kind="consumer",
+            attributes={"celery.task": task.name, "celery.task_id": task_id},
+            parent=parent,
+        )
+        cls._open[task_id] = (block, block.__enter__())
+
+    @classmethod
+    def on_postrun(cls, task_id=None, state=None, **kwargs):
+        block, span_ = cls._open.pop(task_id, (None, None))
+        if block is None:
+            return
+        span_.attributes["celery.state"] = state
+        if state == "FAILURE":
+            span_.status = "error"
+        block.__exit__(None, None, None)
@@ -17,10 +17,14 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
+from core.metrics import metrics_view
+from core.profiling import profile_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("djoser.urls")),
     path("api/auth/", include("djoser.urls.jwt")),
     path("api/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
+    path("profiles/<str:profile_id>", profile_view, name="profile"),
 ]
@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration, read from the working directory on startup.
+
+Prometheus metrics are aggregated across workers through files in
+PROMETHEUS_MULTIPROC_DIR (see core.metrics): the directory is emptied when
+the master starts, and the files of exited workers are marked dead.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,196 @@
+"""
+JWT authentication without a user query on every request.
+
+``CachedJWTAuthentication`` validates the token as usual, then resolves the
+user from a short-lived cache entry instead of the database. With
+``JWT_TRUSTED_CLAIMS`` enabled it goes further and builds the user from
+claims embedded when the token pair was issued (see
+``ClaimsTokenObtainPairSerializer``), as long as the user has not changed
+since then.
+
+Saving or deleting a user drops its cache entry and records when it
+changed; tokens whose claims predate that change fall back to the cache
+and database path, so deactivation takes effect immediately. If that
+record was evicted, it is restored from the user's ``updated_at``.
+
+Cached users never include the password hash, only the digest revocation
+compares tokens against, and claims users only hold the id and
+``USER_CLAIMS``. Reading a field they lack loads it from the database.
+"""
+
+import time
+from typing import Optional
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_KEY = "auth:user:{user_id}"
+CHANGED_KEY = "auth:user:{user_id}:changed"
+
+# User fields embedded in issued tokens, and when they were read. With
+# trusted claims these (and the id) are the only fields of ``request.user``
+# available without a query; e.g. ``is_superuser`` and permissions are not.
+USER_CLAIMS = ("email", "is_active", "is_staff")
+CLAIMS_ISSUED_AT_CLAIM = "claims_iat"
+
+
+def embed_user_claims(token, user) -> None:
+    """Copy the trusted user fields into ``token``."""
+    for name in USER_CLAIMS:
+        token[name] = getattr(user, name)
+    token[CLAIMS_ISSUED_AT_CLAIM] = time.time()
+
+
+def build_user(user_model, values: dict):
+    """Build a user from ``{attname: value}``; other fields stay deferred."""
+    return user_model.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+class UserCache:
+    """
+    Short-TTL cache of authenticated users keyed by id.
+
+    Entries hold the user's fields except ``password``, plus the hash of it
+    that revocation compares tokens against.
+    """
+
+    # Never copied into the cache
+    EXCLUDED_FIELDS = ("password",)
+    PASSWORD_HASH = "password_hash"
+
+    @staticmethod
+    def get(user_id):
+        """Return ``(user, password_hash)`` for a cached user, or None."""
+        values = cache.get(USER_KEY.format(user_id=user_id))
+        if values is None:
+            return None
+        values = dict(values)
+        password_hash = values.pop(UserCache.PASSWORD_HASH)
+        return build_user(get_user_model(), values), password_hash
+
+    @staticmethod
+    def set(user) -> None:
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname not in UserCache.EXCLUDED_FIELDS
+        }
+        values[UserCache.PASSWORD_HASH] = get_md5_hash_password(user.password)
+        cache.set(
+            USER_KEY.format(user_id=user.pk),
+            values,
+            timeout=getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60),
+        )
+
+    @staticmethod
+    def changed_at(user_id) -> Optional[float]:
+        """
+        Return when ``user_id`` last changed, if within a refresh lifetime.
+
+        A missing record may have been evicted, so it is restored from the
+        user's ``updated_at``; None means the user no longer exists.
+        """
+        key = CHANGED_KEY.format(user_id=user_id)
+        changed_at = cache.get(key)
+        if changed_at is not None:
+            return changed_at
+        updated_at = (
+            get_user_model()
+            .objects.filter(pk=user_id)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        # add() keeps a change recorded concurrently
+        cache.add(key, updated_at.timestamp(), timeout=UserCache.changed_timeout())
+        return cache.get(key, updated_at.timestamp())
+
+    @staticmethod
+    def changed_timeout() -> int:
+        # Claims can live as long as the refresh token they were copied from
+        return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+    @staticmethod
+    def invalidate(user_id) -> None:
+        """Drop the cached user and distrust claims issued before now."""
+        cache.delete(USER_KEY.format(user_id=user_id))
+        cache.set(
+            CHANGED_KEY.format(user_id=user_id),
+            time.time(),
+            timeout=UserCache.changed_timeout(),
+        )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` resolving users from claims or the cache."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        if getattr(settings, "JWT_TRUSTED_CLAIMS", False):
+            user = self.get_claims_user(validated_token, user_id)
+            if user is not None:
+                if not user.is_active:
+                    raise AuthenticationFailed(
+                        _("User is inactive"), code="user_inactive"
+                    )
+                return user
+
+        cached = UserCache.get(user_id)
+        if cached is None:
+            # Runs every check; inactive or missing users are never cached
+            user = super().get_user(validated_token)
+            UserCache.set(user)
+            return user
+
+        user, password_hash = cached
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
+
+    def get_claims_user(self, validated_token, user_id):
+        """
+        Build the user from embedded claims, or None if they can't be trusted.
+
+        The instance is loaded with only the id and ``USER_CLAIMS``; any
+        other field is deferred and read from the database on first access,
+        and saving it only writes the loaded fields.
+        """
+        issued_at = validated_token.get(CLAIMS_ISSUED_AT_CLAIM)
+        if issued_at is None or any(
+            name not in validated_token for name in USER_CLAIMS
+        ):
+            return None
+        changed_at = UserCache.changed_at(user_id)
+        if changed_at is None or issued_at <= changed_at:
+            return None
+
+        claims = {name: validated_token[name] for name in USER_CLAIMS}
+        claims[api_settings.USER_ID_FIELD] = user_id
+        values = {}
+        for field in self.user_model._meta.concrete_fields:
+            for key in (field.name, field.attname):
+                if key in claims:
+                    # Token claims are JSON; the id, for one, arrives as a string
+                    values[field.attname] = field.to_python(claims[key])
+                    break
+        return build_user(self.user_model, values)
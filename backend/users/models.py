@@ -6,6 +6,8 @@ class User(AbstractUser):
     """Custom user model extending Django's AbstractUser."""
 
     email = models.EmailField(unique=True, blank=False, null=False)
+    # Saves also invalidate trusted token claims (see users.authentication)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Additional fields can be added here in the future
     # phone_number = models.CharField(max_length=20, blank=True)
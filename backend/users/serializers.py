@@ -1,5 +1,7 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from .authentication import embed_user_claims
 
 User = get_user_model()
 
@@ -53,3 +55,13 @@ class UserCreateSerializer(serializers.ModelSerializer):
             last_name=validated_data.get("last_name", ""),
         )
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """JWT pair serializer embedding the user claims authentication can trust."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        embed_user_claims(token, user)
+        return token
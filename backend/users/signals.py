@@ -0,0 +1,15 @@
+"""
+Signal handlers for the users app.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import UserCache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached user and its trusted token claims on any change."""
+    UserCache.invalidate(instance.pk)
@@ -1,5 +1,8 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
+from users.authentication import CHANGED_KEY, USER_KEY, CachedJWTAuthentication
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from users.serializers import UserSerializer, UserCreateSerializer
@@ -250,3 +253,126 @@ class UserCreateSerializerTest(TestCase):
         serialized_data = serializer.data
         self.assertNotIn("password", serialized_data)
         self.assertNotIn("password_retype", serialized_data)
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    """Test cases for CachedJWTAuthentication."""
+
+    def setUp(self):
+        """Create a user and obtain an access token for it."""
+        cache.clear()
+        self.user = User.objects.create_user(  # type: ignore[attr-defined]
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            first_name="Test",
+        )
+        response = APIClient().post(
+            "/api/auth/jwt/create/",
+            {"email": "test@example.com", "password": "testpass123"},
+            format="json",
+        )
+        self.authorization = f"Bearer {response.data['access']}"
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+    def authenticate(self):
+        """Authenticate a request carrying the token and return its user."""
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=self.authorization)
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_user_cached_between_requests(self):
+        """Test only the first request looks the user up."""
+        self.client.get("/api/auth/users/me/")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/auth/users/me/")
+
+        self.assertEqual(response.data["first_name"], "Test")
+
+    def test_cached_user_excludes_password(self):
+        """Test cached users hold the revocation hash, not the password hash."""
+        self.client.get("/api/auth/users/me/")
+
+        values = cache.get(USER_KEY.format(user_id=self.user.pk))
+
+        self.assertNotIn("password", values)
+        self.assertNotIn(self.user.password, values.values())
+        self.assertEqual(self.authenticate().email, "test@example.com")
+
+    def test_user_change_invalidates_cache(self):
+        """Test a modified user is reloaded on the next request."""
+        self.client.get("/api/auth/users/me/")
+
+        self.user.first_name = "Changed"
+        self.user.save()
+        response = self.client.get("/api/auth/users/me/")
+
+        self.assertEqual(response.data["first_name"], "Changed")
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivation takes effect on the next request."""
+        self.client.get("/api/auth/users/me/")
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get("/api/auth/users/me/")
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(JWT_TRUSTED_CLAIMS=True)
+    def test_trusted_claims_skip_user_lookup(self):
+        """Test trusted claims authenticate without any query."""
+        with self.assertNumQueries(0):
+            request_user = self.authenticate()
+
+        self.assertTrue(request_user.is_active)
+        self.assertEqual(request_user.email, "test@example.com")
+        self.assertEqual(request_user.pk, self.user.pk)
+
+    @override_settings(JWT_TRUSTED_CLAIMS=True)
+    def test_trusted_claims_load_other_fields_lazily(self):
+        """Test unclaimed fields are deferred and saving writes only loaded ones."""
+        request_user = self.authenticate()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(request_user.first_name, "Test")
+
+        request_user.last_name = "User"
+        request_user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.username, "testuser")
+        self.assertEqual(self.user.last_name, "User")
+
+    @override_settings(JWT_TRUSTED_CLAIMS=True)
+    def test_trusted_claims_distrusted_after_deactivation(self):
+        """Test claims issued before a user change are not trusted."""
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get("/api/auth/users/me/")
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(JWT_TRUSTED_CLAIMS=True)
+    def test_trusted_claims_restore_evicted_change_record(self):
+        """Test an evicted change record costs one query, then none."""
+        cache.delete(CHANGED_KEY.format(user_id=self.user.pk))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate().pk, self.user.pk)
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+    @override_settings(JWT_TRUSTED_CLAIMS=True)
+    def test_trusted_claims_distrusted_after_evicted_change(self):
+        """Test an evicted change record is restored from the user row."""
+        self.user.is_active = False
+        self.user.save()
+        cache.clear()
+
+        response = self.client.get("/api/auth/users/me/")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIsNotNone(cache.get(CHANGED_KEY.format(user_id=self.user.pk)))
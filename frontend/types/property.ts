@@ -11,6 +11,7 @@ export interface Property {
   id: number;
   external_id?: string;
   address: string;
+  postal_code?: string;
   coordinates?: [number, number]; // [longitude, latitude]
   description?: string;
   price: string;